@@ -1,5 +1,6 @@
 import streamlit as st
 from database import db_manager
+from services import ResumoService, SugestaoService
 from ui import (
     mostrar_tela_autenticacao,
     mostrar_dashboard,
@@ -23,8 +24,29 @@ def configurar_pagina():
 
 def inicializar_banco():
     """Inicializa o banco de dados se necessário."""
-    if db_manager.init_database():
-        st.toast("✅ Banco de dados inicializado!", icon="✅")
+    try:
+        if db_manager.init_database():
+            st.toast("✅ Banco de dados inicializado!", icon="✅")
+    except RuntimeError as e:
+        # Banco em formato anterior: a migração é feita fora da aplicação
+        st.error(f"❌ {e}")
+        st.stop()
+    
+    try:
+        migrar_dados()
+    except RuntimeError as e:
+        # Carga incompleta: não fica em cache e é tentada de novo na próxima execução
+        st.error(f"❌ {e}")
+        st.stop()
+
+
+@st.cache_resource(show_spinner="Preparando resumos mensais e sugestões de categoria...")
+def migrar_dados():
+    """Executa uma vez por processo as cargas de dados exigidas por versões novas."""
+    # Bancos anteriores às tabelas resumo_mensal e termos_categoria precisam de carga inicial
+    resumos = ResumoService.reconstruir_se_necessario()
+    sugestoes = SugestaoService.reconstruir_se_necessario()
+    return resumos or sugestoes
 
 
 def inicializar_sessao():
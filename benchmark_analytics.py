@@ -0,0 +1,148 @@
+"""
+Benchmark do MotorAnalitico com lançamentos sintéticos.
+Mede cada indicador do dashboard e o conjunto deles, comparando com uma
+referência em laços Python sobre dicionários (como o dashboard calculava
+antes do motor); os resultados das duas versões são conferidos.
+
+Uso:
+    python benchmark_analytics.py                    # 1.000.000 de lançamentos em 120 meses
+    python benchmark_analytics.py -n 100000 -n 1000000
+    python benchmark_analytics.py --meses 24 --sem-referencia
+"""
+
+import argparse
+import math
+import time
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+from services.analytics import SOBRA_MINIMA_SEMAFORO, MotorAnalitico
+
+
+CATEGORIAS = [
+    ('Salário', '#2ecc71', 'Entrada'),
+    ('Freelance', '#27ae60', 'Entrada'),
+    ('Alimentação', '#e74c3c', 'Despesa'),
+    ('Transporte', '#3498db', 'Despesa'),
+    ('Moradia', '#f39c12', 'Despesa'),
+    ('Lazer', '#9b59b6', 'Despesa')
+]
+
+
+def gerar_lancamentos(quantidade: int, meses: int) -> pd.DataFrame:
+    """Gera lançamentos sintéticos no formato de LancamentoService.listar_lancamentos_df."""
+    aleatorio = np.random.default_rng(42)
+    indices = aleatorio.integers(0, len(CATEGORIAS), quantidade)
+    dias = aleatorio.integers(0, 28, quantidade).astype('timedelta64[D]')
+    inicios = (np.datetime64('2015-01') + aleatorio.integers(0, meses, quantidade)).astype('datetime64[D]')
+
+    nomes, cores, tipos = (np.array(coluna) for coluna in zip(*CATEGORIAS))
+    return pd.DataFrame({
+        'data': (inicios + dias).astype('datetime64[ns]'),
+        'valor': np.round(aleatorio.uniform(5, 5000, quantidade), 2),
+        'categoria_nome': pd.Categorical(nomes[indices]),
+        'categoria_cor': pd.Categorical(cores[indices]),
+        'categoria_tipo': pd.Categorical(tipos[indices])
+    })
+
+
+def motor_completo(lancamentos: pd.DataFrame) -> tuple:
+    """Todos os indicadores do dashboard pelo motor."""
+    motor = MotorAnalitico(lancamentos)
+    return motor.totais(), motor.distribuicao_despesas(), motor.serie_mensal(), motor.indicadores()
+
+
+def referencia_completa(registros: list) -> tuple:
+    """Os mesmos indicadores com laços sobre dicionários (totais, distribuição e série)."""
+    total_entradas = total_despesas = 0.0
+    por_categoria = defaultdict(float)
+    por_mes = defaultdict(lambda: [0.0, 0.0])
+
+    for lanc in registros:
+        chave_mes = (lanc['data'].year, lanc['data'].month)
+        if lanc['categoria_tipo'] == 'Despesa':
+            total_despesas += lanc['valor']
+            por_categoria[lanc['categoria_nome']] += lanc['valor']
+            por_mes[chave_mes][1] += lanc['valor']
+        else:
+            total_entradas += lanc['valor']
+            por_mes[chave_mes][0] += lanc['valor']
+
+    distribuicao = sorted(por_categoria.items(), key=lambda item: item[1], reverse=True)
+
+    serie = []
+    acumulado = 0.0
+    for (ano, mes), (entradas, despesas) in sorted(por_mes.items()):
+        saldo = entradas - despesas
+        acumulado += saldo
+        if saldo < 0:
+            semaforo = 'vermelho'
+        elif saldo < entradas * SOBRA_MINIMA_SEMAFORO:
+            semaforo = 'amarelo'
+        else:
+            semaforo = 'verde'
+        serie.append({'entradas': entradas, 'despesas': despesas, 'saldo_acumulado': acumulado, 'semaforo': semaforo})
+
+    melhor = max(serie, key=lambda item: item['entradas'] - item['despesas'])
+    pior = min(serie, key=lambda item: item['entradas'] - item['despesas'])
+    return (total_entradas, total_despesas), distribuicao, serie, (melhor, pior)
+
+
+def conferir(motor: tuple, referencia: tuple):
+    """Interrompe o benchmark se motor e referência divergirem."""
+    totais, distribuicao, serie, _ = motor
+    (entradas, despesas), distribuicao_ref, serie_ref, _ = referencia
+
+    assert math.isclose(totais['total_entradas'], entradas, rel_tol=1e-9)
+    assert math.isclose(totais['total_despesas'], despesas, rel_tol=1e-9)
+    assert list(distribuicao['categoria']) == [nome for nome, _ in distribuicao_ref]
+    assert len(serie) == len(serie_ref)
+    assert list(serie['semaforo']) == [item['semaforo'] for item in serie_ref]
+    assert np.allclose(serie['saldo_acumulado'], [item['saldo_acumulado'] for item in serie_ref])
+
+
+def medir(funcao, *args) -> tuple:
+    """Executa funcao e retorna (resultado, segundos)."""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Mede o MotorAnalitico com lançamentos sintéticos.")
+    parser.add_argument('-n', '--lancamentos', type=int, action='append', dest='tamanhos',
+                        help="Quantidade de lançamentos (pode ser repetido; padrão: 1000000)")
+    parser.add_argument('--meses', type=int, default=120,
+                        help="Meses cobertos pelos lançamentos (padrão: 120)")
+    parser.add_argument('--sem-referencia', action='store_true',
+                        help="Não executa a referência em laços Python")
+    args = parser.parse_args()
+
+    tamanhos = args.tamanhos or [1000000]
+
+    print(f"{'Lançamentos':>12} {'Totais':>9} {'Distrib.':>9} {'Série':>9} {'Indic.':>9} {'Motor':>9} {'Referência':>11}")
+
+    for tamanho in tamanhos:
+        lancamentos = gerar_lancamentos(tamanho, args.meses)
+
+        # Cada indicador isolado, em um motor novo (a série é memorizada por instância)
+        tempos = [
+            medir(getattr(MotorAnalitico(lancamentos), metodo))[1]
+            for metodo in ('totais', 'distribuicao_despesas', 'serie_mensal', 'indicadores')
+        ]
+        motor, duracao_motor = medir(motor_completo, lancamentos)
+
+        referencia = "-"
+        if not args.sem_referencia:
+            registros = lancamentos.astype({'categoria_nome': str, 'categoria_tipo': str}).to_dict('records')
+            resultado_referencia, duracao_referencia = medir(referencia_completa, registros)
+            conferir(motor, resultado_referencia)
+            referencia = f"{duracao_referencia * 1000:.0f}ms"
+
+        colunas = ' '.join(f"{tempo * 1000:>7.1f}ms" for tempo in tempos)
+        print(f"{tamanho:>12,} {colunas} {duracao_motor * 1000:>7.1f}ms {referencia:>11}")
+
+
+if __name__ == "__main__":
+    main()
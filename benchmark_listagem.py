@@ -0,0 +1,128 @@
+"""
+Benchmark da listagem de lançamentos (listar_lancamentos e obter_lancamento).
+Grava lançamentos sintéticos em um banco SQLite temporário, um mês por
+tamanho, e mede linhas listadas por segundo e consultas por id por segundo.
+
+As leituras são medidas sem o cache de serviços, que devolveria o mesmo
+resultado a partir da segunda chamada.
+
+Uso:
+    python benchmark_listagem.py                    # meses de 1.000, 10.000 e 100.000 lançamentos
+    python benchmark_listagem.py -n 5000 -n 50000
+    python benchmark_listagem.py --repeticoes 10
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date
+
+
+DESCRICOES = ['Supermercado', 'Uber', 'Padaria', 'Farmácia', 'Restaurante', 'Posto', 'Aluguel', 'Salário']
+
+# Lançamentos gravados por executemany
+TAMANHO_LOTE = 10000
+
+
+def popular(usuario_id: int, categoria_ids: list, tamanhos: list):
+    """Grava, para cada tamanho, um mês de 2024 com essa quantidade de lançamentos."""
+    from sqlalchemy import insert
+    from database import db_manager
+    from models.lancamento import Lancamento, TipoLancamento
+
+    aleatorio = random.Random(42)
+    for mes, tamanho in enumerate(tamanhos, start=1):
+        for inicio in range(0, tamanho, TAMANHO_LOTE):
+            linhas = [
+                {
+                    'usuario_id': usuario_id,
+                    'categoria_id': aleatorio.choice(categoria_ids),
+                    'data': date(2024, mes, aleatorio.randint(1, 28)),
+                    'valor': round(aleatorio.uniform(5, 5000), 2),
+                    'descricao': f"{aleatorio.choice(DESCRICOES)} {indice}",
+                    'tipo': TipoLancamento.VARIAVEL
+                }
+                for indice in range(inicio, min(inicio + TAMANHO_LOTE, tamanho))
+            ]
+            with db_manager.get_session() as session:
+                session.execute(insert(Lancamento.__table__), linhas)
+
+    with db_manager.engine.begin() as conexao:
+        conexao.exec_driver_sql('ANALYZE')
+
+
+def medir(funcao, repeticoes: int) -> float:
+    """Mediana, em segundos, de várias execuções de funcao."""
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        duracoes.append(time.perf_counter() - inicio)
+    return statistics.median(duracoes)
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Mede a listagem de lançamentos em um banco SQLite temporário.")
+    parser.add_argument('-n', '--lancamentos', type=int, action='append', dest='tamanhos',
+                        help="Lançamentos do mês (pode ser repetido, até 12; padrão: 1000, 10000 e 100000)")
+    parser.add_argument('--repeticoes', type=int, default=5,
+                        help="Execuções por medida; vale a mediana (padrão: 5)")
+    parser.add_argument('--consultas', type=int, default=2000,
+                        help="Consultas de obter_lancamento por mês (padrão: 2000)")
+    args = parser.parse_args()
+
+    tamanhos = (args.tamanhos or [1000, 10000, 100000])[:12]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        # Antes de importar os serviços: o gerenciador global lê a URL ao ser criado
+        os.environ['FINANCE_DB_URL'] = f"sqlite:///{os.path.join(diretorio, 'benchmark.db')}"
+
+        from sqlalchemy import select
+        from database import db_manager
+        from models import Categoria, Lancamento, Usuario
+        from services import AuthService, LancamentoService
+
+        db_manager.init_database()
+        AuthService.registrar_usuario("Benchmark", "benchmark@exemplo.com", "benchmark")
+        with db_manager.get_session_leitura() as session:
+            usuario_id = session.execute(select(Usuario.id)).scalar_one()
+            categoria_ids = list(session.execute(select(Categoria.id)).scalars())
+
+        print(f"📥 Gravando {sum(tamanhos):,} lançamentos...")
+        popular(usuario_id, categoria_ids, tamanhos)
+
+        # Sem o cache de serviços
+        listar = LancamentoService.listar_lancamentos.__wrapped__
+        obter = LancamentoService.obter_lancamento.__wrapped__
+
+        print(f"\n{'Lançamentos':>12} {'Listagem':>10} {'Linhas/s':>10} {'Por id':>10} {'Consultas/s':>12}")
+
+        for mes, tamanho in enumerate(tamanhos, start=1):
+            duracao = medir(lambda: listar(usuario_id, mes, 2024), args.repeticoes)
+
+            with db_manager.get_session_leitura() as session:
+                ids = list(session.execute(
+                    select(Lancamento.id).where(Lancamento.data.between(date(2024, mes, 1), date(2024, mes, 28)))
+                ).scalars())
+            amostra = random.Random(mes).choices(ids, k=args.consultas)
+
+            inicio = time.perf_counter()
+            for lancamento_id in amostra:
+                obter(lancamento_id, usuario_id)
+            duracao_ids = time.perf_counter() - inicio
+
+            print(
+                f"{tamanho:>12,} {duracao * 1000:>8.1f}ms {tamanho / duracao:>10,.0f} "
+                f"{duracao_ids / len(amostra) * 1e6:>8.1f}µs {len(amostra) / duracao_ids:>12,.0f}"
+            )
+
+        db_manager.engine.dispose()
+        db_manager.engine_leitura.dispose()
+
+
+if __name__ == "__main__":
+    main()
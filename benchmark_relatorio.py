@@ -0,0 +1,99 @@
+"""
+Benchmark da geração de relatórios PDF com lançamentos sintéticos.
+Mede páginas por segundo e pico de memória (tracemalloc) para cada tamanho.
+
+Uso:
+    python benchmark_relatorio.py                         # 1.000, 10.000 e 100.000 lançamentos
+    python benchmark_relatorio.py -n 5000 -n 50000
+    python benchmark_relatorio.py --arquivo-temporario    # PDF em arquivo temporário
+"""
+
+import argparse
+import random
+import re
+import time
+import tracemalloc
+from datetime import date
+from models.categoria import TipoCategoria
+from reports import RelatorioFinanceiro
+
+
+# Objetos de página no PDF (exclui o nó /Pages)
+PADRAO_PAGINA = re.compile(rb'/Type /Page\b(?!s)')
+
+CATEGORIAS = [
+    ('Salário', TipoCategoria.ENTRADA),
+    ('Freelance', TipoCategoria.ENTRADA),
+    ('Alimentação', TipoCategoria.DESPESA),
+    ('Transporte', TipoCategoria.DESPESA),
+    ('Moradia', TipoCategoria.DESPESA),
+    ('Lazer', TipoCategoria.DESPESA)
+]
+
+
+def gerar_lancamentos(quantidade: int) -> list:
+    """Gera lançamentos sintéticos no formato de LancamentoService.listar_lancamentos."""
+    aleatorio = random.Random(42)
+    lancamentos = []
+    for indice in range(quantidade):
+        nome, tipo = aleatorio.choice(CATEGORIAS)
+        lancamentos.append({
+            'data': date(2024, aleatorio.randint(1, 12), aleatorio.randint(1, 28)),
+            'categoria_nome': nome,
+            'categoria_tipo': tipo,
+            'descricao': f"Lançamento de teste número {indice} com descrição longa",
+            'valor': round(aleatorio.uniform(5, 5000), 2)
+        })
+    return lancamentos
+
+
+def gerar(lancamentos: list, arquivo_temporario: bool) -> bytes:
+    """Gera o relatório e retorna o conteúdo do PDF."""
+    total_entradas = sum(l['valor'] for l in lancamentos if l['categoria_tipo'] == TipoCategoria.ENTRADA)
+    total_despesas = sum(l['valor'] for l in lancamentos if l['categoria_tipo'] == TipoCategoria.DESPESA)
+    totais = {
+        'total_entradas': total_entradas,
+        'total_despesas': total_despesas,
+        'saldo': total_entradas - total_despesas
+    }
+
+    pdf = RelatorioFinanceiro().gerar_relatorio_mensal(
+        "Benchmark", 1, 2024, totais, lancamentos, [], em_arquivo_temporario=arquivo_temporario
+    )
+    with pdf:
+        return pdf.read()
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Mede a geração de relatórios PDF com lançamentos sintéticos.")
+    parser.add_argument('-n', '--lancamentos', type=int, action='append', dest='tamanhos',
+                        help="Quantidade de lançamentos (pode ser repetido; padrão: 1000, 10000 e 100000)")
+    parser.add_argument('--arquivo-temporario', action='store_true',
+                        help="Gera o PDF em arquivo temporário em vez de memória")
+    args = parser.parse_args()
+
+    tamanhos = args.tamanhos or [1000, 10000, 100000]
+
+    print(f"{'Lançamentos':>12} {'Páginas':>8} {'Tempo':>9} {'Páginas/s':>10} {'Pico de memória':>16}")
+
+    for tamanho in tamanhos:
+        lancamentos = gerar_lancamentos(tamanho)
+
+        # Tempo sem tracemalloc, que deixa a geração mais lenta
+        inicio = time.perf_counter()
+        pdf = gerar(lancamentos, args.arquivo_temporario)
+        duracao = time.perf_counter() - inicio
+        paginas = len(PADRAO_PAGINA.findall(pdf))
+        del pdf
+
+        tracemalloc.start()
+        gerar(lancamentos, args.arquivo_temporario)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{tamanho:>12,} {paginas:>8,} {duracao:>8.2f}s {paginas / duracao:>10.1f} {pico / 1024 / 1024:>13.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from .base import Base
+from .config import ConfiguracaoBanco
 from .connection import DatabaseManager, db_manager
 
-__all__ = ['Base', 'DatabaseManager', 'db_manager']
+__all__ = ['Base', 'ConfiguracaoBanco', 'DatabaseManager', 'db_manager']
@@ -0,0 +1,121 @@
+from typing import List, Optional
+from sqlalchemy import Column, Float, Integer, MetaData, String, Table, text
+import re
+import unicodedata
+
+
+# Índice de texto completo (FTS5) das descrições dos lançamentos
+TABELA_BUSCA = 'lancamentos_busca'
+
+# Função SQL que gera os termos indexados (registrada em cada conexão)
+FUNCAO_TERMOS = 'termos_busca'
+
+# Tabela virtual em metadados próprios: create_all não deve tentar criá-la
+tabela_busca = Table(
+    TABELA_BUSCA, MetaData(),
+    Column('rowid', Integer),
+    Column(TABELA_BUSCA, String),  # Coluna oculta usada no MATCH
+    Column('rank', Float)
+)
+
+# Cada palavra é indexada junto com o usuário dono do lançamento ("17xuber"),
+# de modo que a busca de um usuário, e também o bm25, percorrem só as
+# ocorrências dele e não as da palavra em todo o banco. O índice não guarda
+# o texto (content=''): os lançamentos são lidos pelo rowid, que é o id.
+DDL_BUSCA = {
+    TABELA_BUSCA: f"""
+        CREATE VIRTUAL TABLE {TABELA_BUSCA} USING fts5(
+            termos, content='', tokenize='unicode61 remove_diacritics 2'
+        )
+    """,
+    f'{TABELA_BUSCA}_inclusao': f"""
+        CREATE TRIGGER {TABELA_BUSCA}_inclusao AFTER INSERT ON lancamentos BEGIN
+            INSERT INTO {TABELA_BUSCA}(rowid, termos)
+            VALUES (new.id, {FUNCAO_TERMOS}(new.usuario_id, new.descricao));
+        END
+    """,
+    f'{TABELA_BUSCA}_exclusao': f"""
+        CREATE TRIGGER {TABELA_BUSCA}_exclusao AFTER DELETE ON lancamentos BEGIN
+            INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}, rowid, termos)
+            VALUES ('delete', old.id, {FUNCAO_TERMOS}(old.usuario_id, old.descricao));
+        END
+    """,
+    f'{TABELA_BUSCA}_alteracao': f"""
+        CREATE TRIGGER {TABELA_BUSCA}_alteracao AFTER UPDATE OF id, descricao, usuario_id ON lancamentos BEGIN
+            INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}, rowid, termos)
+            VALUES ('delete', old.id, {FUNCAO_TERMOS}(old.usuario_id, old.descricao));
+            INSERT INTO {TABELA_BUSCA}(rowid, termos)
+            VALUES (new.id, {FUNCAO_TERMOS}(new.usuario_id, new.descricao));
+        END
+    """,
+}
+
+
+def normalizar(texto: str) -> str:
+    """Texto sem acentos e em minúsculas, como o tokenizador do índice o vê."""
+    decomposto = unicodedata.normalize('NFKD', texto)
+    return ''.join(caractere for caractere in decomposto if not unicodedata.combining(caractere)).casefold()
+
+
+def palavras_busca(termo: Optional[str]) -> List[str]:
+    """Palavras de um termo de busca, normalizadas (pontuação é ignorada)."""
+    return re.findall(r'[^\W_]+', normalizar(termo or ''))
+
+
+def termos_busca(usuario_id: int, descricao: Optional[str]) -> str:
+    """Termos indexados de uma descrição: cada palavra prefixada pelo usuário."""
+    return ' '.join(f'{usuario_id}x{palavra}' for palavra in palavras_busca(descricao))
+
+
+def registrar_funcoes_busca(conexao_dbapi):
+    """
+    Registra em uma conexão sqlite3 a função usada pelos gatilhos do índice.
+
+    Os gatilhos dependem dela: alterações em lancamentos feitas fora da
+    aplicação (ex.: no shell do sqlite3) falham com "no such function".
+    """
+    conexao_dbapi.create_function(FUNCAO_TERMOS, 2, termos_busca, deterministic=True)
+
+
+def garantir_indice_busca(conexao) -> bool:
+    """
+    Cria o índice de busca e os gatilhos que o mantêm, se ainda não existirem.
+
+    Quando algo precisou ser criado (banco novo, versão anterior ou
+    lancamentos recriada pela migração do armazenamento, que descarta os
+    gatilhos), o índice é reconstruído a partir dos lançamentos.
+
+    Returns:
+        True se o índice foi (re)construído
+    """
+    existentes = set(conexao.execute(
+        text("SELECT name FROM sqlite_master WHERE name LIKE :prefixo"),
+        {'prefixo': f'{TABELA_BUSCA}%'}
+    ).scalars())
+
+    faltantes = [nome for nome in DDL_BUSCA if nome not in existentes]
+    if not faltantes:
+        return False
+
+    for nome in faltantes:
+        conexao.execute(text(DDL_BUSCA[nome]))
+    conexao.execute(text(f"INSERT INTO {TABELA_BUSCA}({TABELA_BUSCA}) VALUES ('delete-all')"))
+    conexao.execute(text(
+        f"INSERT INTO {TABELA_BUSCA}(rowid, termos) "
+        f"SELECT id, {FUNCAO_TERMOS}(usuario_id, descricao) FROM lancamentos"
+    ))
+    return True
+
+
+def expressao_busca(palavras: List[str], usuario_id: int) -> str:
+    """
+    Expressão MATCH do FTS5: lançamentos do usuário com todas as palavras
+    como início de alguma palavra da descrição ("ub" encontra "Uber").
+    """
+    return ' AND '.join(f'"{usuario_id}x{palavra}"*' for palavra in palavras)
+
+
+def corresponde(descricao: Optional[str], palavras: List[str]) -> bool:
+    """Mesmo critério de expressao_busca aplicado a um texto em memória."""
+    existentes = palavras_busca(descricao)
+    return all(any(existente.startswith(palavra) for existente in existentes) for palavra in palavras)
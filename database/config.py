@@ -0,0 +1,88 @@
+from typing import Optional
+import os
+
+
+# Classes de pool aceitas em FINANCE_DB_POOL
+POOLS_DISPONIVEIS = ('queue', 'null', 'static', 'singleton')
+
+
+def _inteiro(nome: str, padrao: int) -> int:
+    """Lê uma variável de ambiente inteira."""
+    valor = os.environ.get(nome)
+    if valor is None or valor.strip() == '':
+        return padrao
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValueError(f"{nome} deve ser um número inteiro (recebido: {valor!r})")
+
+
+def _booleano(nome: str, padrao: bool) -> bool:
+    """Lê uma variável de ambiente booleana (1/0, true/false, sim/nao)."""
+    valor = os.environ.get(nome)
+    if valor is None or valor.strip() == '':
+        return padrao
+    return valor.strip().lower() in ('1', 'true', 'sim', 's', 'yes', 'on')
+
+
+class ConfiguracaoBanco:
+    """
+    Configuração da conexão com o banco de dados.
+
+    Variáveis de ambiente (todas opcionais):
+        FINANCE_DB_URL            URL SQLAlchemy do banco (padrão: sqlite:///finance_app.db)
+        FINANCE_DB_URL_LEITURA    URL usada pelas leituras, ex.: réplica (padrão: FINANCE_DB_URL)
+        FINANCE_DB_PERFIL         Perfil de pragmas do SQLite (padrao, desempenho, seguro)
+        FINANCE_DB_POOL           Classe do pool: queue, null, static ou singleton
+        FINANCE_DB_POOL_SIZE      Conexões mantidas abertas no pool (queue)
+        FINANCE_DB_MAX_OVERFLOW   Conexões extras permitidas acima de POOL_SIZE (queue)
+        FINANCE_DB_POOL_TIMEOUT   Segundos de espera por uma conexão livre (queue)
+        FINANCE_DB_POOL_RECYCLE   Segundos até reciclar uma conexão (-1 desativa)
+        FINANCE_DB_POOL_PRE_PING  Testa a conexão antes de usá-la (1/0)
+        FINANCE_DB_ECHO           Exibe o SQL executado (1/0)
+    """
+
+    def __init__(
+        self,
+        url: str = 'sqlite:///finance_app.db',
+        url_leitura: Optional[str] = None,
+        perfil: str = 'desempenho',
+        pool: str = 'queue',
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: int = 30,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False,
+        echo: bool = False
+    ):
+        if pool not in POOLS_DISPONIVEIS:
+            raise ValueError(f"Pool inválido: {pool}. Use um de {list(POOLS_DISPONIVEIS)}")
+
+        self.url = url
+        self.url_leitura = url_leitura or url
+        self.perfil = perfil
+        self.pool = pool
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.pool_timeout = pool_timeout
+        self.pool_recycle = pool_recycle
+        self.pool_pre_ping = pool_pre_ping
+        self.echo = echo
+
+    @staticmethod
+    def do_ambiente() -> 'ConfiguracaoBanco':
+        """Monta a configuração a partir das variáveis de ambiente FINANCE_DB_*."""
+        url = os.environ.get('FINANCE_DB_URL') or 'sqlite:///finance_app.db'
+
+        return ConfiguracaoBanco(
+            url=url,
+            url_leitura=os.environ.get('FINANCE_DB_URL_LEITURA') or None,
+            perfil=os.environ.get('FINANCE_DB_PERFIL') or 'desempenho',
+            pool=(os.environ.get('FINANCE_DB_POOL') or 'queue').strip().lower(),
+            pool_size=_inteiro('FINANCE_DB_POOL_SIZE', 5),
+            max_overflow=_inteiro('FINANCE_DB_MAX_OVERFLOW', 10),
+            pool_timeout=_inteiro('FINANCE_DB_POOL_TIMEOUT', 30),
+            pool_recycle=_inteiro('FINANCE_DB_POOL_RECYCLE', -1),
+            pool_pre_ping=_booleano('FINANCE_DB_POOL_PRE_PING', False),
+            echo=_booleano('FINANCE_DB_ECHO', False)
+        )
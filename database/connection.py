@@ -1,37 +1,325 @@
-from sqlalchemy import create_engine
+from typing import Dict, List, Optional
+from sqlalchemy import create_engine, event, exc, inspect, text, case, cast, delete, extract, func, insert, select, Integer, MetaData, Table
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool, NullPool, StaticPool, SingletonThreadPool
+from sqlalchemy.schema import CreateTable, DropTable
 from contextlib import contextmanager
 from database.base import Base
-import os
+from database.busca import TABELA_BUSCA, garantir_indice_busca, registrar_funcoes_busca
+from database.config import ConfiguracaoBanco
+from database.tipos import Centavos, EnumInteiro
+import threading
+import time
+
+
+# Perfis de desempenho do SQLite: pragmas aplicados em toda nova conexão
+PERFIS_SQLITE = {
+    # Comportamento original do SQLite, apenas esperando por bloqueios
+    'padrao': {
+        'busy_timeout': 5000,
+    },
+    # WAL: leitores não esperam escritores; NORMAL é seguro em WAL (perde no máximo o último commit em queda de energia)
+    'desempenho': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,        # 64 MB por conexão (valor negativo = KiB)
+        'mmap_size': 268435456,      # 256 MB mapeados em memória
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # WAL com fsync a cada commit
+    'seguro': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -16000,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+
+# Pragmas que alteram o arquivo do banco e só são aplicados pela engine de escrita
+PRAGMAS_SOMENTE_ESCRITA = {'journal_mode'}
+
+# Classes de pool por nome de configuração
+CLASSES_POOL = {
+    'queue': QueuePool,
+    'null': NullPool,
+    'static': StaticPool,
+    'singleton': SingletonThreadPool,
+}
+
+
+class MetricasPool:
+    """Contadores de uso de um pool de conexões."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.conexoes_criadas = 0
+        self.checkouts = 0
+        self.em_uso = 0
+        self.pico_em_uso = 0
+        self.esperas = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+    
+    def registrar_conexao(self):
+        """Registra a abertura de uma nova conexão física."""
+        with self._lock:
+            self.conexoes_criadas += 1
+    
+    def registrar_checkout(self):
+        """Registra a retirada de uma conexão do pool."""
+        with self._lock:
+            self.checkouts += 1
+            self.em_uso += 1
+            self.pico_em_uso = max(self.pico_em_uso, self.em_uso)
+    
+    def registrar_checkin(self):
+        """Registra a devolução de uma conexão ao pool."""
+        with self._lock:
+            self.em_uso -= 1
+    
+    def registrar_espera(self, segundos: float):
+        """Registra o tempo que uma sessão esperou para obter sua conexão."""
+        with self._lock:
+            self.esperas += 1
+            self.espera_total += segundos
+            self.espera_maxima = max(self.espera_maxima, segundos)
+    
+    def resumo(self) -> Dict:
+        """Retorna os contadores (tempos em milissegundos)."""
+        with self._lock:
+            return {
+                'conexoes_criadas': self.conexoes_criadas,
+                'checkouts': self.checkouts,
+                'em_uso': self.em_uso,
+                'pico_em_uso': self.pico_em_uso,
+                'espera_media_ms': (self.espera_total / self.esperas * 1000) if self.esperas > 0 else 0.0,
+                'espera_maxima_ms': self.espera_maxima * 1000
+            }
 
 
 class DatabaseManager:
     """Gerenciador de conexão e sessões do banco de dados."""
     
-    def __init__(self, db_path: str = 'finance_app.db'):
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        perfil: Optional[str] = None,
+        configuracao: Optional[ConfiguracaoBanco] = None
+    ):
         """
         Inicializa o gerenciador de banco de dados.
         
+        As engines só são criadas no primeiro uso, para que importar o módulo
+        não abra conexões.
+        
         Args:
-            db_path: Caminho para o arquivo do banco SQLite
+            db_path: Caminho para o arquivo do banco SQLite (substitui a URL da configuração)
+            perfil: Perfil de desempenho do SQLite (chave de PERFIS_SQLITE)
+            configuracao: Configuração do banco (padrão: variáveis de ambiente FINANCE_DB_*)
         """
-        self.db_path = db_path
-        self.engine = create_engine(
-            f'sqlite:///{db_path}',
-            echo=False,
-            connect_args={'check_same_thread': False}
+        self.configuracao = configuracao or ConfiguracaoBanco.do_ambiente()
+        
+        if db_path is not None:
+            self.configuracao.url = self.configuracao.url_leitura = f'sqlite:///{db_path}'
+        if perfil is not None:
+            self.configuracao.perfil = perfil
+        
+        if self.configuracao.perfil not in PERFIS_SQLITE:
+            raise ValueError(
+                f"Perfil inválido: {self.configuracao.perfil}. Use um de {sorted(PERFIS_SQLITE)}"
+            )
+        
+        url = make_url(self.configuracao.url)
+        self.db_path = url.database if url.get_backend_name() == 'sqlite' else None
+        self.perfil = self.configuracao.perfil
+        
+        self._engine = None
+        self._engine_leitura = None
+        self._Session = None
+        self._SessionLeitura = None
+        self._lock_engines = threading.Lock()
+        self.metricas_escrita = MetricasPool()
+        self.metricas_leitura = MetricasPool()
+        self._esquema_verificado = False
+        self._busca_textual = None
+    
+    def _inicializar_engines(self):
+        """Cria as engines e fábricas de sessão na primeira vez em que são usadas."""
+        with self._lock_engines:
+            if self._engine is not None:
+                return
+            
+            engine = self._criar_engine(self.configuracao.url, self.metricas_escrita)
+            
+            if self.db_path in (None, '', ':memory:') and engine.dialect.name == 'sqlite':
+                # Banco em memória só existe na própria conexão: leituras usam a mesma engine
+                engine_leitura = engine
+            else:
+                # Engine separada, com pool próprio, para as leituras: não disputa conexões com as escritas
+                engine_leitura = self._criar_engine(
+                    self.configuracao.url_leitura, self.metricas_leitura, somente_leitura=True
+                )
+            
+            self._Session = scoped_session(sessionmaker(bind=engine))
+            self._SessionLeitura = scoped_session(sessionmaker(bind=engine_leitura))
+            self._engine_leitura = engine_leitura
+            self._engine = engine
+    
+    @property
+    def engine(self):
+        """Engine usada pelas escritas (criada no primeiro acesso)."""
+        if self._engine is None:
+            self._inicializar_engines()
+        return self._engine
+    
+    @property
+    def engine_leitura(self):
+        """Engine usada pelas leituras (criada no primeiro acesso)."""
+        if self._engine is None:
+            self._inicializar_engines()
+        return self._engine_leitura
+    
+    @property
+    def Session(self):
+        """Fábrica de sessões de escrita, uma por thread."""
+        if self._engine is None:
+            self._inicializar_engines()
+        return self._Session
+    
+    @property
+    def SessionLeitura(self):
+        """Fábrica de sessões de leitura, uma por thread."""
+        if self._engine is None:
+            self._inicializar_engines()
+        return self._SessionLeitura
+    
+    def _argumentos_pool(self) -> Dict:
+        """Argumentos de create_engine relativos ao pool de conexões."""
+        config = self.configuracao
+        argumentos = {
+            'poolclass': CLASSES_POOL[config.pool],
+            'pool_recycle': config.pool_recycle,
+            'pool_pre_ping': config.pool_pre_ping
+        }
+        
+        # Dimensionamento só existe no QueuePool
+        if config.pool == 'queue':
+            argumentos.update({
+                'pool_size': config.pool_size,
+                'max_overflow': config.max_overflow,
+                'pool_timeout': config.pool_timeout
+            })
+        
+        return argumentos
+    
+    def _criar_engine(self, url: str, metricas: MetricasPool, somente_leitura: bool = False):
+        """Cria uma engine com o pool configurado, as métricas e, no SQLite, os pragmas do perfil e as funções da busca."""
+        sqlite = make_url(url).get_backend_name() == 'sqlite'
+        
+        engine = create_engine(
+            url,
+            echo=self.configuracao.echo,
+            connect_args={'check_same_thread': False} if sqlite else {},
+            **self._argumentos_pool()
         )
-        self.Session = scoped_session(sessionmaker(bind=self.engine))
+        
+        event.listen(engine, 'connect', lambda conexao_dbapi, registro: metricas.registrar_conexao())
+        event.listen(engine, 'checkout', lambda conexao_dbapi, registro, proxy: metricas.registrar_checkout())
+        event.listen(engine, 'checkin', lambda conexao_dbapi, registro: metricas.registrar_checkin())
+        
+        if not sqlite:
+            # Em servidores o acesso somente leitura fica a cargo do usuário/réplica da URL de leitura
+            return engine
+        
+        pragmas = {
+            nome: valor for nome, valor in PERFIS_SQLITE[self.perfil].items()
+            if not (somente_leitura and nome in PRAGMAS_SOMENTE_ESCRITA)
+        }
+        if somente_leitura:
+            pragmas['query_only'] = 'ON'
+        
+        @event.listens_for(engine, 'connect')
+        def aplicar_pragmas(conexao_dbapi, registro_conexao):
+            cursor = conexao_dbapi.cursor()
+            try:
+                for nome, valor in pragmas.items():
+                    cursor.execute(f'PRAGMA {nome} = {valor}')
+            finally:
+                cursor.close()
+            # Usada pelos gatilhos do índice de busca ao gravar lançamentos
+            registrar_funcoes_busca(conexao_dbapi)
+        
+        return engine
+    
+    def metricas_pool(self) -> Dict:
+        """
+        Retorna as métricas de uso dos pools de escrita e de leitura.
+        
+        Returns:
+            Dicionário {'escrita': {...}, 'leitura': {...}} com contadores e o status do pool
+        """
+        metricas = {
+            'escrita': self.metricas_escrita.resumo(),
+            'leitura': self.metricas_leitura.resumo()
+        }
+        
+        if self._engine is not None:
+            metricas['escrita']['status'] = self._engine.pool.status()
+            if self._engine_leitura is not self._engine:
+                metricas['leitura']['status'] = self._engine_leitura.pool.status()
+        
+        return metricas
+    
+    def _obter_conexao(self, session, metricas: MetricasPool):
+        """Obtém a conexão da sessão medindo a espera pelo pool."""
+        inicio = time.perf_counter()
+        session.connection()
+        metricas.registrar_espera(time.perf_counter() - inicio)
     
     def create_tables(self):
         """Cria todas as tabelas no banco de dados."""
         # Import necessário para registrar os modelos
-        from models import Usuario, Categoria, Lancamento, OrcamentoMensal
+        from models import Usuario, Categoria, Lancamento, OrcamentoMensal, ResumoMensal, Recorrencia, RecorrenciaExcecao, TermoCategoria, VersaoDados, ProgressoImportacao
         Base.metadata.create_all(self.engine)
+        self.criar_indice_busca()
     
     def drop_tables(self):
         """Remove todas as tabelas do banco de dados."""
+        if self.engine.dialect.name == 'sqlite':
+            with self.engine.begin() as conexao:
+                conexao.execute(text(f'DROP TABLE IF EXISTS {TABELA_BUSCA}'))
         Base.metadata.drop_all(self.engine)
+        self._busca_textual = None
+    
+    def criar_indice_busca(self) -> bool:
+        """
+        Cria (ou completa) o índice de texto completo das descrições (SQLite com FTS5).
+        
+        Em outros bancos, ou em um SQLite compilado sem FTS5, a busca usa LIKE
+        (ver busca_textual_disponivel).
+        
+        Returns:
+            True se o índice foi (re)construído
+        """
+        self._busca_textual = None
+        if self.engine.dialect.name != 'sqlite':
+            return False
+        
+        try:
+            with self.engine.begin() as conexao:
+                return garantir_indice_busca(conexao)
+        except exc.OperationalError as e:
+            print(f"Erro ao criar índice de busca (busca por LIKE será usada): {e}")
+            return False
+    
+    def busca_textual_disponivel(self) -> bool:
+        """Indica se o banco tem o índice de texto completo das descrições."""
+        if self._busca_textual is None:
+            self._busca_textual = inspect(self.engine_leitura).has_table(TABELA_BUSCA)
+        return self._busca_textual
     
     @contextmanager
     def get_session(self):
@@ -45,6 +333,7 @@ class DatabaseManager:
         """
         session = self.Session()
         try:
+            self._obter_conexao(session, self.metricas_escrita)
             yield session
             session.commit()
         except Exception as e:
@@ -53,13 +342,228 @@ class DatabaseManager:
         finally:
             session.close()
     
+    @contextmanager
+    def get_session_leitura(self):
+        """
+        Context manager para sessões somente leitura, na engine de leitura.
+        
+        Qualquer escrita feita nesta sessão falha (PRAGMA query_only).
+        
+        Uso:
+            with db_manager.get_session_leitura() as session:
+                session.execute(select(...))
+        """
+        session = self.SessionLeitura()
+        try:
+            self._obter_conexao(session, self.metricas_leitura)
+            yield session
+        finally:
+            # Nada a confirmar: close encerra a transação e devolve a conexão ao pool
+            session.close()
+    
+    def tabelas_armazenamento_antigo(self) -> List[str]:
+        """
+        Lista as tabelas existentes ainda gravadas em um formato anterior.
+        
+        No formato original os valores são REAL e os enums são texto (nome do
+        membro); em uma versão intermediária, lancamentos era uma tabela sem
+        rowid, com chave primária (usuario_id, data, id). Em ambos os casos a
+        chave primária ou o tipo das colunas codificadas difere do esquema atual.
+        
+        Returns:
+            Nomes das tabelas, na ordem de dependência
+        """
+        # Import necessário para registrar os modelos
+        from models import Usuario, Categoria, Lancamento, OrcamentoMensal, ResumoMensal, Recorrencia, RecorrenciaExcecao, TermoCategoria, VersaoDados, ProgressoImportacao
+        
+        inspetor = inspect(self.engine)
+        antigas = []
+        
+        for tabela in Base.metadata.sorted_tables:
+            if not inspetor.has_table(tabela.name):
+                continue
+            
+            tipos = {coluna['name']: coluna['type'] for coluna in inspetor.get_columns(tabela.name)}
+            codificadas = [
+                coluna.name for coluna in tabela.columns
+                if isinstance(coluna.type, (Centavos, EnumInteiro))
+            ]
+            chave = inspetor.get_pk_constraint(tabela.name)['constrained_columns']
+            
+            if any(not isinstance(tipos.get(nome), Integer) for nome in codificadas) \
+                    or chave != [coluna.name for coluna in tabela.primary_key]:
+                antigas.append(tabela.name)
+        
+        return antigas
+    
+    @staticmethod
+    def _coluna_convertida(coluna_nova, coluna_antiga):
+        """Expressão que converte uma coluna do formato anterior para o atual."""
+        if isinstance(coluna_antiga.type, Integer):
+            # Já em centavos ou códigos inteiros (tabela migrada apenas pela chave primária)
+            return coluna_antiga
+        if isinstance(coluna_nova.type, Centavos):
+            return cast(func.round(coluna_antiga * 100), Integer)
+        if isinstance(coluna_nova.type, EnumInteiro):
+            # Enums eram gravados pelo nome do membro; nomes desconhecidos viram NULL e abortam a migração
+            return case(
+                {membro.name: codigo for codigo, membro in enumerate(coluna_nova.type.tipo_enum, start=1)},
+                value=coluna_antiga
+            )
+        return coluna_antiga
+    
+    @staticmethod
+    def _recalcular_resumos(conexao):
+        """
+        Recalcula resumo_mensal a partir dos lançamentos já convertidos.
+        
+        Os totais antigos eram somas de REAL: arredondá-los pode diferir em
+        alguns centavos da soma dos lançamentos arredondados um a um.
+        """
+        from models import Lancamento, ResumoMensal
+        
+        ano = extract('year', Lancamento.data)
+        mes = extract('month', Lancamento.data)
+        
+        conexao.execute(delete(ResumoMensal))
+        conexao.execute(insert(ResumoMensal).from_select(
+            ['usuario_id', 'ano', 'mes', 'categoria_id', 'total', 'quantidade'],
+            select(
+                Lancamento.usuario_id, ano, mes, Lancamento.categoria_id,
+                func.sum(Lancamento.valor), func.count(Lancamento.id)
+            ).group_by(Lancamento.usuario_id, ano, mes, Lancamento.categoria_id)
+        ))
+    
+    def migrar_armazenamento(self) -> List[str]:
+        """
+        Converte as tabelas de formatos anteriores para o armazenamento compacto.
+        
+        Cada tabela é recriada com o esquema atual (centavos inteiros e enums
+        como inteiros pequenos), os dados são copiados convertidos e a tabela
+        antiga é removida; o resumo mensal é recalculado dos lançamentos
+        convertidos. Tudo em uma única transação: em caso de erro o banco
+        continua no formato anterior. Os ids são copiados, de modo que o
+        índice de busca continua válido; só seus gatilhos, descartados com a
+        tabela, são recriados. Só é suportado no SQLite.
+        
+        A cópia reescreve as tabelas inteiras: é executada apenas pelo script
+        migrar_armazenamento.py, nunca ao iniciar a aplicação.
+        
+        Returns:
+            Nomes das tabelas migradas
+        """
+        antigas = self.tabelas_armazenamento_antigo()
+        if not antigas:
+            return []
+        
+        if self.engine.dialect.name != 'sqlite':
+            raise RuntimeError(
+                f"Migração do armazenamento disponível apenas no SQLite (tabelas no formato anterior: {', '.join(antigas)})"
+            )
+        
+        # Cópia do esquema, para as tabelas temporárias resolverem suas chaves estrangeiras
+        esquema = MetaData()
+        for tabela in Base.metadata.sorted_tables:
+            tabela.to_metadata(esquema)
+        
+        with self.engine.begin() as conexao:
+            # O pysqlite não abre transação antes de DDL: BEGIN explícito torna a migração atômica
+            conexao.exec_driver_sql('BEGIN IMMEDIATE')
+            
+            for nome in antigas:
+                tabela = Base.metadata.tables[nome]
+                antiga = Table(nome, MetaData(), autoload_with=conexao)
+                nova = tabela.to_metadata(esquema, name=f'{nome}_migracao')
+                
+                # Sem os índices, que só são criados depois da cópia e com os nomes definitivos
+                conexao.execute(CreateTable(nova))
+                conexao.execute(insert(nova).from_select(
+                    [coluna.name for coluna in nova.columns],
+                    select(*[
+                        DatabaseManager._coluna_convertida(coluna, antiga.c[coluna.name])
+                        for coluna in nova.columns
+                    ])
+                ))
+                conexao.execute(DropTable(antiga))
+                conexao.exec_driver_sql(f'ALTER TABLE {nova.name} RENAME TO {nome}')
+                
+                for indice in tabela.indexes:
+                    indice.create(conexao)
+            
+            if 'resumo_mensal' in antigas:
+                DatabaseManager._recalcular_resumos(conexao)
+            
+            conexao.execute(text('ANALYZE'))
+        
+        if 'lancamentos' in antigas:
+            self.criar_indice_busca()
+        
+        return antigas
+    
+    def atualizar_esquema(self) -> bool:
+        """
+        Aplica em um banco existente as tabelas e índices que ainda não existem.
+        
+        Tabelas em um formato de armazenamento anterior não são migradas aqui
+        (a cópia de lancamentos pode levar minutos): o banco é recusado até a
+        execução de migrar_armazenamento.py.
+        
+        Returns:
+            True se algum índice foi criado
+        
+        Raises:
+            RuntimeError: se alguma tabela está em um formato anterior
+        """
+        # Import necessário para registrar os modelos
+        from models import Usuario, Categoria, Lancamento, OrcamentoMensal, ResumoMensal, Recorrencia, RecorrenciaExcecao, TermoCategoria, VersaoDados, ProgressoImportacao
+        
+        # Os tipos do ORM só decodificam o formato atual: ler o anterior devolveria valores errados
+        antigas = self.tabelas_armazenamento_antigo()
+        if antigas:
+            raise RuntimeError(
+                f"Banco em formato de armazenamento anterior (tabelas: {', '.join(antigas)}). "
+                "Execute 'python migrar_armazenamento.py' antes de usar a aplicação."
+            )
+        
+        # create_all ignora tabelas existentes (e, com elas, seus índices novos)
+        Base.metadata.create_all(self.engine)
+        
+        inspetor = inspect(self.engine)
+        criou_indice = False
+        
+        for tabela in Base.metadata.sorted_tables:
+            existentes = {indice['name'] for indice in inspetor.get_indexes(tabela.name)}
+            for indice in tabela.indexes:
+                if indice.name not in existentes:
+                    indice.create(self.engine)
+                    criou_indice = True
+        
+        criou_indice = self.criar_indice_busca() or criou_indice
+        
+        # Atualiza as estatísticas para o otimizador passar a usar os novos índices
+        if criou_indice and self.engine.dialect.name == 'sqlite':
+            with self.engine.begin() as conexao:
+                conexao.execute(text('ANALYZE'))
+        
+        return criou_indice
+    
     def init_database(self):
         """Inicializa o banco de dados criando as tabelas se não existirem."""
-        if not os.path.exists(self.db_path):
+        # O Streamlit chama a inicialização a cada rerun; o esquema só é verificado uma vez
+        if self._esquema_verificado:
+            return False
+        
+        if not inspect(self.engine).has_table('usuarios'):
             self.create_tables()
+            self._esquema_verificado = True
             return True
+        
+        # Banco já existente: cria tabelas e índices de versões posteriores
+        # (um banco recusado por atualizar_esquema volta a ser verificado no próximo rerun)
+        self.atualizar_esquema()
+        self._esquema_verificado = True
         return False
 
 
-# Instância global do gerenciador de banco
+# Instância global do gerenciador de banco (configurada pelas variáveis FINANCE_DB_*)
 db_manager = DatabaseManager()
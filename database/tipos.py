@@ -0,0 +1,74 @@
+from typing import Type
+from sqlalchemy import Integer, SmallInteger
+from sqlalchemy.types import TypeDecorator
+import enum
+
+
+class Centavos(TypeDecorator):
+    """
+    Valor monetário gravado como inteiro de centavos.
+
+    No Python o valor continua float em reais; no banco é um inteiro, de
+    modo que SUM é exato (sem acúmulo de erro de ponto flutuante) e o valor
+    ocupa de 1 a 4 bytes em vez dos 8 de um REAL. Somas e COALESCE sobre a
+    coluna herdam o tipo e também voltam em reais.
+    """
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, valor, dialect):
+        if valor is None:
+            return None
+        return int(round(float(valor) * 100))
+
+    def process_result_value(self, valor, dialect):
+        if valor is None:
+            return None
+        return valor / 100
+
+    def coerce_compared_value(self, operador, valor):
+        # Literais em comparações e aritmética (ex.: total + 10.5) também são convertidos para centavos
+        return self
+
+    @property
+    def python_type(self):
+        return float
+
+
+class EnumInteiro(TypeDecorator):
+    """
+    Enum gravado como inteiro pequeno: o código é a posição do membro na classe, a partir de 1.
+
+    Novos membros devem ser acrescentados ao final da classe do enum, para
+    não alterar o código dos já gravados.
+    """
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, tipo_enum: Type[enum.Enum]):
+        super().__init__()
+        self.tipo_enum = tipo_enum
+        # Convertidos a cada linha: consulta direta em vez de percorrer o enum
+        self._membros = (None,) + tuple(tipo_enum)
+        self._codigos = {membro: codigo for codigo, membro in enumerate(tipo_enum, start=1)}
+
+    def process_bind_param(self, membro, dialect):
+        if membro is None:
+            return None
+        return self._codigos[membro]
+
+    def process_result_value(self, codigo, dialect):
+        if codigo is None:
+            return None
+        return self._membros[codigo]
+
+    @property
+    def python_type(self):
+        return self.tipo_enum
+
+
+def codigo_enum(membro: enum.Enum) -> int:
+    """Código gravado no banco para um membro de enum (ver EnumInteiro)."""
+    return list(type(membro)).index(membro) + 1
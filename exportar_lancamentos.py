@@ -0,0 +1,66 @@
+"""
+Script de exportação do histórico de lançamentos de um usuário.
+
+Uso:
+    python exportar_lancamentos.py historico.csv -u 1
+    python exportar_lancamentos.py historico.parquet -u 1 --inicio 01/01/2023 --fim 01/01/2024
+    python exportar_lancamentos.py despesas.csv -u 1 --categoria 3 --sem-recorrencias
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from database import db_manager
+from services.exportacao_service import ExportacaoService
+
+
+def data_br(texto: str):
+    """Converte uma data DD/MM/AAAA recebida na linha de comando."""
+    try:
+        return datetime.strptime(texto, '%d/%m/%Y').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"data inválida: {texto} (use DD/MM/AAAA)")
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Exporta os lançamentos de um usuário para CSV ou Parquet.")
+    parser.add_argument('saida', help="Arquivo de saída (.csv ou .parquet)")
+    parser.add_argument('-u', '--usuario', type=int, required=True, help="ID do usuário")
+    parser.add_argument('-f', '--formato', choices=['csv', 'parquet'], default=None,
+                        help="Formato do arquivo (padrão: pela extensão da saída)")
+    parser.add_argument('--inicio', type=data_br, default=None, help="Data inicial, inclusiva (DD/MM/AAAA)")
+    parser.add_argument('--fim', type=data_br, default=None, help="Data final, exclusiva (DD/MM/AAAA)")
+    parser.add_argument('--categoria', type=int, default=None, help="ID da categoria")
+    parser.add_argument('--sem-recorrencias', action='store_true',
+                        help="Não inclui as ocorrências calculadas das recorrências")
+    args = parser.parse_args()
+
+    formato = args.formato or ('parquet' if args.saida.lower().endswith('.parquet') else 'csv')
+
+    db_manager.init_database()
+
+    print(f"📤 Exportando lançamentos para {args.saida} ({formato})...")
+
+    inicio = time.perf_counter()
+    sucesso, mensagem, total = ExportacaoService.exportar(
+        args.usuario,
+        args.saida,
+        formato,
+        args.inicio,
+        args.fim,
+        args.categoria,
+        incluir_recorrencias=not args.sem_recorrencias
+    )
+    duracao = time.perf_counter() - inicio
+
+    if not sucesso:
+        print(f"❌ {mensagem}")
+        sys.exit(1)
+
+    print(f"✅ {mensagem} em {duracao:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Script de geração em lote dos relatórios mensais em PDF.
+Gera um relatório por usuário e mês, em paralelo, em um diretório de saída.
+
+Uso:
+    python gerar_relatorios.py --inicio 01/2024 --fim 12/2024                 # todos os usuários
+    python gerar_relatorios.py --inicio 01/2024 --fim 03/2024 -u 1 -u 2 -o pdfs
+    python gerar_relatorios.py --inicio 06/2024 --fim 06/2024 -w 4            # 4 processos
+"""
+
+import argparse
+import sys
+from datetime import date, datetime
+from dateutil.relativedelta import relativedelta
+from database import db_manager
+from services.relatorio_service import RelatorioService
+
+
+# Intervalo entre as mensagens de progresso, em relatórios concluídos
+INTERVALO_PROGRESSO = 100
+
+
+def mes_ano(texto: str) -> date:
+    """Converte um mês MM/AAAA recebido na linha de comando no primeiro dia do mês."""
+    try:
+        return datetime.strptime(texto, '%m/%Y').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mês inválido: {texto} (use MM/AAAA)")
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Gera os relatórios mensais em PDF de vários usuários em paralelo.")
+    parser.add_argument('--inicio', type=mes_ano, required=True, help="Primeiro mês (MM/AAAA)")
+    parser.add_argument('--fim', type=mes_ano, required=True, help="Último mês, inclusivo (MM/AAAA)")
+    parser.add_argument('-u', '--usuario', type=int, action='append', dest='usuarios',
+                        help="ID do usuário (pode ser repetido; padrão: todos)")
+    parser.add_argument('-o', '--saida', default='relatorios', help="Diretório de saída (padrão: relatorios)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Número de processos (padrão: núcleos disponíveis)")
+    parser.add_argument('--incluir-vazios', action='store_true',
+                        help="Gera também os meses sem lançamentos")
+    args = parser.parse_args()
+
+    if args.fim < args.inicio:
+        print("❌ O mês final deve ser igual ou posterior ao inicial")
+        sys.exit(1)
+
+    db_manager.init_database()
+
+    print(f"📄 Gerando relatórios de {args.inicio:%m/%Y} a {args.fim:%m/%Y} em {args.saida}/...")
+
+    concluidos = 0
+
+    def ao_concluir(resultado: dict):
+        nonlocal concluidos
+        concluidos += 1
+        if not resultado['sucesso']:
+            print(f"   ❌ Usuário {resultado['usuario_id']}, {resultado['mes']:02d}/{resultado['ano']}: {resultado['erro']}")
+        if concluidos % INTERVALO_PROGRESSO == 0:
+            print(f"   {concluidos:,} relatórios concluídos...")
+
+    resumo = RelatorioService.gerar_lote(
+        args.usuarios,
+        args.inicio,
+        args.fim + relativedelta(months=1),
+        args.saida,
+        max_workers=args.workers,
+        incluir_vazios=args.incluir_vazios,
+        ao_concluir=ao_concluir
+    )
+
+    print(f"✅ {resumo['gerados']:,} relatórios gerados em {resumo['segundos']:.1f}s com {resumo['workers']} processos")
+    print(f"   {resumo['relatorios_por_segundo']:.1f} relatórios/s "
+          f"({resumo['relatorios_por_segundo_por_worker']:.1f} por processo)")
+    if resumo['sem_lancamentos']:
+        print(f"   {resumo['sem_lancamentos']:,} meses sem lançamentos ignorados")
+
+    if resumo['falhas']:
+        print(f"❌ {len(resumo['falhas']):,} relatórios falharam")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Script de importação em massa de lançamentos a partir de um arquivo CSV.
+
+Formato esperado (cabeçalho obrigatório, separador ';'):
+    data;descricao;valor;categoria;tipo
+    05/01/2024;Supermercado;-1.234,56;Alimentação;Variável
+    06/01/2024;Supermercado Extra;-87,90;;Variável
+
+As colunas categoria e tipo são opcionais. Linhas com a categoria em branco
+recebem a categoria sugerida pela descrição, com o histórico do usuário.
+
+Cada lote confirmado incrementa a versão dos dados do usuário no banco: a
+aplicação em execução passa a mostrar os lançamentos importados sem reinício.
+
+Uso:
+    python importar_csv.py extrato.csv -u 1
+    python importar_csv.py extrato.csv -u 1 --lote 100000 --erros erros.csv
+    python importar_csv.py extrato.csv -u 1 --retomar   # continua uma importação interrompida
+"""
+
+import argparse
+import sys
+from database import db_manager
+from services.importacao_service import ImportacaoService, TAMANHO_LOTE_IMPORTACAO
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Importa lançamentos de um arquivo CSV.")
+    parser.add_argument('arquivo', help="Caminho do arquivo CSV")
+    parser.add_argument('-u', '--usuario', type=int, required=True, help="ID do usuário dono dos lançamentos")
+    parser.add_argument('-s', '--separador', default=';', help="Separador de colunas (padrão: ';')")
+    parser.add_argument('--lote', type=int, default=TAMANHO_LOTE_IMPORTACAO,
+                        help=f"Linhas por transação (padrão: {TAMANHO_LOTE_IMPORTACAO})")
+    parser.add_argument('--erros', default=None,
+                        help="Arquivo do relatório de erros (padrão: <arquivo>.erros.csv)")
+    parser.add_argument('--retomar', action='store_true',
+                        help="Continua do último lote gravado de uma importação interrompida")
+    args = parser.parse_args()
+
+    db_manager.init_database()
+
+    relatorio_erros = args.erros or f"{args.arquivo}.erros.csv"
+
+    total = ImportacaoService.contar_linhas(args.arquivo)
+    print(f"📥 Importando {total} linhas de {args.arquivo}...")
+
+    def mostrar_progresso(linhas, importados, erros):
+        percentual = linhas / total * 100 if total else 100.0
+        print(f"\r   ⏳ {linhas}/{total} linhas ({percentual:.0f}%) - {importados} importadas, {erros} erros",
+              end='', flush=True)
+
+    sucesso, mensagem, resumo = ImportacaoService.importar_csv(
+        args.usuario,
+        args.arquivo,
+        separador=args.separador,
+        tamanho_lote=args.lote,
+        retomar=args.retomar,
+        relatorio_erros=relatorio_erros,
+        progresso=mostrar_progresso
+    )
+    print()
+
+    if not sucesso:
+        print(f"❌ {mensagem}")
+        if resumo['linhas']:
+            print("💡 Execute novamente com --retomar para continuar de onde parou.")
+        sys.exit(1)
+
+    if resumo['retomado_de']:
+        print(f"🔁 Retomado a partir da linha {resumo['retomado_de'] + 1}")
+
+    linhas_por_segundo = (resumo['linhas'] - resumo['retomado_de']) / resumo['duracao'] if resumo['duracao'] else 0
+    print(f"✅ {mensagem} em {resumo['duracao']:.1f}s ({linhas_por_segundo:,.0f} linhas/s)")
+
+    if resumo['erros']:
+        print(f"📄 Relatório de erros: {relatorio_erros}")
+
+
+if __name__ == "__main__":
+    main()
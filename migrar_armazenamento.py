@@ -0,0 +1,81 @@
+"""
+Script de migração do banco para o armazenamento compacto.
+Converte valores para centavos inteiros e enums para códigos inteiros (e
+devolve a lancamentos a chave pelo id, em bancos da versão que a agrupava
+por usuário e data); depois compacta o arquivo (VACUUM).
+
+A aplicação não migra o banco sozinha: enquanto houver tabelas em formato
+anterior ela se recusa a iniciar. A migração reescreve as tabelas inteiras
+e deve ser feita com a aplicação parada.
+
+Uso:
+    python migrar_armazenamento.py                # migra e compacta o banco configurado
+    python migrar_armazenamento.py --verificar    # apenas lista as tabelas a migrar
+    python migrar_armazenamento.py --sem-vacuum   # migra sem compactar o arquivo
+"""
+
+import argparse
+import os
+import sys
+import time
+from database import db_manager
+
+
+def tamanho_banco() -> int:
+    """Tamanho em bytes do arquivo do banco e do seu WAL."""
+    return sum(
+        os.path.getsize(caminho)
+        for caminho in (db_manager.db_path, f"{db_manager.db_path}-wal")
+        if os.path.exists(caminho)
+    )
+
+
+def compactar():
+    """Reescreve o arquivo sem as páginas livres deixadas pela migração."""
+    with db_manager.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conexao:
+        conexao.exec_driver_sql('VACUUM')
+        conexao.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Migra o banco para o armazenamento compacto.")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Apenas lista as tabelas no formato anterior, sem alterá-las")
+    parser.add_argument('--sem-vacuum', action='store_true',
+                        help="Não compacta o arquivo depois da migração")
+    args = parser.parse_args()
+
+    if not db_manager.db_path or not os.path.exists(db_manager.db_path):
+        print("❌ Banco SQLite não encontrado (verifique FINANCE_DB_URL)")
+        sys.exit(1)
+
+    antigas = db_manager.tabelas_armazenamento_antigo()
+    if not antigas:
+        print("✅ O banco já está no armazenamento compacto")
+        return
+
+    print(f"📋 Tabelas no formato anterior: {', '.join(antigas)}")
+    if args.verificar:
+        print("💡 Execute sem --verificar para migrá-las.")
+        sys.exit(1)
+
+    tamanho_antes = tamanho_banco()
+    print("🔄 Migrando...")
+
+    inicio = time.perf_counter()
+    db_manager.migrar_armazenamento()
+    print(f"   {len(antigas)} tabelas migradas em {time.perf_counter() - inicio:.1f}s")
+
+    if not args.sem_vacuum:
+        print("🗜️ Compactando o arquivo...")
+        inicio = time.perf_counter()
+        compactar()
+        print(f"   Concluído em {time.perf_counter() - inicio:.1f}s")
+
+    tamanho_depois = tamanho_banco()
+    print(f"\n✅ Banco migrado: {tamanho_antes / 1024 / 1024:.1f} MB → {tamanho_depois / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,12 @@ from .usuario import Usuario
 from .categoria import Categoria
 from .lancamento import Lancamento
 from .orcamento_mensal import OrcamentoMensal
+from .resumo_mensal import ResumoMensal
+from .recorrencia import Recorrencia, RecorrenciaExcecao, FrequenciaRecorrencia
+from .termo_categoria import TermoCategoria
+from .versao_dados import VersaoDados
+from .progresso_importacao import ProgressoImportacao
 
-__all__ = ['Usuario', 'Categoria', 'Lancamento', 'OrcamentoMensal']
+__all__ = ['Usuario', 'Categoria', 'Lancamento', 'OrcamentoMensal', 'ResumoMensal',
+           'Recorrencia', 'RecorrenciaExcecao', 'FrequenciaRecorrencia', 'TermoCategoria', 'VersaoDados',
+           'ProgressoImportacao']
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey
 from sqlalchemy.orm import relationship
 from database.base import Base
+from database.tipos import EnumInteiro
 import enum
 
 
@@ -18,13 +19,14 @@ class Categoria(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
     nome = Column(String(100), nullable=False)
-    tipo = Column(Enum(TipoCategoria), nullable=False)
+    tipo = Column(EnumInteiro(TipoCategoria), nullable=False)
     cor = Column(String(7), default='#3498db')  # Cor em hexadecimal
     
     # Relacionamentos
     usuario = relationship('Usuario', back_populates='categorias')
     lancamentos = relationship('Lancamento', back_populates='categoria')
     orcamentos = relationship('OrcamentoMensal', back_populates='categoria')
+    recorrencias = relationship('Recorrencia', back_populates='categoria')
     
     def __repr__(self):
         return f"<Categoria(id={self.id}, nome='{self.nome}', tipo={self.tipo.value})>"
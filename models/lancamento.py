@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.base import Base
+from database.tipos import Centavos, EnumInteiro
 from datetime import date
 import enum
 
@@ -20,14 +21,21 @@ class Lancamento(Base):
     usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
     categoria_id = Column(Integer, ForeignKey('categorias.id'), nullable=False)
     data = Column(Date, nullable=False, default=date.today)
-    valor = Column(Float, nullable=False)
+    valor = Column(Centavos, nullable=False)
     descricao = Column(String(255))
-    tipo = Column(Enum(TipoLancamento), nullable=False, default=TipoLancamento.VARIAVEL)
+    tipo = Column(EnumInteiro(TipoLancamento), nullable=False, default=TipoLancamento.VARIAVEL)
     
     # Relacionamentos
     usuario = relationship('Usuario', back_populates='lancamentos')
     categoria = relationship('Categoria', back_populates='lancamentos')
     
+    # O id é o rowid, gerado pelo banco na própria escrita. O índice por usuário e
+    # data também carrega o rowid: um mês é uma faixa do índice já na ordem (data, id)
+    __table_args__ = (
+        Index('ix_lancamentos_usuario_data', 'usuario_id', 'data'),
+        Index('ix_lancamentos_usuario_categoria_data', 'usuario_id', 'categoria_id', 'data'),
+    )
+    
     def __repr__(self):
         return f"<Lancamento(id={self.id}, data={self.data}, valor={self.valor}, descricao='{self.descricao}')>"
     
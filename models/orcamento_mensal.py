@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from database.base import Base
+from database.tipos import Centavos
 
 
 class OrcamentoMensal(Base):
@@ -12,7 +13,7 @@ class OrcamentoMensal(Base):
     usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
     categoria_id = Column(Integer, ForeignKey('categorias.id'), nullable=False)
     mes_ano = Column(String(7), nullable=False)  # Formato: 'MM/YYYY'
-    valor_planejado = Column(Float, nullable=False)
+    valor_planejado = Column(Centavos, nullable=False)
     
     # Relacionamentos
     usuario = relationship('Usuario', back_populates='orcamentos')
@@ -21,6 +22,7 @@ class OrcamentoMensal(Base):
     # Constraint para evitar duplicação: um orçamento por categoria por mês por usuário
     __table_args__ = (
         UniqueConstraint('usuario_id', 'categoria_id', 'mes_ano', name='uq_orcamento_usuario_categoria_mes'),
+        Index('ix_orcamentos_usuario_mes_ano', 'usuario_id', 'mes_ano'),
     )
     
     def __repr__(self):
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from database.base import Base
+from datetime import datetime
+
+
+class ProgressoImportacao(Base):
+    """Registros já importados de um arquivo CSV, gravados na transação de cada lote (retomada da importação)."""
+    
+    __tablename__ = 'progresso_importacoes'
+    
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), primary_key=True)
+    arquivo = Column(String(500), primary_key=True)
+    registros_processados = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    
+    def __repr__(self):
+        return f"<ProgressoImportacao(usuario_id={self.usuario_id}, arquivo='{self.arquivo}', registros_processados={self.registros_processados})>"
@@ -0,0 +1,79 @@
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from dateutil.relativedelta import relativedelta
+from database.base import Base
+from database.tipos import Centavos, EnumInteiro
+from models.lancamento import TipoLancamento
+import enum
+
+
+class FrequenciaRecorrencia(enum.Enum):
+    """Frequências de repetição de um lançamento recorrente."""
+    SEMANAL = "Semanal"
+    MENSAL = "Mensal"
+    ANUAL = "Anual"
+
+
+class Recorrencia(Base):
+    """
+    Regra de lançamento recorrente.
+
+    As ocorrências não são gravadas em lancamentos: são calculadas a partir
+    da regra para o período consultado. Ocorrências materializadas ou
+    removidas ficam registradas em recorrencias_excecoes.
+    """
+
+    __tablename__ = 'recorrencias'
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), nullable=False)
+    categoria_id = Column(Integer, ForeignKey('categorias.id'), nullable=False)
+    descricao = Column(String(255))
+    valor = Column(Centavos, nullable=False)
+    tipo = Column(EnumInteiro(TipoLancamento), nullable=False, default=TipoLancamento.FIXA)
+    frequencia = Column(EnumInteiro(FrequenciaRecorrencia), nullable=False, default=FrequenciaRecorrencia.MENSAL)
+    intervalo = Column(Integer, nullable=False, default=1)  # A cada N semanas/meses/anos
+    data_inicio = Column(Date, nullable=False)
+    data_fim = Column(Date)  # Inclusiva; None = sem término
+
+    # Relacionamentos
+    usuario = relationship('Usuario', back_populates='recorrencias')
+    categoria = relationship('Categoria', back_populates='recorrencias')
+    excecoes = relationship('RecorrenciaExcecao', back_populates='recorrencia', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        Index('ix_recorrencias_usuario_inicio', 'usuario_id', 'data_inicio'),
+    )
+
+    def __repr__(self):
+        return f"<Recorrencia(id={self.id}, frequencia={self.frequencia.value}, valor={self.valor}, descricao='{self.descricao}')>"
+
+    @property
+    def passo(self) -> relativedelta:
+        """Distância entre duas ocorrências consecutivas."""
+        if self.frequencia == FrequenciaRecorrencia.SEMANAL:
+            return relativedelta(weeks=self.intervalo)
+        if self.frequencia == FrequenciaRecorrencia.ANUAL:
+            return relativedelta(years=self.intervalo)
+        return relativedelta(months=self.intervalo)
+
+
+class RecorrenciaExcecao(Base):
+    """
+    Ocorrência de uma recorrência que não deve mais ser calculada pela regra.
+
+    Com lancamento_id a ocorrência foi materializada (e possivelmente alterada)
+    como lançamento comum; sem ele, a ocorrência foi removida.
+    """
+
+    __tablename__ = 'recorrencias_excecoes'
+
+    recorrencia_id = Column(Integer, ForeignKey('recorrencias.id'), primary_key=True)
+    data = Column(Date, primary_key=True)  # Data original da ocorrência
+    lancamento_id = Column(Integer, ForeignKey('lancamentos.id'))
+
+    # Relacionamentos
+    recorrencia = relationship('Recorrencia', back_populates='excecoes')
+
+    def __repr__(self):
+        return f"<RecorrenciaExcecao(recorrencia_id={self.recorrencia_id}, data={self.data}, lancamento_id={self.lancamento_id})>"
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from database.base import Base
+from database.tipos import Centavos
+
+
+class ResumoMensal(Base):
+    """Totais mensais de lançamentos por categoria, mantidos a cada escrita."""
+    
+    __tablename__ = 'resumo_mensal'
+    
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), primary_key=True)
+    ano = Column(Integer, primary_key=True)
+    mes = Column(Integer, primary_key=True)
+    categoria_id = Column(Integer, ForeignKey('categorias.id'), primary_key=True)
+    total = Column(Centavos, nullable=False, default=0.0)
+    quantidade = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ResumoMensal(usuario_id={self.usuario_id}, mes={self.mes:02d}/{self.ano}, categoria_id={self.categoria_id}, total={self.total})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from database.base import Base
+
+
+# Tamanho máximo de um termo (palavras maiores são truncadas)
+TAMANHO_TERMO = 40
+
+
+class TermoCategoria(Base):
+    """Lançamentos de cada categoria com uma palavra na descrição, por usuário (mantido a cada escrita)."""
+    
+    __tablename__ = 'termos_categoria'
+    
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), primary_key=True)
+    termo = Column(String(TAMANHO_TERMO), primary_key=True)
+    categoria_id = Column(Integer, ForeignKey('categorias.id'), primary_key=True)
+    quantidade = Column(Integer, nullable=False, default=0)
+    
+    # Sem rowid no SQLite: os termos de um usuário ficam contíguos na chave primária
+    __table_args__ = {'sqlite_with_rowid': False}
+    
+    def __repr__(self):
+        return f"<TermoCategoria(usuario_id={self.usuario_id}, termo='{self.termo}', categoria_id={self.categoria_id}, quantidade={self.quantidade})>"
@@ -20,6 +20,7 @@ class Usuario(Base):
     categorias = relationship('Categoria', back_populates='usuario', cascade='all, delete-orphan')
     lancamentos = relationship('Lancamento', back_populates='usuario', cascade='all, delete-orphan')
     orcamentos = relationship('OrcamentoMensal', back_populates='usuario', cascade='all, delete-orphan')
+    recorrencias = relationship('Recorrencia', back_populates='usuario', cascade='all, delete-orphan')
     
     def __repr__(self):
         return f"<Usuario(id={self.id}, nome='{self.nome}', email='{self.email}')>"
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, ForeignKey
+from database.base import Base
+
+
+class VersaoDados(Base):
+    """Versão dos dados de cada usuário, incrementada na transação de toda escrita dos serviços."""
+    
+    __tablename__ = 'versoes_dados'
+    
+    usuario_id = Column(Integer, ForeignKey('usuarios.id'), primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<VersaoDados(usuario_id={self.usuario_id}, versao={self.versao})>"
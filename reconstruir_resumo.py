@@ -0,0 +1,55 @@
+"""
+Script de manutenção da tabela resumo_mensal.
+Reconstrói ou verifica os totais mensais a partir dos lançamentos.
+Pode ser executado com a aplicação no ar: a reconstrução incrementa a versão
+dos dados de cada usuário no banco, e a aplicação descarta o que tinha em cache.
+
+Uso:
+    python reconstruir_resumo.py                  # reconstrói todos os usuários
+    python reconstruir_resumo.py --verificar      # apenas verifica divergências
+    python reconstruir_resumo.py -u 1 -u 2 -w 4   # usuários específicos, 4 threads (no SQLite, a reconstrução usa 1)
+"""
+
+import argparse
+import sys
+import time
+from database import db_manager
+from services import ResumoService
+
+
+def main():
+    """Função principal."""
+    parser = argparse.ArgumentParser(description="Reconstrói ou verifica o resumo mensal de lançamentos.")
+    parser.add_argument('-u', '--usuario', type=int, action='append', dest='usuarios',
+                        help="ID do usuário (pode ser repetido; padrão: todos)")
+    parser.add_argument('--verificar', action='store_true',
+                        help="Apenas compara o resumo com os lançamentos, sem alterá-lo")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Número de usuários processados em paralelo (no SQLite, só na verificação)")
+    args = parser.parse_args()
+
+    db_manager.init_database()
+
+    acao = "Verificando" if args.verificar else "Reconstruindo"
+    print(f"🔄 {acao} resumo mensal...")
+
+    inicio = time.perf_counter()
+    resultados = ResumoService.reconstruir_todos(args.usuarios, args.verificar, args.workers)
+    duracao = time.perf_counter() - inicio
+
+    falhas = 0
+    for usuario_id, (sucesso, mensagem) in resultados.items():
+        if not sucesso:
+            falhas += 1
+            print(f"   ❌ Usuário {usuario_id}: {mensagem}")
+
+    print(f"\n✅ {len(resultados) - falhas} de {len(resultados)} usuários OK em {duracao:.2f}s")
+
+    if args.verificar and falhas:
+        print("💡 Execute sem --verificar para reconstruir os resumos divergentes.")
+
+    sys.exit(1 if falhas else 0)
+
+
+if __name__ == "__main__":
+    main()
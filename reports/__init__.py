@@ -1,3 +1,4 @@
 from .pdf_generator import RelatorioFinanceiro
+from .cache import CacheRelatorios, cache_relatorios, impressao_digital
 
-__all__ = ['RelatorioFinanceiro']
+__all__ = ['RelatorioFinanceiro', 'CacheRelatorios', 'cache_relatorios', 'impressao_digital']
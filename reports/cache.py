@@ -0,0 +1,196 @@
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+
+# Versão do layout do PDF; incremente ao alterar pdf_generator para descartar os relatórios já gravados
+VERSAO_LAYOUT_RELATORIO = 1
+
+# Diretório e tamanho máximo padrão do cache (sobrescritos por FINANCE_RELATORIOS_CACHE_DIR e _MB)
+DIRETORIO_CACHE_RELATORIOS = os.path.join(tempfile.gettempdir(), 'finance_app', 'relatorios')
+TAMANHO_MAXIMO_CACHE_RELATORIOS_MB = 256
+
+# Campos dos lançamentos e orçamentos que aparecem no relatório
+CAMPOS_LANCAMENTO = ('data', 'categoria_nome', 'categoria_tipo', 'descricao', 'valor')
+CAMPOS_ORCAMENTO = ('categoria_nome', 'valor_planejado', 'valor_realizado', 'percentual_utilizado')
+
+
+def impressao_digital(
+    usuario_nome: str,
+    mes: int,
+    ano: int,
+    totais: Dict,
+    lancamentos: List[Dict],
+    orcamentos: List[Dict]
+) -> str:
+    """
+    Hash SHA-256 dos dados de um relatório (mesmos argumentos de gerar_relatorio_mensal).
+
+    Dados iguais produzem o mesmo PDF; qualquer alteração em um lançamento,
+    orçamento ou total muda a impressão digital.
+    """
+    hash_dados = hashlib.sha256()
+
+    def adicionar(valor):
+        hash_dados.update(json.dumps(valor, default=str, ensure_ascii=False).encode('utf-8'))
+        hash_dados.update(b'\n')
+
+    adicionar([VERSAO_LAYOUT_RELATORIO, usuario_nome, mes, ano])
+    adicionar([totais['total_entradas'], totais['total_despesas'], totais['saldo']])
+    for lancamento in lancamentos:
+        adicionar([lancamento[campo] for campo in CAMPOS_LANCAMENTO])
+    adicionar('orcamentos')
+    for orcamento in orcamentos:
+        adicionar([orcamento[campo] for campo in CAMPOS_ORCAMENTO])
+
+    return hash_dados.hexdigest()
+
+
+class CacheRelatorios:
+    """
+    Cache em disco dos relatórios PDF gerados.
+
+    Cada relatório é gravado em <diretorio>/<usuario_id>/<ano>-<mes>-<impressao>.pdf.
+    Como a impressão digital vem dos dados, um relatório gravado nunca fica
+    desatualizado: dados alterados geram outra chave. Ao gravar, as versões
+    anteriores do mesmo mês são removidas e, acima do tamanho máximo, os
+    arquivos usados há mais tempo são descartados.
+    """
+
+    def __init__(self, diretorio: str = DIRETORIO_CACHE_RELATORIOS,
+                 tamanho_maximo: int = TAMANHO_MAXIMO_CACHE_RELATORIOS_MB * 1024 * 1024):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def do_ambiente() -> 'CacheRelatorios':
+        """Monta o cache a partir de FINANCE_RELATORIOS_CACHE_DIR e FINANCE_RELATORIOS_CACHE_MB."""
+        tamanho_mb = os.environ.get('FINANCE_RELATORIOS_CACHE_MB') or str(TAMANHO_MAXIMO_CACHE_RELATORIOS_MB)
+        try:
+            tamanho_maximo = int(tamanho_mb) * 1024 * 1024
+        except ValueError:
+            raise ValueError(f"FINANCE_RELATORIOS_CACHE_MB deve ser um número inteiro (recebido: {tamanho_mb!r})")
+
+        return CacheRelatorios(
+            diretorio=os.environ.get('FINANCE_RELATORIOS_CACHE_DIR') or DIRETORIO_CACHE_RELATORIOS,
+            tamanho_maximo=tamanho_maximo
+        )
+
+    @staticmethod
+    def _prefixo(mes: int, ano: int) -> str:
+        """Início do nome dos arquivos de um mês."""
+        return f"{ano}-{mes:02d}-"
+
+    def caminho(self, usuario_id: int, mes: int, ano: int, impressao: str) -> str:
+        """Caminho do arquivo de um relatório no cache."""
+        return os.path.join(self.diretorio, str(usuario_id), f"{self._prefixo(mes, ano)}{impressao}.pdf")
+
+    def obter(self, usuario_id: int, mes: int, ano: int, impressao: str) -> Optional[bytes]:
+        """
+        Busca um relatório no cache.
+
+        Returns:
+            Conteúdo do PDF, ou None se não estiver no cache
+        """
+        caminho = self.caminho(usuario_id, mes, ano, impressao)
+        try:
+            with open(caminho, 'rb') as arquivo:
+                pdf = arquivo.read()
+            # A data de modificação marca o último uso para o descarte
+            os.utime(caminho)
+        except OSError:
+            with self._lock:
+                self.falhas += 1
+            return None
+
+        with self._lock:
+            self.acertos += 1
+        return pdf
+
+    def armazenar(self, usuario_id: int, mes: int, ano: int, impressao: str, pdf: bytes):
+        """Grava um relatório, substituindo as versões anteriores do mesmo mês."""
+        caminho = self.caminho(usuario_id, mes, ano, impressao)
+        diretorio_usuario = os.path.dirname(caminho)
+        os.makedirs(diretorio_usuario, exist_ok=True)
+
+        # Grava em arquivo temporário e renomeia: leitores nunca veem um PDF pela metade
+        descritor, temporario = tempfile.mkstemp(dir=diretorio_usuario, suffix='.tmp')
+        try:
+            with os.fdopen(descritor, 'wb') as arquivo:
+                arquivo.write(pdf)
+            os.replace(temporario, caminho)
+        except BaseException:
+            os.unlink(temporario)
+            raise
+
+        prefixo = self._prefixo(mes, ano)
+        for entrada in os.scandir(diretorio_usuario):
+            if entrada.name.startswith(prefixo) and entrada.path != caminho:
+                self._remover(entrada.path)
+
+        self._descartar_excedente()
+
+    @staticmethod
+    def _remover(caminho: str):
+        """Remove um arquivo do cache (outro processo pode já tê-lo removido)."""
+        try:
+            os.unlink(caminho)
+        except FileNotFoundError:
+            pass
+
+    def _arquivos(self) -> List[Tuple[str, os.stat_result]]:
+        """Relatórios gravados, como (caminho, stat)."""
+        arquivos = []
+        if not os.path.isdir(self.diretorio):
+            return arquivos
+
+        for diretorio_usuario in os.scandir(self.diretorio):
+            if not diretorio_usuario.is_dir():
+                continue
+            for entrada in os.scandir(diretorio_usuario.path):
+                if entrada.name.endswith('.pdf'):
+                    try:
+                        arquivos.append((entrada.path, entrada.stat()))
+                    except FileNotFoundError:
+                        pass
+        return arquivos
+
+    def _descartar_excedente(self):
+        """Remove os relatórios usados há mais tempo até o cache caber no tamanho máximo."""
+        arquivos = self._arquivos()
+        tamanho = sum(stat.st_size for _, stat in arquivos)
+
+        for caminho, stat in sorted(arquivos, key=lambda arquivo: arquivo[1].st_mtime):
+            if tamanho <= self.tamanho_maximo:
+                break
+            self._remover(caminho)
+            tamanho -= stat.st_size
+
+    def limpar(self):
+        """Remove todos os relatórios do cache."""
+        for caminho, _ in self._arquivos():
+            self._remover(caminho)
+
+    def estatisticas(self) -> Dict:
+        """Retorna contadores de uso e ocupação do cache."""
+        arquivos = self._arquivos()
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'arquivos': len(arquivos),
+                'tamanho': sum(stat.st_size for _, stat in arquivos),
+                'tamanho_maximo': self.tamanho_maximo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': (self.acertos / consultas * 100) if consultas > 0 else 0.0
+            }
+
+
+# Instância global do cache de relatórios
+cache_relatorios = CacheRelatorios.do_ambiente()
@@ -2,50 +2,168 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.lib import colors
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle, StyleSheet1
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from io import BytesIO
 from datetime import datetime
-from typing import List, Dict
+from functools import lru_cache
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional
+import tempfile
 from utils.formatador import FormatadorBR
 
 
+# Linhas de lançamentos por tabela: o ReportLab divide uma tabela entre páginas
+# recalculando o restante a cada quebra, o que fica quadrático em tabelas enormes
+LINHAS_POR_TABELA = 200
+
+# Relatórios gerados em arquivo temporário ficam em memória até este tamanho
+TAMANHO_MAXIMO_PDF_EM_MEMORIA = 16 * 1024 * 1024
+
+# Cabeçalho das tabelas de lançamentos
+CABECALHO_LANCAMENTOS = ['Data', 'Categoria', 'Descrição', 'Valor']
+
+
+@lru_cache(maxsize=None)
+def _estilos() -> StyleSheet1:
+    """Estilos de parágrafo do relatório, criados uma única vez por processo."""
+    styles = getSampleStyleSheet()
+    
+    # Título principal
+    styles.add(ParagraphStyle(
+        name='TituloPrincipal',
+        parent=styles['Heading1'],
+        fontSize=18,
+        textColor=colors.HexColor('#2c3e50'),
+        spaceAfter=12,
+        alignment=TA_CENTER
+    ))
+    
+    # Subtítulo
+    styles.add(ParagraphStyle(
+        name='Subtitulo',
+        parent=styles['Heading2'],
+        fontSize=14,
+        textColor=colors.HexColor('#34495e'),
+        spaceAfter=10,
+        spaceBefore=10
+    ))
+    
+    # Texto alinhado à direita
+    styles.add(ParagraphStyle(
+        name='TextoDireita',
+        parent=styles['Normal'],
+        alignment=TA_RIGHT
+    ))
+    
+    return styles
+
+
+def _estilo_tabela_lancamentos(cor_cabecalho: str) -> TableStyle:
+    """Estilo das tabelas de lançamentos com a cor de cabeçalho informada."""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor(cor_cabecalho)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
+    ])
+
+
+def _acompanhar_progresso(progresso: Callable[[float], None]) -> Callable[[str, int], None]:
+    """Converte os eventos de progresso do ReportLab (elementos montados) em fração concluída."""
+    total = 1
+    
+    def callback(evento: str, valor: int):
+        nonlocal total
+        if evento == 'SIZE_EST':
+            total = max(valor, 1)
+        elif evento == 'PROGRESS':
+            progresso(valor / total)
+    
+    return callback
+
+
+# Estilos de tabela montados uma vez e compartilhados por todos os relatórios
+# (a cor da linha de saldo do resumo é aplicada por relatório)
+ESTILO_TABELA_RESUMO = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
+])
+
+ESTILO_TABELA_ORCAMENTO = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9b59b6')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+ESTILO_TABELA_ENTRADAS = _estilo_tabela_lancamentos('#27ae60')
+ESTILO_TABELA_DESPESAS = _estilo_tabela_lancamentos('#e74c3c')
+
+COR_SALDO_POSITIVO = colors.HexColor('#27ae60')
+COR_SALDO_NEGATIVO = colors.HexColor('#e74c3c')
+
+
 class RelatorioFinanceiro:
     """Gerador de relatórios financeiros em PDF."""
     
     def __init__(self):
         self.formatador = FormatadorBR()
-        self.styles = getSampleStyleSheet()
-        self._criar_estilos_customizados()
+        # Compartilhado entre instâncias: não deve ser modificado
+        self.styles = _estilos()
     
-    def _criar_estilos_customizados(self):
-        """Cria estilos personalizados para o relatório."""
-        # Título principal
-        self.styles.add(ParagraphStyle(
-            name='TituloPrincipal',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            textColor=colors.HexColor('#2c3e50'),
-            spaceAfter=12,
-            alignment=TA_CENTER
-        ))
+    def _tabelas_lancamentos(self, lancamentos: List, estilo: TableStyle) -> Iterator[Table]:
+        """
+        Divide os lançamentos em tabelas de até LINHAS_POR_TABELA linhas.
         
-        # Subtítulo
-        self.styles.add(ParagraphStyle(
-            name='Subtitulo',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            textColor=colors.HexColor('#34495e'),
-            spaceAfter=10,
-            spaceBefore=10
-        ))
+        Cada tabela tem o próprio cabeçalho, repetido (repeatRows) quando
+        ela é quebrada entre páginas.
+        """
+        formatar_data = self.formatador.formatar_data
         
-        # Texto alinhado à direita
-        self.styles.add(ParagraphStyle(
-            name='TextoDireita',
-            parent=self.styles['Normal'],
-            alignment=TA_RIGHT
-        ))
+        ordenados = sorted(lancamentos, key=lambda x: x['data'])
+        # Coluna de valores formatada de uma vez
+        valores = self.formatador.formatar_moeda_serie([lanc['valor'] for lanc in ordenados]).tolist()
+        
+        linhas = (
+            [
+                formatar_data(lanc['data']),
+                lanc['categoria_nome'],
+                lanc['descricao'][:30] + '...' if len(lanc['descricao']) > 30 else lanc['descricao'],
+                valor
+            ]
+            for lanc, valor in zip(ordenados, valores)
+        )
+        
+        while True:
+            bloco = list(islice(linhas, LINHAS_POR_TABELA))
+            if not bloco:
+                break
+            
+            tabela = Table(
+                [CABECALHO_LANCAMENTOS] + bloco,
+                colWidths=[2.5*cm, 3.5*cm, 7*cm, 3*cm],
+                repeatRows=1
+            )
+            tabela.setStyle(estilo)
+            yield tabela
     
     def gerar_relatorio_mensal(
         self,
@@ -54,8 +172,10 @@ class RelatorioFinanceiro:
         ano: int,
         totais: Dict,
         lancamentos: List,
-        orcamentos: List[Dict]
-    ) -> BytesIO:
+        orcamentos: List[Dict],
+        em_arquivo_temporario: bool = False,
+        progresso: Optional[Callable[[float], None]] = None
+    ) -> BinaryIO:
         """
         Gera relatório financeiro mensal em PDF.
         
@@ -66,11 +186,18 @@ class RelatorioFinanceiro:
             totais: Dicionário com totais (entradas, despesas, saldo)
             lancamentos: Lista de lançamentos do mês
             orcamentos: Lista de orçamentos com comparações
+            em_arquivo_temporario: Grava o PDF em um arquivo temporário (em
+                memória até TAMANHO_MAXIMO_PDF_EM_MEMORIA), para relatórios grandes
+            progresso: Chamado durante a montagem com a fração concluída (0 a 1)
             
         Returns:
-            Buffer BytesIO com o PDF gerado
+            Buffer BytesIO (ou arquivo temporário) com o PDF gerado,
+            posicionado no início
         """
-        buffer = BytesIO()
+        if em_arquivo_temporario:
+            buffer = tempfile.SpooledTemporaryFile(max_size=TAMANHO_MAXIMO_PDF_EM_MEMORIA)
+        else:
+            buffer = BytesIO()
         doc = SimpleDocTemplate(
             buffer,
             pagesize=A4,
@@ -116,20 +243,11 @@ class RelatorioFinanceiro:
         ]
         
         resumo_table = Table(resumo_data, colWidths=[10*cm, 6*cm])
-        resumo_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498db')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+        resumo_table.setStyle(ESTILO_TABELA_RESUMO)
+        resumo_table.setStyle([
             ('BACKGROUND', (0, -1), (-1, -1), 
-             colors.HexColor('#27ae60') if totais['saldo'] >= 0 else colors.HexColor('#e74c3c'))
-        ]))
+             COR_SALDO_POSITIVO if totais['saldo'] >= 0 else COR_SALDO_NEGATIVO)
+        ])
         
         story.append(resumo_table)
         story.append(Spacer(1, 0.5*cm))
@@ -148,18 +266,8 @@ class RelatorioFinanceiro:
                     self.formatador.formatar_percentual(orc['percentual_utilizado'])
                 ])
             
-            orc_table = Table(orc_data, colWidths=[6*cm, 3.5*cm, 3.5*cm, 3*cm])
-            orc_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#9b59b6')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.lightgrey),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            orc_table = Table(orc_data, colWidths=[6*cm, 3.5*cm, 3.5*cm, 3*cm], repeatRows=1)
+            orc_table.setStyle(ESTILO_TABELA_ORCAMENTO)
             
             story.append(orc_table)
             story.append(Spacer(1, 0.5*cm))
@@ -174,61 +282,17 @@ class RelatorioFinanceiro:
         # Entradas
         if entradas:
             story.append(Paragraph("Entradas", self.styles['Heading3']))
-            
-            entradas_data = [['Data', 'Categoria', 'Descrição', 'Valor']]
-            
-            for lanc in sorted(entradas, key=lambda x: x['data']):
-                entradas_data.append([
-                    self.formatador.formatar_data(lanc['data']),
-                    lanc['categoria_nome'],
-                    lanc['descricao'][:30] + '...' if len(lanc['descricao']) > 30 else lanc['descricao'],
-                    self.formatador.formatar_moeda(lanc['valor'])
-                ])
-            
-            entradas_table = Table(entradas_data, colWidths=[2.5*cm, 3.5*cm, 7*cm, 3*cm])
-            entradas_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#27ae60')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-            ]))
-            
-            story.append(entradas_table)
+            story.extend(self._tabelas_lancamentos(entradas, ESTILO_TABELA_ENTRADAS))
             story.append(Spacer(1, 0.3*cm))
         
         # Despesas
         if despesas:
             story.append(Paragraph("Despesas", self.styles['Heading3']))
-            
-            despesas_data = [['Data', 'Categoria', 'Descrição', 'Valor']]
-            
-            for lanc in sorted(despesas, key=lambda x: x['data']):
-                despesas_data.append([
-                    self.formatador.formatar_data(lanc['data']),
-                    lanc['categoria_nome'],
-                    lanc['descricao'][:30] + '...' if len(lanc['descricao']) > 30 else lanc['descricao'],
-                    self.formatador.formatar_moeda(lanc['valor'])
-                ])
-            
-            despesas_table = Table(despesas_data, colWidths=[2.5*cm, 3.5*cm, 7*cm, 3*cm])
-            despesas_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e74c3c')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('ALIGN', (3, 0), (3, -1), 'RIGHT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey)
-            ]))
-            
-            story.append(despesas_table)
+            story.extend(self._tabelas_lancamentos(despesas, ESTILO_TABELA_DESPESAS))
         
         # Gera o PDF
+        if progresso is not None:
+            doc.setProgressCallBack(_acompanhar_progresso(progresso))
         doc.build(story)
         buffer.seek(0)
         
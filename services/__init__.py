@@ -2,5 +2,13 @@ from .auth_service import AuthService
 from .categoria_service import CategoriaService
 from .lancamento_service import LancamentoService
 from .orcamento_service import OrcamentoService
+from .resumo_service import ResumoService
+from .recorrencia_service import RecorrenciaService
+from .importacao_service import ImportacaoService
+from .exportacao_service import ExportacaoService
+from .relatorio_service import RelatorioService
+from .sugestao_service import SugestaoService
+from .tarefas import FilaTarefas
 
-__all__ = ['AuthService', 'CategoriaService', 'LancamentoService', 'OrcamentoService']
+__all__ = ['AuthService', 'CategoriaService', 'LancamentoService', 'OrcamentoService', 'ResumoService', 'RecorrenciaService', 'ImportacaoService',
+           'ExportacaoService', 'RelatorioService', 'SugestaoService', 'FilaTarefas']
@@ -0,0 +1,272 @@
+from typing import Dict, Optional
+from datetime import date
+import numpy as np
+import pandas as pd
+from models.categoria import TipoCategoria
+
+
+# Comprometimento da renda (% das entradas gasto) a partir do qual o mês pede atenção ou é de risco
+LIMITE_COMPROMETIMENTO_ATENCAO = 50.0
+LIMITE_COMPROMETIMENTO_RISCO = 70.0
+
+# Sobra mínima, em fração das entradas, para um mês ser verde no semáforo
+SOBRA_MINIMA_SEMAFORO = 0.10
+
+# Classes do semáforo financeiro, da pior para a melhor
+CLASSES_SEMAFORO = ['vermelho', 'amarelo', 'verde']
+
+# Colunas de MotorAnalitico.serie_mensal
+COLUNAS_SERIE_MENSAL = [
+    'inicio', 'entradas', 'despesas', 'saldo', 'saldo_acumulado', 'planejado',
+    'diferenca_planejado', 'percentual_gasto', 'semaforo'
+]
+
+
+class MotorAnalitico:
+    """
+    Cálculo vetorizado dos indicadores do dashboard.
+
+    Recebe os lançamentos no formato de LancamentoService.listar_lancamentos_df
+    e os orçamentos no de OrcamentoService.listar_orcamentos_df. Os totais
+    mensais podem ser informados prontos (ex.: calcular_totais_por_periodo,
+    lido do resumo mensal); sem eles, são agregados dos lançamentos.
+    A interface apenas exibe os resultados.
+    """
+
+    def __init__(
+        self,
+        lancamentos: Optional[pd.DataFrame] = None,
+        orcamentos: Optional[pd.DataFrame] = None,
+        totais_mensais: Optional[pd.DataFrame] = None,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None
+    ):
+        """
+        Args:
+            lancamentos: Lançamentos (data, valor, categoria_tipo, categoria_nome, categoria_cor)
+            orcamentos: Orçamentos (ano, mes, valor_planejado)
+            totais_mensais: Totais por mês (inicio, total_entradas, total_despesas)
+            inicio: Primeiro mês da série mensal (inclusivo)
+            fim: Fim da série mensal (exclusivo)
+        """
+        self.lancamentos = lancamentos
+        self.orcamentos = orcamentos
+        self.totais_mensais = totais_mensais
+        self.inicio = inicio
+        self.fim = fim
+        self._serie: Optional[pd.DataFrame] = None
+
+    @staticmethod
+    def _classe_comprometimento(percentual: float) -> str:
+        """Classifica o percentual da renda gasto em 'saudavel', 'atencao' ou 'risco'."""
+        if percentual <= LIMITE_COMPROMETIMENTO_ATENCAO:
+            return 'saudavel'
+        if percentual <= LIMITE_COMPROMETIMENTO_RISCO:
+            return 'atencao'
+        return 'risco'
+
+    def _mascara_despesas(self) -> np.ndarray:
+        """Linhas dos lançamentos que são despesas."""
+        return (self.lancamentos['categoria_tipo'] == TipoCategoria.DESPESA.value).to_numpy(dtype=bool)
+
+    def totais(self) -> Dict:
+        """
+        Totais dos lançamentos recebidos.
+
+        Returns:
+            Dicionário com total_entradas, total_despesas, saldo,
+            percentual_gasto, taxa_economia e classe_comprometimento
+            (None sem entradas)
+        """
+        total_entradas = total_despesas = 0.0
+
+        if self.lancamentos is not None and not self.lancamentos.empty:
+            valores = self.lancamentos['valor'].to_numpy(dtype='float64')
+            despesas = self._mascara_despesas()
+            total_despesas = float(valores[despesas].sum())
+            total_entradas = float(valores[~despesas].sum())
+
+        saldo = total_entradas - total_despesas
+        percentual_gasto = (total_despesas / total_entradas * 100) if total_entradas > 0 else 0.0
+
+        return {
+            'total_entradas': total_entradas,
+            'total_despesas': total_despesas,
+            'saldo': saldo,
+            'percentual_gasto': percentual_gasto,
+            'taxa_economia': (saldo / total_entradas * 100) if total_entradas > 0 else 0.0,
+            'classe_comprometimento': MotorAnalitico._classe_comprometimento(percentual_gasto) if total_entradas > 0 else None
+        }
+
+    def distribuicao_despesas(self) -> pd.DataFrame:
+        """
+        Despesas agrupadas por categoria, da maior para a menor.
+
+        Returns:
+            DataFrame com categoria, cor, valor e percentual do total de despesas
+        """
+        if self.lancamentos is None or self.lancamentos.empty:
+            return pd.DataFrame(columns=['categoria', 'cor', 'valor', 'percentual'])
+
+        posicoes = np.flatnonzero(self._mascara_despesas())
+        nomes = self.lancamentos['categoria_nome'].astype('category')
+
+        # Soma pelos códigos da categórica; a cor é a da primeira despesa de cada categoria
+        codigos = nomes.cat.codes.to_numpy()[posicoes]
+        presentes, primeiras = np.unique(codigos, return_index=True)
+        valores = np.bincount(
+            codigos, weights=self.lancamentos['valor'].to_numpy(dtype='float64')[posicoes]
+        )[presentes]
+
+        distribuicao = pd.DataFrame({
+            'categoria': nomes.cat.categories[presentes].astype(str),
+            'cor': self.lancamentos['categoria_cor'].iloc[posicoes[primeiras]].astype(str).to_numpy(),
+            'valor': valores
+        })
+        distribuicao['percentual'] = distribuicao['valor'] / distribuicao['valor'].sum() * 100
+
+        return distribuicao.sort_values('valor', ascending=False, kind='stable', ignore_index=True)
+
+    def _totais_por_mes(self) -> pd.DataFrame:
+        """Entradas e despesas por mês (índice: primeiro dia do mês)."""
+        if self.totais_mensais is not None:
+            totais = pd.DataFrame({
+                'entradas': self.totais_mensais['total_entradas'].to_numpy(dtype='float64'),
+                'despesas': self.totais_mensais['total_despesas'].to_numpy(dtype='float64')
+            }, index=pd.DatetimeIndex(pd.to_datetime(self.totais_mensais['inicio']), name='inicio'))
+            return totais.groupby(level='inicio').sum()
+
+        if self.lancamentos is None or self.lancamentos.empty:
+            return pd.DataFrame(
+                {'entradas': [], 'despesas': []}, index=pd.DatetimeIndex([], name='inicio'), dtype='float64'
+            )
+
+        valores = self.lancamentos['valor'].to_numpy(dtype='float64')
+        despesas = self._mascara_despesas()
+
+        # Meses como inteiros consecutivos: a soma por mês é um bincount
+        meses = self.lancamentos['data'].to_numpy().astype('datetime64[M]').astype('int64')
+        primeiro = meses.min()
+        posicoes = meses - primeiro
+
+        return pd.DataFrame({
+            'entradas': np.bincount(posicoes, weights=np.where(despesas, 0.0, valores)),
+            'despesas': np.bincount(posicoes, weights=np.where(despesas, valores, 0.0))
+        }, index=pd.DatetimeIndex(
+            (primeiro + np.arange(posicoes.max() + 1)).astype('datetime64[M]').astype('datetime64[ns]'), name='inicio'
+        ))
+
+    def _planejado_por_mes(self) -> pd.Series:
+        """Total planejado nos orçamentos por mês (índice: primeiro dia do mês)."""
+        if self.orcamentos is None or self.orcamentos.empty:
+            return pd.Series(dtype='float64', index=pd.DatetimeIndex([], name='inicio'))
+
+        inicio = pd.to_datetime(pd.DataFrame({
+            'year': self.orcamentos['ano'].to_numpy(),
+            'month': self.orcamentos['mes'].to_numpy(),
+            'day': 1
+        }))
+
+        return self.orcamentos['valor_planejado'].groupby(inicio.to_numpy()).sum().rename_axis('inicio')
+
+    def serie_mensal(self) -> pd.DataFrame:
+        """
+        Indicadores mês a mês, com meses sem movimento preenchidos com zero.
+
+        Os meses vão de inicio a fim (ou do primeiro ao último mês com dados).
+        semaforo classifica a sobra (entradas - despesas): 'vermelho' se
+        negativa, 'amarelo' se menor que SOBRA_MINIMA_SEMAFORO das entradas,
+        'verde' caso contrário.
+
+        Returns:
+            DataFrame com as colunas de COLUNAS_SERIE_MENSAL
+        """
+        if self._serie is not None:
+            return self._serie
+
+        totais = self._totais_por_mes()
+        planejado = self._planejado_por_mes()
+
+        if self.inicio is not None and self.fim is not None:
+            meses = pd.date_range(self.inicio, self.fim, freq='MS', inclusive='left', name='inicio')
+        elif len(totais.index.union(planejado.index)):
+            datas = totais.index.union(planejado.index)
+            meses = pd.date_range(datas.min(), datas.max(), freq='MS', name='inicio')
+        else:
+            meses = pd.DatetimeIndex([], name='inicio')
+
+        serie = totais.reindex(meses, fill_value=0.0)
+        serie['planejado'] = planejado.reindex(meses, fill_value=0.0).to_numpy()
+
+        entradas = serie['entradas'].to_numpy()
+        despesas = serie['despesas'].to_numpy()
+        saldo = entradas - despesas
+
+        serie['saldo'] = saldo
+        serie['saldo_acumulado'] = np.cumsum(saldo)
+        serie['diferenca_planejado'] = serie['planejado'].to_numpy() - despesas
+        serie['percentual_gasto'] = np.divide(
+            despesas * 100, entradas, out=np.zeros_like(despesas), where=entradas > 0
+        )
+        serie['semaforo'] = pd.Categorical(
+            np.select([saldo < 0, saldo < entradas * SOBRA_MINIMA_SEMAFORO], CLASSES_SEMAFORO[:2], CLASSES_SEMAFORO[2]),
+            categories=CLASSES_SEMAFORO
+        )
+
+        self._serie = serie.reset_index()[COLUNAS_SERIE_MENSAL]
+        return self._serie
+
+    def indicadores(self) -> Dict:
+        """
+        Indicadores agregados da série mensal.
+
+        Returns:
+            Dicionário com totais do período, contagens de meses (saldo negativo,
+            acima do orçamento, por classe do semáforo), estatísticas de desvio
+            do orçamento, tendência das despesas, evolução do saldo acumulado e
+            melhor/pior mês (cada um com 'inicio' e o valor correspondente)
+        """
+        serie = self.serie_mensal()
+
+        if serie.empty:
+            return {}
+
+        entradas = serie['entradas'].to_numpy()
+        despesas = serie['despesas'].to_numpy()
+        saldo = serie['saldo'].to_numpy()
+        desvios = serie['diferenca_planejado'].to_numpy()
+        acumulado = serie['saldo_acumulado'].to_numpy()
+        meses = serie['inicio'].dt.date.to_numpy()
+
+        total_entradas = float(entradas.sum())
+        total_despesas = float(despesas.sum())
+        total_planejado = float(serie['planejado'].sum())
+
+        variacao_despesas = float(despesas[-1] - despesas[0])
+        semaforo = serie['semaforo'].value_counts().reindex(CLASSES_SEMAFORO, fill_value=0)
+
+        # argmax/argmin devolvem a primeira ocorrência, como idxmax/idxmin
+        return {
+            'total_entradas': total_entradas,
+            'total_despesas': total_despesas,
+            'saldo': total_entradas - total_despesas,
+            'total_planejado': total_planejado,
+            'diferenca_planejado': total_planejado - total_despesas,
+            'percentual_gasto': (total_despesas / total_entradas * 100) if total_entradas > 0 else 0.0,
+            'media_percentual_gasto': float(serie['percentual_gasto'].mean()),
+            'meses_saldo_negativo': int((saldo < 0).sum()),
+            'meses_acima_orcamento': int((desvios < 0).sum()),
+            'meses_dentro_orcamento': int((desvios >= 0).sum()),
+            'semaforo': {classe: int(quantidade) for classe, quantidade in semaforo.items()},
+            'desvio_total': float(desvios.sum()),
+            'desvio_medio': float(desvios.mean()),
+            'maior_economia': {'inicio': meses[desvios.argmax()], 'valor': float(desvios.max())},
+            'maior_estouro': {'inicio': meses[desvios.argmin()], 'valor': float(desvios.min())},
+            'melhor_mes': {'inicio': meses[saldo.argmax()], 'saldo': float(saldo.max())},
+            'pior_mes': {'inicio': meses[saldo.argmin()], 'saldo': float(saldo.min())},
+            'media_despesas': float(despesas.mean()),
+            'variacao_despesas': variacao_despesas,
+            'variacao_despesas_percentual': (variacao_despesas / despesas[0] * 100) if despesas[0] > 0 else 0.0,
+            'saldo_acumulado_final': float(acumulado[-1]),
+            'variacao_capital': float(acumulado[-1] - acumulado[0])
+        }
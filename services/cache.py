@@ -0,0 +1,242 @@
+from collections import OrderedDict
+from collections.abc import Sized
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional
+from sqlalchemy import bindparam, event, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from database.connection import db_manager
+from models.versao_dados import VersaoDados
+import inspect
+import threading
+import time
+
+
+# Número máximo de resultados mantidos no cache do processo
+TAMANHO_MAXIMO_CACHE = 2048
+
+# Resultados com mais itens (ou linhas de DataFrame) que isso não são armazenados (listagens completas do histórico)
+TAMANHO_MAXIMO_RESULTADO = 5000
+
+# Segundos durante os quais a versão lida do banco é reaproveitada (uma consulta por usuário e
+# janela, não por leitura): é o atraso máximo para ver escritas de outros processos
+VALIDADE_VERSAO_BANCO = 1.0
+
+# Marcação, por chamada, de leitura que falhou e não deve ser armazenada
+_leitura_falhou: ContextVar[bool] = ContextVar('_leitura_falhou', default=False)
+
+# Usuário do método de escrita em execução (invalida_cache), cujas transações incrementam a versão no banco
+_usuario_em_escrita: ContextVar[Optional[int]] = ContextVar('_usuario_em_escrita', default=None)
+
+
+class CacheServicos:
+    """
+    Cache LRU, compartilhado pelo processo, dos resultados de leitura dos serviços.
+
+    As chaves incluem a versão dos dados do usuário, incrementada por toda
+    escrita; assim uma escrita torna inalcançáveis os resultados anteriores
+    daquele usuário, que acabam descartados pela política LRU.
+
+    Há duas versões: a do processo (_versoes) e a gravada no banco
+    (versoes_dados), incrementada na própria transação de cada escrita.
+    A do banco faz as escritas de outros processos, como importar_csv.py e
+    reconstruir_resumo.py ou outra instância da aplicação, também
+    invalidarem o cache, sem reiniciar a aplicação. Ela é relida no máximo
+    a cada VALIDADE_VERSAO_BANCO segundos por usuário, e logo após as
+    escritas do próprio processo.
+    """
+
+    def __init__(self, tamanho_maximo: int = TAMANHO_MAXIMO_CACHE):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens: OrderedDict = OrderedDict()
+        self._versoes: Dict[int, int] = {}
+        self._versoes_banco: Dict[int, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def versao(self, usuario_id: int) -> int:
+        """Retorna a versão atual dos dados de um usuário."""
+        return self._versoes.get(usuario_id, 0)
+
+    def versao_banco(self, usuario_id: int) -> int:
+        """
+        Retorna a versão dos dados de um usuário no banco, relida após VALIDADE_VERSAO_BANCO segundos.
+
+        Raises:
+            SQLAlchemyError: Se a versão precisar ser relida e o banco falhar
+        """
+        agora = time.monotonic()
+        lida = self._versoes_banco.get(usuario_id)
+        if lida is not None and agora - lida[1] < VALIDADE_VERSAO_BANCO:
+            return lida[0]
+
+        versao = versao_no_banco(usuario_id)
+        with self._lock:
+            self._versoes_banco[usuario_id] = (versao, agora)
+        return versao
+
+    def invalidar_usuario(self, usuario_id: int):
+        """Invalida todos os resultados em cache de um usuário."""
+        with self._lock:
+            self._versoes[usuario_id] = self._versoes.get(usuario_id, 0) + 1
+            # A escrita também mudou a versão no banco: relida na próxima leitura
+            self._versoes_banco.pop(usuario_id, None)
+
+    def limpar(self):
+        """Remove todos os resultados (usado após manutenções fora dos serviços)."""
+        with self._lock:
+            self._itens.clear()
+            self._versoes.clear()
+            self._versoes_banco.clear()
+
+    def obter(self, chave: Hashable) -> tuple[bool, Any]:
+        """
+        Busca um resultado no cache.
+
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        with self._lock:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return True, self._itens[chave]
+
+            self.falhas += 1
+            return False, None
+
+    def armazenar(self, chave: Hashable, valor: Any):
+        """Armazena um resultado, descartando o menos usado se o cache estiver cheio."""
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+
+    def estatisticas(self) -> Dict:
+        """Retorna contadores de uso do cache."""
+        with self._lock:
+            consultas = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': (self.acertos / consultas * 100) if consultas > 0 else 0.0
+            }
+
+
+# Instância global do cache de serviços
+cache_servicos = CacheServicos()
+
+# Montada uma única vez: executada a cada releitura da versão
+_CONSULTA_VERSAO = select(VersaoDados.versao).where(VersaoDados.usuario_id == bindparam('usuario_id'))
+
+
+def versao_no_banco(usuario_id: int) -> int:
+    """Versão dos dados do usuário gravada no banco (0 se ele ainda não teve escritas)."""
+    with db_manager.engine_leitura.connect() as conexao:
+        return conexao.execute(_CONSULTA_VERSAO, {'usuario_id': usuario_id}).scalar() or 0
+
+
+@event.listens_for(Session, 'before_commit')
+def _incrementar_versao_no_banco(session: Session):
+    """Incrementa a versão do usuário em escrita na mesma transação, antes do commit."""
+    usuario_id = _usuario_em_escrita.get()
+    if usuario_id is None:
+        return
+
+    # UPDATE primeiro, como no resumo mensal: no SQLite ele já reserva a escrita
+    resultado = session.execute(
+        update(VersaoDados).where(VersaoDados.usuario_id == usuario_id).values(versao=VersaoDados.versao + 1)
+    )
+    if resultado.rowcount == 0:
+        session.execute(insert(VersaoDados).values(usuario_id=usuario_id, versao=1))
+
+
+def _argumentos(assinatura: inspect.Signature, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    """Normaliza argumentos posicionais e nomeados em um dicionário por nome."""
+    vinculados = assinatura.bind(*args, **kwargs)
+    vinculados.apply_defaults()
+    return vinculados.arguments
+
+
+def leitura_em_cache(funcao: Callable) -> Callable:
+    """
+    Decorador para métodos de leitura que recebem usuario_id.
+
+    Os resultados são compartilhados entre chamadas e não devem ser modificados.
+    """
+    assinatura = inspect.signature(funcao)
+
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        argumentos = _argumentos(assinatura, args, kwargs)
+        usuario_id = argumentos['usuario_id']
+
+        try:
+            versao_banco = cache_servicos.versao_banco(usuario_id)
+        except SQLAlchemyError:
+            # Sem como saber se outro processo escreveu: executa sem cache
+            return funcao(*args, **kwargs)
+
+        chave = (funcao.__qualname__, tuple(argumentos.items()), cache_servicos.versao(usuario_id), versao_banco)
+
+        try:
+            encontrado, valor = cache_servicos.obter(chave)
+        except TypeError:
+            # Argumento não hashable: executa sem cache
+            return funcao(*args, **kwargs)
+
+        if encontrado:
+            return valor
+
+        marcador = _leitura_falhou.set(False)
+        try:
+            valor = funcao(*args, **kwargs)
+        finally:
+            falhou = _leitura_falhou.get()
+            _leitura_falhou.reset(marcador)
+
+        if falhou:
+            # Propaga a falha para leituras externas que dependem desta
+            _leitura_falhou.set(True)
+
+        tamanho = len(valor) if isinstance(valor, Sized) and not isinstance(valor, str) else 0
+        if not falhou and tamanho <= TAMANHO_MAXIMO_RESULTADO:
+            cache_servicos.armazenar(chave, valor)
+
+        return valor
+
+    return wrapper
+
+
+def invalida_cache(funcao: Callable) -> Callable:
+    """
+    Decorador para métodos de escrita que recebem usuario_id: invalida o cache do usuário.
+
+    Toda transação confirmada durante a chamada também incrementa a versão
+    do usuário no banco, o que invalida o cache dos demais processos.
+    """
+    assinatura = inspect.signature(funcao)
+
+    @wraps(funcao)
+    def wrapper(*args, **kwargs):
+        usuario_id = _argumentos(assinatura, args, kwargs)['usuario_id']
+        marcador = _usuario_em_escrita.set(usuario_id)
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            _usuario_em_escrita.reset(marcador)
+            # Após o commit: leituras iniciadas antes ficam presas à versão antiga
+            cache_servicos.invalidar_usuario(usuario_id)
+
+    return wrapper
+
+
+def registrar_falha_leitura():
+    """Indica que a leitura corrente falhou e seu resultado padrão não deve ir para o cache."""
+    _leitura_falhou.set(True)
@@ -1,12 +1,14 @@
 from typing import List, Optional
 from models.categoria import Categoria, TipoCategoria
 from database.connection import db_manager
+from services.cache import leitura_em_cache, invalida_cache, registrar_falha_leitura
 
 
 class CategoriaService:
     """Serviço para gerenciamento de categorias."""
     
     @staticmethod
+    @leitura_em_cache
     def listar_categorias(usuario_id: int, tipo: Optional[TipoCategoria] = None) -> List[dict]:
         """
         Lista todas as categorias de um usuário.
@@ -19,7 +21,7 @@ class CategoriaService:
             Lista de categorias
         """
         try:
-            with db_manager.get_session() as session:
+            with db_manager.get_session_leitura() as session:
                 query = session.query(Categoria).filter_by(usuario_id=usuario_id)
                 
                 if tipo:
@@ -39,10 +41,12 @@ class CategoriaService:
                 
                 return resultado
         except Exception as e:
+            registrar_falha_leitura()
             print(f"Erro ao listar categorias: {e}")
             return []
     
     @staticmethod
+    @invalida_cache
     def criar_categoria(usuario_id: int, nome: str, tipo: TipoCategoria, cor: str = '#3498db') -> tuple[bool, str, Optional[Categoria]]:
         """
         Cria uma nova categoria.
@@ -82,6 +86,7 @@ class CategoriaService:
             return False, f"Erro ao criar categoria: {str(e)}", None
     
     @staticmethod
+    @invalida_cache
     def atualizar_categoria(categoria_id: int, usuario_id: int, nome: str, cor: str) -> tuple[bool, str]:
         """
         Atualiza uma categoria existente.
@@ -123,6 +128,7 @@ class CategoriaService:
             return False, f"Erro ao atualizar categoria: {str(e)}"
     
     @staticmethod
+    @invalida_cache
     def excluir_categoria(categoria_id: int, usuario_id: int) -> tuple[bool, str]:
         """
         Exclui uma categoria.
@@ -148,16 +154,20 @@ class CategoriaService:
                 if categoria.lancamentos:
                     return False, "Não é possível excluir categoria com lançamentos associados!"
                 
+                if categoria.recorrencias:
+                    return False, "Não é possível excluir categoria com recorrências associadas!"
+                
                 session.delete(categoria)
                 return True, "Categoria excluída com sucesso!"
         except Exception as e:
             return False, f"Erro ao excluir categoria: {str(e)}"
     
     @staticmethod
+    @leitura_em_cache
     def obter_categoria(categoria_id: int, usuario_id: int) -> Optional[dict]:
         """Obtém uma categoria específica."""
         try:
-            with db_manager.get_session() as session:
+            with db_manager.get_session_leitura() as session:
                 categoria = session.query(Categoria).filter_by(
                     id=categoria_id,
                     usuario_id=usuario_id
@@ -173,4 +183,5 @@ class CategoriaService:
                 
                 return None
         except Exception:
+            registrar_falha_leitura()
             return None
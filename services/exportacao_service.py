@@ -0,0 +1,231 @@
+from typing import BinaryIO, Iterator, List, Optional, Union
+from datetime import date
+from itertools import islice
+import csv
+import heapq
+import io
+from sqlalchemy import select
+from models.lancamento import Lancamento
+from models.categoria import Categoria
+from database.connection import db_manager
+from services.recorrencia_service import RecorrenciaService
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet é opcional
+    pa = None
+    pq = None
+
+
+# Linhas buscadas do banco e gravadas no arquivo por vez
+LINHAS_POR_LOTE_EXPORTACAO = 10000
+
+# Colunas exportadas (data, descricao, valor, categoria e tipo são as mesmas da importação)
+COLUNAS_EXPORTACAO = ['data', 'descricao', 'valor', 'categoria', 'tipo', 'tipo_categoria']
+
+# Formatos de arquivo suportados
+FORMATOS_EXPORTACAO = ('csv', 'parquet')
+
+
+class ExportacaoService:
+    """Serviço de exportação do histórico de lançamentos com uso de memória constante."""
+
+    @staticmethod
+    def parquet_disponivel() -> bool:
+        """Indica se o pyarrow está instalado para exportar em Parquet."""
+        return pq is not None
+
+    @staticmethod
+    def iterar_lancamentos(
+        usuario_id: int,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        categoria_id: Optional[int] = None,
+        incluir_recorrencias: bool = True,
+        tamanho_lote: int = LINHAS_POR_LOTE_EXPORTACAO
+    ) -> Iterator[List[tuple]]:
+        """
+        Percorre os lançamentos em ordem de data, em lotes de tuplas.
+
+        As linhas vêm do cursor aos poucos (yield_per/stream_results), sem
+        carregar o histórico inteiro; ocorrências de recorrências são
+        intercaladas na ordem das datas.
+
+        Args:
+            usuario_id: ID do usuário
+            inicio: Data inicial (inclusiva)
+            fim: Data final (exclusiva)
+            categoria_id: Filtro opcional por categoria
+            incluir_recorrencias: Inclui as ocorrências calculadas das recorrências
+            tamanho_lote: Linhas por lote
+
+        Yields:
+            Listas de tuplas na ordem de COLUNAS_EXPORTACAO
+        """
+        consulta = select(
+            Lancamento.data,
+            Lancamento.descricao,
+            Lancamento.valor,
+            Categoria.nome,
+            Lancamento.tipo,
+            Categoria.tipo
+        ).join(
+            Categoria, Categoria.id == Lancamento.categoria_id
+        ).where(
+            Lancamento.usuario_id == usuario_id
+        ).order_by(Lancamento.data, Lancamento.id)
+
+        if inicio:
+            consulta = consulta.where(Lancamento.data >= inicio)
+        if fim:
+            consulta = consulta.where(Lancamento.data < fim)
+        if categoria_id:
+            consulta = consulta.where(Lancamento.categoria_id == categoria_id)
+
+        with db_manager.get_session_leitura() as session:
+            ocorrencias = []
+            if incluir_recorrencias:
+                ocorrencias = sorted(
+                    (
+                        (o['data'], o['descricao'], o['valor'], o['categoria_nome'], o['tipo'], o['categoria_tipo'])
+                        for o in RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim, categoria_id)
+                    ),
+                    key=lambda linha: linha[0]
+                )
+
+            # Execução Core na conexão da sessão: linhas sem o processamento do ORM
+            resultado = session.connection().execution_options(
+                yield_per=tamanho_lote,
+                stream_results=True
+            ).execute(consulta).tuples()
+
+            linhas = resultado
+            if ocorrencias:
+                # Intercala duas sequências já ordenadas por data sem materializá-las
+                linhas = heapq.merge(resultado, ocorrencias, key=lambda linha: linha[0])
+            linhas = (
+                (data_lanc, descricao, valor, categoria, tipo.value, tipo_categoria.value)
+                for data_lanc, descricao, valor, categoria, tipo, tipo_categoria in linhas
+            )
+
+            while True:
+                lote = list(islice(linhas, tamanho_lote))
+                if not lote:
+                    break
+                yield lote
+
+    @staticmethod
+    def _linhas_csv(lote: List[tuple]) -> Iterator[tuple]:
+        """Formata um lote para CSV: datas em DD/MM/AAAA e valores com vírgula decimal."""
+        # Poucas datas distintas por lote: cada uma é formatada uma única vez
+        datas = {data_lanc: data_lanc.strftime('%d/%m/%Y') for data_lanc in {linha[0] for linha in lote}}
+        return (
+            (datas[data_lanc], descricao, f"{valor:.2f}".replace('.', ','), categoria, tipo, tipo_categoria)
+            for data_lanc, descricao, valor, categoria, tipo, tipo_categoria in lote
+        )
+
+    @staticmethod
+    def _escrever_csv(
+        saida: BinaryIO,
+        usuario_id: int,
+        inicio: Optional[date],
+        fim: Optional[date],
+        categoria_id: Optional[int],
+        incluir_recorrencias: bool
+    ) -> int:
+        """Grava o CSV lote a lote em um arquivo binário e retorna o total de linhas."""
+        # BOM (utf-8-sig) para o Excel reconhecer UTF-8
+        texto = io.TextIOWrapper(saida, encoding='utf-8-sig', newline='')
+        try:
+            escritor = csv.writer(texto, delimiter=';')
+            escritor.writerow(COLUNAS_EXPORTACAO)
+
+            total = 0
+            for lote in ExportacaoService.iterar_lancamentos(usuario_id, inicio, fim, categoria_id, incluir_recorrencias):
+                escritor.writerows(ExportacaoService._linhas_csv(lote))
+                total += len(lote)
+        finally:
+            # Devolve o arquivo binário aberto para quem o forneceu
+            texto.flush()
+            texto.detach()
+
+        return total
+
+    @staticmethod
+    def _escrever_parquet(
+        saida: Union[str, BinaryIO],
+        usuario_id: int,
+        inicio: Optional[date],
+        fim: Optional[date],
+        categoria_id: Optional[int],
+        incluir_recorrencias: bool
+    ) -> int:
+        """Grava um lote por row group no arquivo Parquet e retorna o total de linhas."""
+        esquema = pa.schema([
+            ('data', pa.date32()),
+            ('descricao', pa.string()),
+            ('valor', pa.float64()),
+            ('categoria', pa.string()),
+            ('tipo', pa.string()),
+            ('tipo_categoria', pa.string())
+        ])
+
+        total = 0
+        with pq.ParquetWriter(saida, esquema) as escritor:
+            for lote in ExportacaoService.iterar_lancamentos(usuario_id, inicio, fim, categoria_id, incluir_recorrencias):
+                colunas = [list(coluna) for coluna in zip(*lote)]
+                escritor.write_table(pa.Table.from_arrays(colunas, schema=esquema))
+                total += len(lote)
+
+        return total
+
+    @staticmethod
+    def exportar(
+        usuario_id: int,
+        destino: Union[str, BinaryIO],
+        formato: str = 'csv',
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        categoria_id: Optional[int] = None,
+        incluir_recorrencias: bool = True
+    ) -> tuple[bool, str, int]:
+        """
+        Exporta os lançamentos de um usuário para um arquivo.
+
+        Args:
+            usuario_id: ID do usuário
+            destino: Caminho do arquivo ou arquivo binário aberto
+            formato: 'csv' ou 'parquet' (requer pyarrow)
+            inicio: Data inicial (inclusiva)
+            fim: Data final (exclusiva)
+            categoria_id: Filtro opcional por categoria
+            incluir_recorrencias: Inclui as ocorrências calculadas das recorrências
+
+        Returns:
+            Tupla (sucesso, mensagem, linhas exportadas)
+        """
+        if formato not in FORMATOS_EXPORTACAO:
+            return False, f"Formato inválido: {formato}. Use um de {list(FORMATOS_EXPORTACAO)}", 0
+
+        if formato == 'parquet' and not ExportacaoService.parquet_disponivel():
+            return False, "Exportação em Parquet requer o pacote pyarrow (pip install pyarrow)", 0
+
+        try:
+            if formato == 'parquet':
+                total = ExportacaoService._escrever_parquet(
+                    destino, usuario_id, inicio, fim, categoria_id, incluir_recorrencias
+                )
+            elif isinstance(destino, str):
+                with open(destino, 'wb') as saida:
+                    total = ExportacaoService._escrever_csv(
+                        saida, usuario_id, inicio, fim, categoria_id, incluir_recorrencias
+                    )
+            else:
+                total = ExportacaoService._escrever_csv(
+                    destino, usuario_id, inicio, fim, categoria_id, incluir_recorrencias
+                )
+
+            return True, f"{total} lançamentos exportados com sucesso!", total
+        except Exception as e:
+            return False, f"Erro ao exportar lançamentos: {str(e)}", 0
@@ -0,0 +1,399 @@
+from typing import Callable, Dict, Iterator, Optional, TextIO, Union
+import csv
+import os
+import time
+import pandas as pd
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import Session
+from models.lancamento import Lancamento, TipoLancamento
+from models.categoria import Categoria
+from models.progresso_importacao import ProgressoImportacao
+from database.connection import db_manager
+from services.cache import invalida_cache
+from services.resumo_service import ResumoService
+from services.sugestao_service import ModeloCategorias, SugestaoService
+
+
+# Linhas lidas e gravadas por transação
+TAMANHO_LOTE_IMPORTACAO = 50000
+
+# Colunas obrigatórias do arquivo (tipo e categoria são opcionais)
+COLUNAS_IMPORTACAO = ['data', 'descricao', 'valor']
+
+# Erros devolvidos no resumo da importação (o relatório completo vai para o arquivo de erros)
+AMOSTRA_ERROS = 100
+
+# Cabeçalho do relatório de erros
+COLUNAS_RELATORIO_ERROS = ['linha', 'motivo', 'data', 'descricao', 'valor', 'categoria']
+
+# Valores aceitos na coluna tipo
+TIPOS_IMPORTACAO = {
+    'fixa': TipoLancamento.FIXA,
+    'fixo': TipoLancamento.FIXA,
+    'variavel': TipoLancamento.VARIAVEL,
+    'variável': TipoLancamento.VARIAVEL,
+    '': TipoLancamento.VARIAVEL,
+}
+
+
+class ImportacaoService:
+    """Serviço de importação em massa de lançamentos a partir de arquivos CSV."""
+
+    @staticmethod
+    def contar_linhas(caminho: str) -> int:
+        """Conta as linhas de dados de um arquivo (sem o cabeçalho), para exibir o progresso."""
+        linhas = 0
+        with open(caminho, 'rb') as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b''):
+                linhas += bloco.count(b'\n')
+        return max(linhas - 1, 0)
+
+    @staticmethod
+    def _mapa_categorias(usuario_id: int) -> Dict[str, int]:
+        """Dicionário {nome da categoria normalizado: id} com as categorias do usuário."""
+        with db_manager.get_session_leitura() as session:
+            linhas = session.execute(
+                select(Categoria.id, Categoria.nome).where(Categoria.usuario_id == usuario_id)
+            ).all()
+        return {nome.strip().casefold(): categoria_id for categoria_id, nome in linhas}
+
+    @staticmethod
+    def converter_valores(serie: pd.Series) -> pd.Series:
+        """
+        Converte valores no formato brasileiro ('1.234,56', 'R$ -10,00') para float.
+
+        Valores inválidos viram NaN.
+        """
+        texto = (
+            serie.astype(str)
+            .str.replace('R$', '', regex=False)
+            .str.replace(' ', '', regex=False)
+            .str.replace('.', '', regex=False)
+            .str.replace(',', '.', regex=False)
+        )
+        return pd.to_numeric(texto, errors='coerce')
+
+    @staticmethod
+    def converter_datas(serie: pd.Series) -> pd.Series:
+        """Converte datas 'DD/MM/AAAA' para datetime; datas inválidas viram NaT."""
+        return pd.to_datetime(serie.str.strip(), format='%d/%m/%Y', errors='coerce')
+
+    @staticmethod
+    def _ler_progresso(usuario_id: int, arquivo: str) -> int:
+        """Retorna quantos registros do arquivo já foram importados (0 sem importação interrompida)."""
+        with db_manager.get_session_leitura() as session:
+            return session.execute(
+                select(ProgressoImportacao.registros_processados).where(
+                    ProgressoImportacao.usuario_id == usuario_id,
+                    ProgressoImportacao.arquivo == os.path.abspath(arquivo)
+                )
+            ).scalar() or 0
+
+    @staticmethod
+    def _descartar_progresso(usuario_id: int, arquivo: str):
+        """Remove o progresso de uma importação do arquivo (concluída ou reiniciada do começo)."""
+        with db_manager.get_session() as session:
+            session.execute(delete(ProgressoImportacao).where(
+                ProgressoImportacao.usuario_id == usuario_id,
+                ProgressoImportacao.arquivo == os.path.abspath(arquivo)
+            ))
+
+    @staticmethod
+    def _registrar_progresso(session: Session, usuario_id: int, arquivo: str, registros_processados: int):
+        """Grava o progresso na transação do lote: lote e posição são confirmados (ou desfeitos) juntos."""
+        arquivo = os.path.abspath(arquivo)
+        resultado = session.execute(
+            update(ProgressoImportacao).where(
+                ProgressoImportacao.usuario_id == usuario_id,
+                ProgressoImportacao.arquivo == arquivo
+            ).values(registros_processados=registros_processados)
+        )
+        if resultado.rowcount == 0:
+            session.execute(insert(ProgressoImportacao).values(
+                usuario_id=usuario_id, arquivo=arquivo, registros_processados=registros_processados
+            ))
+
+    @staticmethod
+    def _pular_registros(leitor: Iterator[pd.DataFrame], quantidade: int) -> Iterator[pd.DataFrame]:
+        """
+        Descarta os primeiros registros lidos, já importados.
+
+        Os registros são contados pelo próprio leitor (linhas em branco
+        incluídas), a mesma contagem gravada no progresso; skiprows contaria
+        linhas físicas e divergiria dela.
+        """
+        for lote in leitor:
+            if quantidade >= len(lote):
+                quantidade -= len(lote)
+                continue
+            yield lote.iloc[quantidade:] if quantidade else lote
+            quantidade = 0
+
+    @staticmethod
+    def _validar_lote(
+        lote: pd.DataFrame,
+        mapa_categorias: Dict[str, int],
+        modelo: Optional[ModeloCategorias] = None
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Converte e valida um lote de linhas de forma vetorizada.
+
+        Linhas com a categoria em branco recebem a categoria sugerida pelo
+        modelo (histórico do usuário), quando informado.
+
+        Returns:
+            Tupla (linhas válidas com colunas convertidas, linhas inválidas com o motivo)
+        """
+        datas = ImportacaoService.converter_datas(lote['data'])
+        # Arredondados a centavos como a coluna valor (Centavos) os grava: o resumo soma os mesmos valores
+        valores = (ImportacaoService.converter_valores(lote['valor']) * 100).round() / 100
+        nomes_categoria = lote['categoria'].fillna('').str.strip().str.casefold()
+        categorias = nomes_categoria.map(mapa_categorias)
+
+        sem_categoria = nomes_categoria == ''
+        if modelo is not None and sem_categoria.any():
+            sugeridas = SugestaoService.classificar_lote(modelo, lote.loc[sem_categoria, 'descricao'].tolist())
+            categorias = categorias.mask(sem_categoria, pd.Series(sugeridas, index=lote.index[sem_categoria], dtype=float))
+
+        if 'tipo' in lote.columns:
+            tipos = lote['tipo'].fillna('').str.strip().str.casefold().map(TIPOS_IMPORTACAO)
+        else:
+            tipos = pd.Series(TipoLancamento.VARIAVEL, index=lote.index, dtype=object)
+
+        # O primeiro problema encontrado em cada linha é o motivo reportado
+        motivo = pd.Series(None, index=lote.index, dtype=object)
+        motivo = motivo.mask(motivo.isna() & tipos.isna(), 'Tipo inválido (use Fixa ou Variável)')
+        motivo = motivo.mask(motivo.isna() & categorias.isna() & sem_categoria, 'Categoria em branco e sem sugestão pelo histórico')
+        motivo = motivo.mask(motivo.isna() & categorias.isna(), 'Categoria não encontrada')
+        motivo = motivo.mask(motivo.isna() & ((valores == 0) | valores.isna()), 'Valor inválido')
+        motivo = motivo.mask(motivo.isna() & datas.isna(), 'Data inválida (use DD/MM/AAAA)')
+
+        invalidas = lote.loc[motivo.notna()].assign(motivo=motivo[motivo.notna()])
+
+        validas = pd.DataFrame({
+            'data': datas,
+            'valor': valores.abs(),  # Garante valor positivo
+            'descricao': lote['descricao'].fillna('').str.strip().str.slice(0, 255),
+            'categoria_id': categorias,
+            'tipo': tipos,
+            'sugerida': sem_categoria
+        }).loc[motivo.isna()]
+
+        return validas, invalidas
+
+    @staticmethod
+    def _gravar_lote(
+        usuario_id: int,
+        validas: pd.DataFrame,
+        arquivo: Optional[str] = None,
+        registros_processados: int = 0
+    ):
+        """
+        Insere um lote válido e atualiza o resumo mensal na mesma transação.
+
+        Com arquivo, a mesma transação grava o progresso da importação
+        (registros_processados), inclusive em lotes sem linhas válidas.
+        """
+        if validas.empty:
+            if arquivo:
+                with db_manager.get_session() as session:
+                    ImportacaoService._registrar_progresso(session, usuario_id, arquivo, registros_processados)
+            return
+
+        datas = validas['data']
+        categorias = validas['categoria_id'].astype(int)
+
+        linhas = [
+            {
+                'usuario_id': usuario_id,
+                'categoria_id': categoria_id,
+                'data': data,
+                'valor': valor,
+                'descricao': descricao,
+                'tipo': tipo
+            }
+            for categoria_id, data, valor, descricao, tipo in zip(
+                categorias.tolist(),
+                datas.dt.date.tolist(),
+                validas['valor'].tolist(),
+                validas['descricao'].tolist(),
+                validas['tipo'].tolist()
+            )
+        ]
+
+        # Efeito do lote no resumo, agregado por mês e categoria em centavos inteiros (soma exata)
+        centavos = (validas['valor'] * 100).round().astype('int64')
+        agregado = centavos.groupby(
+            [datas.dt.year.rename('ano'), datas.dt.month.rename('mes'), categorias]
+        ).agg(['sum', 'count'])
+        deltas = {
+            (int(ano), int(mes), int(categoria_id)): (int(total) / 100, int(quantidade))
+            for (ano, mes, categoria_id), (total, quantidade) in zip(agregado.index, agregado.values)
+        }
+
+        with db_manager.get_session() as session:
+            # Core + lista de parâmetros: executemany sem instanciar objetos ORM
+            session.execute(insert(Lancamento.__table__), linhas)
+            ResumoService.aplicar_deltas(session, usuario_id, deltas)
+            SugestaoService.registrar(session, usuario_id, zip(categorias.tolist(), validas['descricao'].tolist()))
+            if arquivo:
+                ImportacaoService._registrar_progresso(session, usuario_id, arquivo, registros_processados)
+
+    @staticmethod
+    @invalida_cache
+    def importar_csv(
+        usuario_id: int,
+        origem: Union[str, TextIO],
+        separador: str = ';',
+        tamanho_lote: int = TAMANHO_LOTE_IMPORTACAO,
+        retomar: bool = False,
+        relatorio_erros: Optional[Union[str, TextIO]] = None,
+        progresso: Optional[Callable[[int, int, int], None]] = None
+    ) -> tuple[bool, str, Dict]:
+        """
+        Importa lançamentos de um CSV, lendo e gravando em lotes.
+
+        O arquivo deve ter cabeçalho com as colunas data, descricao e valor
+        (categoria e tipo são opcionais). Datas no formato DD/MM/AAAA e
+        valores no formato brasileiro. Linhas sem categoria são classificadas
+        pela descrição, com o histórico do usuário (ver SugestaoService). Cada
+        lote é gravado em uma transação; linhas inválidas são puladas e
+        descritas no relatório de erros; linhas em branco são ignoradas.
+
+        Ao importar um arquivo em disco, cada transação também grava quantos
+        registros do arquivo já foram processados (progresso_importacoes):
+        com retomar, a importação continua do primeiro registro não confirmado.
+
+        Args:
+            usuario_id: ID do usuário
+            origem: Caminho do arquivo ou arquivo aberto (ex.: upload)
+            separador: Separador de colunas
+            tamanho_lote: Linhas por lote/transação
+            retomar: Continua uma importação interrompida do mesmo arquivo e usuário
+            relatorio_erros: Caminho ou arquivo de texto que recebe as linhas inválidas em CSV
+            progresso: Função chamada após cada lote com (linhas lidas, importadas, erros)
+
+        Returns:
+            Tupla (sucesso, mensagem, resumo) onde resumo tem linhas, importados,
+            categorias_sugeridas, erros, retomado_de, duracao e amostra_erros
+        """
+        inicio = time.perf_counter()
+        resumo = {
+            'linhas': 0,
+            'importados': 0,
+            'categorias_sugeridas': 0,
+            'erros': 0,
+            'retomado_de': 0,
+            'duracao': 0.0,
+            'amostra_erros': []
+        }
+
+        arquivo_caminho = origem if isinstance(origem, str) else None
+        if retomar and not arquivo_caminho:
+            return False, "Só é possível retomar a importação de um arquivo em disco!", resumo
+
+        saida_erros = None
+        try:
+            mapa_categorias = ImportacaoService._mapa_categorias(usuario_id)
+            if not mapa_categorias:
+                return False, "Cadastre categorias antes de importar lançamentos!", resumo
+
+            ja_processadas = 0
+            if arquivo_caminho:
+                if retomar:
+                    ja_processadas = ImportacaoService._ler_progresso(usuario_id, arquivo_caminho)
+                else:
+                    ImportacaoService._descartar_progresso(usuario_id, arquivo_caminho)
+            resumo['retomado_de'] = ja_processadas
+            resumo['linhas'] = ja_processadas
+
+            leitor = pd.read_csv(
+                origem,
+                sep=separador,
+                dtype=str,
+                keep_default_na=False,
+                encoding='utf-8-sig',
+                chunksize=tamanho_lote,
+                # Linhas em branco viram registros vazios: a contagem de registros é a das linhas do arquivo
+                skip_blank_lines=False
+            )
+            if ja_processadas:
+                leitor = ImportacaoService._pular_registros(leitor, ja_processadas)
+
+            if isinstance(relatorio_erros, str):
+                # Ao retomar, o relatório continua no mesmo arquivo
+                novo_relatorio = not (ja_processadas and os.path.exists(relatorio_erros))
+                saida_erros = open(relatorio_erros, 'a' if not novo_relatorio else 'w', newline='', encoding='utf-8')
+            else:
+                novo_relatorio = True
+                saida_erros = relatorio_erros
+
+            escritor_erros = csv.writer(saida_erros, delimiter=separador) if saida_erros else None
+            if escritor_erros and novo_relatorio:
+                escritor_erros.writerow(COLUNAS_RELATORIO_ERROS)
+
+            for registros in leitor:
+                registros.columns = [coluna.strip().casefold() for coluna in registros.columns]
+                faltantes = [coluna for coluna in COLUNAS_IMPORTACAO if coluna not in registros.columns]
+                if faltantes:
+                    return False, f"Colunas obrigatórias ausentes: {', '.join(faltantes)}", resumo
+
+                # Linhas em branco (ou só com separadores) são ignoradas, mas contam na posição do arquivo
+                em_branco = (registros.apply(lambda coluna: coluna.str.strip()) == '').all(axis=1)
+                lote = registros.loc[~em_branco].copy()
+                if 'categoria' not in lote.columns:
+                    lote['categoria'] = ''
+
+                # Relido a cada lote (contagens, não o histórico): inclui os lotes já gravados
+                em_branco = (lote['categoria'].fillna('').str.strip() == '').any()
+                modelo = SugestaoService.carregar_modelo(usuario_id) if em_branco else None
+                validas, invalidas = ImportacaoService._validar_lote(lote, mapa_categorias, modelo)
+
+                ImportacaoService._gravar_lote(
+                    usuario_id, validas, arquivo_caminho, resumo['linhas'] + len(registros)
+                )
+
+                # Número da linha no arquivo: cabeçalho é a linha 1; a posição conta as linhas em branco
+                numeros_linha = resumo['linhas'] + 2 + registros.index.get_indexer(invalidas.index)
+                registros_erro = [
+                    [numero, linha.motivo, linha.data, linha.descricao, linha.valor, linha.categoria]
+                    for numero, linha in zip(numeros_linha.tolist(), invalidas.itertuples(index=False))
+                ]
+
+                if escritor_erros:
+                    escritor_erros.writerows(registros_erro)
+                espaco_amostra = AMOSTRA_ERROS - len(resumo['amostra_erros'])
+                if espaco_amostra > 0:
+                    resumo['amostra_erros'].extend(
+                        dict(zip(COLUNAS_RELATORIO_ERROS, registro)) for registro in registros_erro[:espaco_amostra]
+                    )
+
+                resumo['linhas'] += len(registros)
+                resumo['importados'] += len(validas)
+                resumo['categorias_sugeridas'] += int(validas['sugerida'].sum())
+                resumo['erros'] += len(invalidas)
+
+                if saida_erros:
+                    saida_erros.flush()
+
+                if progresso:
+                    progresso(resumo['linhas'], resumo['importados'], resumo['erros'])
+        except Exception as e:
+            resumo['duracao'] = time.perf_counter() - inicio
+            return False, f"Erro ao importar lançamentos (linhas confirmadas: {resumo['linhas']}): {str(e)}", resumo
+        finally:
+            if saida_erros is not None and isinstance(relatorio_erros, str):
+                saida_erros.close()
+
+        # Importação concluída: o progresso não é mais necessário
+        if arquivo_caminho:
+            ImportacaoService._descartar_progresso(usuario_id, arquivo_caminho)
+
+        resumo['duracao'] = time.perf_counter() - inicio
+        mensagem = f"{resumo['importados']} lançamentos importados"
+        if resumo['categorias_sugeridas']:
+            mensagem += f" ({resumo['categorias_sugeridas']} com categoria sugerida pelo histórico)"
+        if resumo['erros']:
+            mensagem += f", {resumo['erros']} linhas com erro"
+
+        return True, mensagem + "!", resumo
@@ -1,15 +1,58 @@
-from typing import List, Optional
-from datetime import date, datetime
+import base64
+import enum
+from itertools import islice
+from typing import Dict, List, Optional, Type
+from datetime import date, datetime, timedelta
+from dateutil.relativedelta import relativedelta
+import numpy as np
+import pandas as pd
 from models.lancamento import Lancamento, TipoLancamento
 from models.categoria import Categoria, TipoCategoria
+from models.resumo_mensal import ResumoMensal
 from database.connection import db_manager
-from sqlalchemy import func, extract
+from database.busca import TABELA_BUSCA, tabela_busca, palavras_busca, expressao_busca, corresponde
+from database.tipos import codigo_enum
+from services.cache import leitura_em_cache, invalida_cache, registrar_falha_leitura
+from utils.periodo import Periodo
+from services.resumo_service import ResumoService
+from services.sugestao_service import SugestaoService
+from services.recorrencia_service import RecorrenciaService
+from sqlalchemy import func, extract, case, select, insert, and_, or_, type_coerce, literal_column, Integer, String, Select
+
+
+# Lançamentos por página em listar_lancamentos_pagina
+TAMANHO_PAGINA_LANCAMENTOS = 50
+
+# Resultados devolvidos por buscar, dos mais relevantes
+LIMITE_BUSCA = 100
+
+# Linhas lidas por vez do cursor na busca sem o índice de texto completo
+LINHAS_POR_LOTE_BUSCA = 5000
+
+# Linhas convertidas por vez em listar_lancamentos_df
+LINHAS_POR_LOTE_DF = 50000
+
+# Colunas de listar_lancamentos_df, na ordem dos dicionários de listar_lancamentos
+COLUNAS_LANCAMENTOS_DF = [
+    'id', 'data', 'valor', 'descricao', 'tipo', 'categoria_id',
+    'categoria_nome', 'categoria_tipo', 'categoria_cor', 'recorrencia_id'
+]
+
+# Granularidades aceitas em calcular_totais_por_periodo e o passo entre períodos
+GRANULARIDADES = {
+    'dia': relativedelta(days=1),
+    'semana': relativedelta(weeks=1),
+    'mes': relativedelta(months=1),
+    'trimestre': relativedelta(months=3),
+    'ano': relativedelta(years=1),
+}
 
 
 class LancamentoService:
     """Serviço para gerenciamento de lançamentos financeiros."""
     
     @staticmethod
+    @invalida_cache
     def criar_lancamento(
         usuario_id: int,
         categoria_id: int,
@@ -55,6 +98,11 @@ class LancamentoService:
                 
                 session.add(lancamento)
                 session.flush()
+                
+                # Atualiza o resumo mensal e as sugestões de categoria na mesma transação
+                ResumoService.registrar(session, usuario_id, categoria_id, data, lancamento.valor)
+                SugestaoService.registrar(session, usuario_id, [(categoria_id, descricao)])
+                
                 session.expunge(lancamento)
                 
                 return True, "Lançamento criado com sucesso!", lancamento
@@ -62,14 +110,119 @@ class LancamentoService:
             return False, f"Erro ao criar lançamento: {str(e)}", None
     
     @staticmethod
+    @invalida_cache
+    def criar_lancamentos_lote(
+        usuario_id: int,
+        categoria_id: int,
+        tipo: TipoLancamento,
+        itens: List[Dict]
+    ) -> tuple[bool, str, List[tuple[int, str]]]:
+        """
+        Cria vários lançamentos da mesma categoria em uma única transação.
+        
+        Ou todos os itens são gravados, ou nenhum: se algum item for inválido
+        o lote inteiro é rejeitado e os erros são devolvidos por item.
+        
+        Args:
+            usuario_id: ID do usuário
+            categoria_id: ID da categoria
+            tipo: Tipo dos lançamentos (FIXA ou VARIAVEL)
+            itens: Lista de dicionários com 'data', 'valor' e 'descricao'
+        
+        Returns:
+            Tupla (sucesso, mensagem, erros) onde erros é uma lista de (índice do item, mensagem)
+        """
+        if not itens:
+            return False, "Nenhum lançamento informado!", []
+        
+        erros = []
+        linhas = []
+        deltas = {}
+        
+        for indice, item in enumerate(itens):
+            data_item = item.get('data')
+            valor_item = item.get('valor')
+            
+            if not isinstance(data_item, date):
+                erros.append((indice, "Data inválida"))
+                continue
+            if not isinstance(valor_item, (int, float)) or valor_item == 0:
+                erros.append((indice, "Valor deve ser diferente de zero"))
+                continue
+            
+            valor_item = abs(valor_item)  # Garante valor positivo
+            linhas.append({
+                'usuario_id': usuario_id,
+                'categoria_id': categoria_id,
+                'data': data_item,
+                'valor': valor_item,
+                'descricao': item.get('descricao'),
+                'tipo': tipo
+            })
+            
+            # Agrupa o efeito no resumo por mês
+            chave = (data_item.year, data_item.month, categoria_id)
+            total, quantidade = deltas.get(chave, (0.0, 0))
+            deltas[chave] = (total + valor_item, quantidade + 1)
+        
+        if erros:
+            return False, f"{len(erros)} de {len(itens)} lançamentos inválidos. Nada foi gravado.", erros
+        
+        try:
+            with db_manager.get_session() as session:
+                # Verifica uma única vez se a categoria pertence ao usuário
+                categoria = session.query(Categoria.id).filter_by(
+                    id=categoria_id,
+                    usuario_id=usuario_id
+                ).first()
+                
+                if not categoria:
+                    return False, "Categoria não encontrada ou não pertence ao usuário!", []
+                
+                # Lista de parâmetros: executemany em um único INSERT preparado
+                session.execute(insert(Lancamento), linhas)
+                
+                # Atualiza o resumo mensal e as sugestões de categoria na mesma transação
+                ResumoService.aplicar_deltas(session, usuario_id, deltas)
+                SugestaoService.registrar(session, usuario_id, [(categoria_id, linha['descricao']) for linha in linhas])
+                
+                return True, f"{len(linhas)} lançamentos criados com sucesso!", []
+        except Exception as e:
+            return False, f"Erro ao criar lançamentos: {str(e)}", []
+    
+    @staticmethod
+    def _consulta_lancamentos() -> Select:
+        """
+        Consulta base das leituras de lançamentos.
+        
+        Projeta apenas as colunas usadas nos dicionários de saída, com join em
+        categorias, sem materializar objetos ORM nem carregar relacionamentos.
+        """
+        return select(
+            Lancamento.id,
+            Lancamento.data,
+            Lancamento.valor,
+            Lancamento.descricao,
+            Lancamento.tipo,
+            Categoria.id.label('categoria_id'),
+            Categoria.nome.label('categoria_nome'),
+            Categoria.tipo.label('categoria_tipo'),
+            Categoria.cor.label('categoria_cor')
+        ).join(Categoria, Categoria.id == Lancamento.categoria_id)
+    
+    @staticmethod
+    @leitura_em_cache
     def listar_lancamentos(
         usuario_id: int,
         mes: Optional[int] = None,
         ano: Optional[int] = None,
         categoria_id: Optional[int] = None
-    ) -> List[Lancamento]:
+    ) -> List[dict]:
         """
-        Lista lançamentos com filtros opcionais.
+        Lista lançamentos com filtros opcionais, incluindo as ocorrências de recorrências.
+        
+        Ocorrências calculadas têm id None e recorrencia_id preenchido. Sem filtro
+        de ano, recorrências sem término são calculadas até HORIZONTE_RECORRENCIAS.
         
         Args:
             usuario_id: ID do usuário
@@ -81,41 +234,459 @@ class LancamentoService:
             Lista de lançamentos
         """
         try:
-            with db_manager.get_session() as session:
-                query = session.query(Lancamento).filter_by(usuario_id=usuario_id)
+            consulta = LancamentoService._filtrar_lancamentos(
+                LancamentoService._consulta_lancamentos(), usuario_id, mes, ano, categoria_id
+            ).order_by(Lancamento.data.desc(), Lancamento.id.desc())
+            
+            with db_manager.get_session_leitura() as session:
+                # Linhas já vêm com as chaves do dicionário de saída
+                lancamentos = [dict(linha) for linha in session.execute(consulta).mappings()]
                 
-                if mes:
-                    query = query.filter(extract('month', Lancamento.data) == mes)
+                inicio, fim = Periodo.intervalo(ano, mes) if ano else (None, None)
+                ocorrencias = RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim, categoria_id)
+            
+            if not ano and mes:
+                ocorrencias = [ocorrencia for ocorrencia in ocorrencias if ocorrencia['data'].month == mes]
+            
+            if ocorrencias:
+                lancamentos.extend(ocorrencias)
+                lancamentos.sort(key=LancamentoService._chave_ordenacao, reverse=True)
+            
+            return lancamentos
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao listar lançamentos: {e}")
+            return []
+    
+    @staticmethod
+    @leitura_em_cache
+    def buscar(
+        usuario_id: int,
+        termo: str,
+        mes: Optional[int] = None,
+        ano: Optional[int] = None,
+        categoria_id: Optional[int] = None,
+        limite: int = LIMITE_BUSCA
+    ) -> List[dict]:
+        """
+        Busca lançamentos pela descrição, combinável com os filtros de listar_lancamentos.
+        
+        Cada palavra do termo é procurada como início de uma palavra da
+        descrição, sem diferenciar maiúsculas e acentos ("cafe" encontra "Café
+        da manhã"), e todas precisam aparecer. Com o índice de texto completo
+        os resultados vêm por relevância (bm25) e, em empate, do mais recente
+        para o mais antigo; sem ele, os lançamentos filtrados são lidos do
+        mais recente para o mais antigo e as descrições comparadas em Python
+        com o mesmo critério (corresponde), até completar o limite.
+        Ocorrências de recorrências com a descrição buscada vêm depois dos
+        lançamentos gravados.
+        
+        Args:
+            usuario_id: ID do usuário
+            termo: Texto buscado
+            mes: Filtro por mês (1-12)
+            ano: Filtro por ano
+            categoria_id: Filtro por categoria
+            limite: Máximo de resultados
+            
+        Returns:
+            Lista de lançamentos no formato de listar_lancamentos
+        """
+        palavras = palavras_busca(termo)
+        if not palavras:
+            return []
+        
+        try:
+            consulta = LancamentoService._filtrar_lancamentos(
+                LancamentoService._consulta_lancamentos(), usuario_id, mes, ano, categoria_id
+            )
+            
+            indice = db_manager.busca_textual_disponivel()
+            if indice:
+                consulta = consulta.join(
+                    tabela_busca, tabela_busca.c.rowid == Lancamento.id
+                ).where(
+                    tabela_busca.c[TABELA_BUSCA].match(expressao_busca(palavras, usuario_id))
+                ).order_by(tabela_busca.c.rank, Lancamento.data.desc(), Lancamento.id.desc()).limit(limite)
+            else:
+                # LIKE não serve de pré-filtro: "cafe" não casaria com "Café" e "ar" casaria com "Luar"
+                consulta = consulta.order_by(Lancamento.data.desc(), Lancamento.id.desc())
+            
+            with db_manager.get_session_leitura() as session:
+                if indice:
+                    lancamentos = [dict(linha) for linha in session.execute(consulta).mappings()]
+                else:
+                    linhas = session.connection().execution_options(
+                        yield_per=LINHAS_POR_LOTE_BUSCA,
+                        stream_results=True
+                    ).execute(consulta).mappings()
+                    lancamentos = list(islice(
+                        (dict(linha) for linha in linhas if corresponde(linha['descricao'], palavras)),
+                        limite
+                    ))
                 
-                if ano:
-                    query = query.filter(extract('year', Lancamento.data) == ano)
+                ocorrencias = []
+                if len(lancamentos) < limite:
+                    inicio, fim = Periodo.intervalo(ano, mes) if ano else (None, None)
+                    ocorrencias = RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim, categoria_id)
+            
+            ocorrencias = [
+                ocorrencia for ocorrencia in ocorrencias
+                if (ano or not mes or ocorrencia['data'].month == mes) and corresponde(ocorrencia['descricao'], palavras)
+            ]
+            ocorrencias.sort(key=LancamentoService._chave_ordenacao, reverse=True)
+            
+            return lancamentos + ocorrencias[:limite - len(lancamentos)]
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao buscar lançamentos: {e}")
+            return []
+    
+    @staticmethod
+    def _filtrar_lancamentos(
+        consulta: Select,
+        usuario_id: int,
+        mes: Optional[int],
+        ano: Optional[int],
+        categoria_id: Optional[int]
+    ) -> Select:
+        """Aplica à consulta os filtros de usuário, mês/ano e categoria das listagens."""
+        consulta = consulta.where(Lancamento.usuario_id == usuario_id)
+        
+        if ano:
+            # Intervalo semiaberto permite o uso do índice (usuario_id, data)
+            inicio, fim = Periodo.intervalo(ano, mes)
+            consulta = consulta.where(Lancamento.data >= inicio, Lancamento.data < fim)
+        elif mes:
+            # Mês de qualquer ano não forma um intervalo contínuo
+            consulta = consulta.where(extract('month', Lancamento.data) == mes)
+        
+        if categoria_id:
+            consulta = consulta.where(Lancamento.categoria_id == categoria_id)
+        
+        return consulta
+    
+    @staticmethod
+    def _chave_ordenacao(lanc: dict) -> tuple:
+        """
+        Posição de um lançamento na listagem: (data, id, recorrencia_id).
+        
+        Ocorrências de recorrências têm id 0 e ficam depois dos lançamentos
+        gravados da mesma data na ordem decrescente.
+        """
+        return lanc['data'], lanc['id'] or 0, lanc.get('recorrencia_id') or 0
+    
+    @staticmethod
+    def _codificar_cursor(chave: tuple) -> str:
+        """Codifica a chave de ordenação do último item de uma página em um cursor opaco."""
+        data_lanc, lancamento_id, recorrencia_id = chave
+        texto = f"{data_lanc.isoformat()}|{lancamento_id}|{recorrencia_id}"
+        return base64.urlsafe_b64encode(texto.encode('ascii')).decode('ascii')
+    
+    @staticmethod
+    def _decodificar_cursor(cursor: str) -> tuple:
+        """Converte um cursor de volta na chave de ordenação; ValueError se for inválido."""
+        try:
+            data_texto, lancamento_id, recorrencia_id = base64.urlsafe_b64decode(
+                cursor.encode('ascii')
+            ).decode('ascii').split('|')
+            return date.fromisoformat(data_texto), int(lancamento_id), int(recorrencia_id)
+        except Exception:
+            raise ValueError(f"Cursor de paginação inválido: {cursor}")
+    
+    @staticmethod
+    @leitura_em_cache
+    def listar_lancamentos_pagina(
+        usuario_id: int,
+        mes: Optional[int] = None,
+        ano: Optional[int] = None,
+        categoria_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        tamanho_pagina: int = TAMANHO_PAGINA_LANCAMENTOS
+    ) -> dict:
+        """
+        Lista uma página de lançamentos, do mais recente para o mais antigo.
+        
+        Paginação por chave (data, id): a página seguinte começa logo após o
+        cursor, com LIMIT sobre o índice (usuario_id, data), sem OFFSET. O custo
+        de cada página independe do tamanho do histórico. Ocorrências de
+        recorrências são intercaladas como em listar_lancamentos.
+        
+        Args:
+            usuario_id: ID do usuário
+            mes: Filtro por mês (1-12)
+            ano: Filtro por ano
+            categoria_id: Filtro por categoria
+            cursor: proximo_cursor da página anterior (None para a primeira página)
+            tamanho_pagina: Lançamentos por página
+            
+        Returns:
+            Dicionário com lancamentos e proximo_cursor (None na última página)
+        """
+        try:
+            consulta = LancamentoService._filtrar_lancamentos(
+                LancamentoService._consulta_lancamentos(), usuario_id, mes, ano, categoria_id
+            )
+            
+            inicio, fim = Periodo.intervalo(ano, mes) if ano else (None, None)
+            
+            chave_cursor = None
+            if cursor:
+                chave_cursor = LancamentoService._decodificar_cursor(cursor)
+                data_cursor, id_cursor = chave_cursor[0], chave_cursor[1]
                 
-                if categoria_id:
-                    query = query.filter_by(categoria_id=categoria_id)
+                # data <= cursor delimita a faixa do índice; o OR desempata pelo id
+                consulta = consulta.where(
+                    Lancamento.data <= data_cursor,
+                    or_(Lancamento.data < data_cursor, and_(Lancamento.data == data_cursor, Lancamento.id < id_cursor))
+                )
+                
+                limite = data_cursor + timedelta(days=1)
+                fim = limite if fim is None else min(fim, limite)
+            
+            # Uma linha a mais indica se existe página seguinte
+            consulta = consulta.order_by(
+                Lancamento.data.desc(), Lancamento.id.desc()
+            ).limit(tamanho_pagina + 1)
+            
+            with db_manager.get_session_leitura() as session:
+                lancamentos = [dict(linha) for linha in session.execute(consulta).mappings()]
                 
-                lancamentos = query.order_by(Lancamento.data.desc()).all()
+                # Só ocorrências a partir da última linha lida podem entrar nesta página
+                inicio_ocorrencias = lancamentos[-1]['data'] if len(lancamentos) > tamanho_pagina else inicio
+                ocorrencias = RecorrenciaService.ocorrencias(
+                    session, usuario_id, inicio_ocorrencias, fim, categoria_id
+                )
+            
+            if not ano and mes:
+                ocorrencias = [ocorrencia for ocorrencia in ocorrencias if ocorrencia['data'].month == mes]
+            
+            if chave_cursor:
+                ocorrencias = [
+                    ocorrencia for ocorrencia in ocorrencias
+                    if LancamentoService._chave_ordenacao(ocorrencia) < chave_cursor
+                ]
+            
+            if ocorrencias:
+                lancamentos.extend(ocorrencias)
+                lancamentos.sort(key=LancamentoService._chave_ordenacao, reverse=True)
+            
+            pagina = lancamentos[:tamanho_pagina]
+            proximo_cursor = None
+            if len(lancamentos) > tamanho_pagina:
+                proximo_cursor = LancamentoService._codificar_cursor(LancamentoService._chave_ordenacao(pagina[-1]))
+            
+            return {'lancamentos': pagina, 'proximo_cursor': proximo_cursor}
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao listar página de lançamentos: {e}")
+            return {'lancamentos': [], 'proximo_cursor': None}
+    
+    @staticmethod
+    @leitura_em_cache
+    def totalizar_lancamentos(
+        usuario_id: int,
+        mes: Optional[int] = None,
+        ano: Optional[int] = None,
+        categoria_id: Optional[int] = None
+    ) -> dict:
+        """
+        Quantidade e totais dos lançamentos de uma listagem, sem listá-los.
+        
+        Soma a tabela resumo_mensal (quantidade e total por mês/categoria) com
+        os mesmos filtros de listar_lancamentos, mais as ocorrências de
+        recorrências. O custo depende do número de meses, não de lançamentos.
+        
+        Args:
+            usuario_id: ID do usuário
+            mes: Filtro por mês (1-12)
+            ano: Filtro por ano
+            categoria_id: Filtro por categoria
+            
+        Returns:
+            Dicionário com quantidade, total_entradas, total_despesas, saldo
+        """
+        totais = {'quantidade': 0, 'total_entradas': 0.0, 'total_despesas': 0.0}
+        
+        try:
+            consulta = select(
+                func.sum(ResumoMensal.quantidade),
+                *LancamentoService._somas_por_tipo(ResumoMensal.total)
+            ).join(
+                Categoria, Categoria.id == ResumoMensal.categoria_id
+            ).where(
+                ResumoMensal.usuario_id == usuario_id
+            )
+            
+            if ano:
+                consulta = consulta.where(ResumoMensal.ano == ano)
+            if mes:
+                consulta = consulta.where(ResumoMensal.mes == mes)
+            if categoria_id:
+                consulta = consulta.where(ResumoMensal.categoria_id == categoria_id)
+            
+            with db_manager.get_session_leitura() as session:
+                quantidade, entradas, despesas = session.execute(consulta).one()
+                
+                inicio, fim = Periodo.intervalo(ano, mes) if ano else (None, None)
+                ocorrencias = RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim, categoria_id)
+            
+            totais['quantidade'] = int(quantidade or 0)
+            totais['total_entradas'] = float(entradas or 0.0)
+            totais['total_despesas'] = float(despesas or 0.0)
+            
+            for ocorrencia in ocorrencias:
+                if not ano and mes and ocorrencia['data'].month != mes:
+                    continue
+                
+                totais['quantidade'] += 1
+                if ocorrencia['categoria_tipo'] == TipoCategoria.ENTRADA:
+                    totais['total_entradas'] += ocorrencia['valor']
+                else:
+                    totais['total_despesas'] += ocorrencia['valor']
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao totalizar lançamentos: {e}")
+        
+        totais['saldo'] = totais['total_entradas'] - totais['total_despesas']
+        return totais
+    
+    @staticmethod
+    def _categoria_enum(serie: pd.Series, tipo_enum: Type[enum.Enum]) -> pd.Categorical:
+        """Converte os códigos de enum gravados no banco (a partir de 1) em categorical com os valores de exibição."""
+        return pd.Categorical.from_codes(
+            serie.to_numpy(dtype='int64') - 1, categories=[membro.value for membro in tipo_enum]
+        )
+    
+    @staticmethod
+    def _tipar_lote(lote: pd.DataFrame) -> pd.DataFrame:
+        """Converte as colunas lidas do banco (datas ISO, centavos e códigos de enum) para os tipos finais."""
+        lote['id'] = lote['id'].astype('Int64')
+        lote['data'] = pd.to_datetime(lote['data'], format='ISO8601')
+        lote['valor'] = lote['valor'].astype('int64') / 100
+        lote['tipo'] = LancamentoService._categoria_enum(lote['tipo'], TipoLancamento)
+        lote['categoria_id'] = lote['categoria_id'].astype('int64')
+        lote['recorrencia_id'] = lote['recorrencia_id'].astype('Int64')
+        return lote
+    
+    @staticmethod
+    def _colunas_categoria(quadro: pd.DataFrame, categorias: List) -> pd.DataFrame:
+        """
+        Deriva categoria_nome, categoria_tipo e categoria_cor de categoria_id.
+        
+        Os atributos vêm de uma leitura das categorias do usuário e são
+        expandidos pelos códigos do categorical, sem uma string por linha.
+        Categorias sem cor (cor é anulável) recebem a cor padrão do modelo.
+        """
+        posicoes = pd.Categorical(quadro['categoria_id'], categories=[c.id for c in categorias]).codes
+        cor_padrao = Categoria.cor.default.arg
+        
+        atributos = {
+            'categoria_nome': ([c.nome for c in categorias], None),
+            'categoria_tipo': ([c.tipo.value for c in categorias], [t.value for t in TipoCategoria]),
+            'categoria_cor': ([c.cor or cor_padrao for c in categorias], None)
+        }
+        
+        for coluna, (valores, rotulos) in atributos.items():
+            # Categorias em ordem alfabética: groupby agrupa na mesma ordem das strings
+            rotulos = rotulos or sorted(set(valores))
+            codigos = np.array([rotulos.index(valor) for valor in valores], dtype='int64')
+            quadro[coluna] = pd.Categorical.from_codes(codigos[posicoes], categories=rotulos)
+        
+        return quadro
+    
+    @staticmethod
+    @leitura_em_cache
+    def listar_lancamentos_df(
+        usuario_id: int,
+        mes: Optional[int] = None,
+        ano: Optional[int] = None,
+        categoria_id: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        Lista lançamentos como DataFrame tipado, para análises vetorizadas.
+        
+        Mesmos filtros e linhas de listar_lancamentos, lidos do cursor em lotes
+        direto para colunas, sem dicionários intermediários. categoria_nome,
+        categoria_cor, categoria_tipo e tipo são categorical (tipos com os
+        valores de exibição, ex. 'Despesa'); data é datetime64; id e
+        recorrencia_id são Int64 anuláveis.
+        
+        Args:
+            usuario_id: ID do usuário
+            mes: Filtro por mês (1-12)
+            ano: Filtro por ano
+            categoria_id: Filtro por categoria
+            
+        Returns:
+            DataFrame ordenado do mais recente para o mais antigo
+        """
+        # Data, valor e enum sem conversão do ORM: a conversão é feita por coluna
+        consulta = LancamentoService._filtrar_lancamentos(
+            select(
+                Lancamento.id,
+                type_coerce(Lancamento.data, String).label('data'),
+                type_coerce(Lancamento.valor, Integer).label('valor'),
+                Lancamento.descricao,
+                type_coerce(Lancamento.tipo, Integer).label('tipo'),
+                Lancamento.categoria_id,
+                literal_column('NULL').label('recorrencia_id')
+            ),
+            usuario_id, mes, ano, categoria_id
+        ).order_by(Lancamento.data.desc(), Lancamento.id.desc())
+        
+        try:
+            with db_manager.get_session_leitura() as session:
+                lotes = [
+                    LancamentoService._tipar_lote(lote)
+                    for lote in pd.read_sql_query(consulta, session.connection(), chunksize=LINHAS_POR_LOTE_DF)
+                ]
                 
-                # Cria uma lista de dicionários com os dados necessários
-                resultado = []
-                for lanc in lancamentos:
-                    resultado.append({
-                        'id': lanc.id,
-                        'data': lanc.data,
-                        'valor': lanc.valor,
-                        'descricao': lanc.descricao,
-                        'tipo': lanc.tipo,
-                        'categoria_id': lanc.categoria.id,
-                        'categoria_nome': lanc.categoria.nome,
-                        'categoria_tipo': lanc.categoria.tipo,
-                        'categoria_cor': lanc.categoria.cor
-                    })
+                categorias = session.execute(
+                    select(Categoria.id, Categoria.nome, Categoria.tipo, Categoria.cor)
+                    .where(Categoria.usuario_id == usuario_id)
+                ).all()
                 
-                return resultado
+                inicio, fim = Periodo.intervalo(ano, mes) if ano else (None, None)
+                ocorrencias = RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim, categoria_id)
+            
+            if not ano and mes:
+                ocorrencias = [ocorrencia for ocorrencia in ocorrencias if ocorrencia['data'].month == mes]
+            
+            if ocorrencias:
+                # Poucas linhas: as ocorrências entram no mesmo formato lido do banco
+                lotes.append(LancamentoService._tipar_lote(pd.DataFrame({
+                    'id': [None] * len(ocorrencias),
+                    'data': [ocorrencia['data'].isoformat() for ocorrencia in ocorrencias],
+                    'valor': [round(ocorrencia['valor'] * 100) for ocorrencia in ocorrencias],
+                    'descricao': [ocorrencia['descricao'] for ocorrencia in ocorrencias],
+                    'tipo': [codigo_enum(ocorrencia['tipo']) for ocorrencia in ocorrencias],
+                    'categoria_id': [ocorrencia['categoria_id'] for ocorrencia in ocorrencias],
+                    'recorrencia_id': [ocorrencia['recorrencia_id'] for ocorrencia in ocorrencias]
+                })))
+            
+            if not lotes:
+                vazio = pd.DataFrame(columns=['id', 'data', 'valor', 'descricao', 'tipo', 'categoria_id', 'recorrencia_id'])
+                return LancamentoService._colunas_categoria(
+                    LancamentoService._tipar_lote(vazio), categorias
+                )[COLUNAS_LANCAMENTOS_DF]
+            
+            quadro = pd.concat(lotes, ignore_index=True) if len(lotes) > 1 else lotes[0]
+            
+            if ocorrencias:
+                # Ocorrências depois dos lançamentos gravados da mesma data, como em listar_lancamentos
+                quadro = quadro.sort_values(
+                    ['data', 'id', 'recorrencia_id'], ascending=False, na_position='last', ignore_index=True
+                )
+            
+            return LancamentoService._colunas_categoria(quadro, categorias)[COLUNAS_LANCAMENTOS_DF]
         except Exception as e:
+            registrar_falha_leitura()
             print(f"Erro ao listar lançamentos: {e}")
-            return []
+            return pd.DataFrame(columns=COLUNAS_LANCAMENTOS_DF)
     
     @staticmethod
+    @invalida_cache
     def atualizar_lancamento(
         lancamento_id: int,
         usuario_id: int,
@@ -159,6 +730,17 @@ class LancamentoService:
                 if not categoria:
                     return False, "Categoria não encontrada!"
                 
+                # Retira do resumo o mês/categoria antigos e soma nos novos
+                ResumoService.registrar(
+                    session, usuario_id, lancamento.categoria_id, lancamento.data, -lancamento.valor, -1
+                )
+                ResumoService.registrar(session, usuario_id, categoria_id, data, abs(valor))
+                
+                # O mesmo para as sugestões, se a descrição ou a categoria mudaram
+                if (lancamento.categoria_id, lancamento.descricao) != (categoria_id, descricao):
+                    SugestaoService.registrar(session, usuario_id, [(lancamento.categoria_id, lancamento.descricao)], -1)
+                    SugestaoService.registrar(session, usuario_id, [(categoria_id, descricao)])
+                
                 lancamento.categoria_id = categoria_id
                 lancamento.data = data
                 lancamento.valor = abs(valor)
@@ -170,6 +752,7 @@ class LancamentoService:
             return False, f"Erro ao atualizar lançamento: {str(e)}"
     
     @staticmethod
+    @invalida_cache
     def excluir_lancamento(lancamento_id: int, usuario_id: int) -> tuple[bool, str]:
         """
         Exclui um lançamento.
@@ -191,12 +774,33 @@ class LancamentoService:
                 if not lancamento:
                     return False, "Lançamento não encontrado!"
                 
+                ResumoService.registrar(
+                    session, usuario_id, lancamento.categoria_id, lancamento.data, -lancamento.valor, -1
+                )
+                SugestaoService.registrar(session, usuario_id, [(lancamento.categoria_id, lancamento.descricao)], -1)
+                
                 session.delete(lancamento)
                 return True, "Lançamento excluído com sucesso!"
         except Exception as e:
             return False, f"Erro ao excluir lançamento: {str(e)}"
     
     @staticmethod
+    def _somas_por_tipo(coluna_valor) -> tuple:
+        """Colunas de soma condicional de entradas e despesas (exigem join com Categoria)."""
+        total_entradas = func.sum(case(
+            (Categoria.tipo == TipoCategoria.ENTRADA, coluna_valor),
+            else_=0.0
+        )).label('total_entradas')
+        
+        total_despesas = func.sum(case(
+            (Categoria.tipo == TipoCategoria.DESPESA, coluna_valor),
+            else_=0.0
+        )).label('total_despesas')
+        
+        return total_entradas, total_despesas
+    
+    @staticmethod
+    @leitura_em_cache
     def calcular_totais(usuario_id: int, mes: int, ano: int) -> dict:
         """
         Calcula totais de entradas, despesas e saldo.
@@ -209,60 +813,156 @@ class LancamentoService:
         Returns:
             Dicionário com total_entradas, total_despesas, saldo
         """
+        inicio, fim = Periodo.intervalo_mes(mes, ano)
+        totais = LancamentoService.calcular_totais_por_periodo(usuario_id, inicio, fim, 'mes')[0]
+        
+        return {
+            'total_entradas': totais['total_entradas'],
+            'total_despesas': totais['total_despesas'],
+            'saldo': totais['saldo']
+        }
+    
+    @staticmethod
+    @leitura_em_cache
+    def calcular_totais_por_periodo(
+        usuario_id: int,
+        inicio: date,
+        fim: date,
+        granularidade: str = 'mes'
+    ) -> List[dict]:
+        """
+        Calcula entradas, despesas e saldo agrupados por período com uma única consulta.
+        
+        Intervalos de meses inteiros com granularidade mensal ou maior são lidos
+        da tabela resumo_mensal; os demais, dos lançamentos. Ocorrências de
+        recorrências no intervalo são somadas. Períodos sem lançamentos são
+        preenchidos com zero.
+        
+        Args:
+            usuario_id: ID do usuário
+            inicio: Data inicial (inclusiva)
+            fim: Data final (exclusiva)
+            granularidade: 'dia', 'semana', 'mes', 'trimestre' ou 'ano'
+            
+        Returns:
+            Lista ordenada de dicionários com inicio, total_entradas, total_despesas, saldo
+        """
+        if granularidade not in GRANULARIDADES:
+            raise ValueError(f"Granularidade inválida: {granularidade}")
+        
+        # Períodos vazios de saída, já na ordem cronológica
+        passo = GRANULARIDADES[granularidade]
+        periodos = {}
+        atual = LancamentoService._inicio_periodo(inicio, granularidade)
+        while atual < fim:
+            periodos[atual] = {'total_entradas': 0.0, 'total_despesas': 0.0}
+            atual += passo
+        
         try:
-            with db_manager.get_session() as session:
-                # Total de entradas
-                total_entradas = session.query(func.sum(Lancamento.valor)).join(
-                    Categoria
-                ).filter(
-                    Lancamento.usuario_id == usuario_id,
-                    Categoria.tipo == TipoCategoria.ENTRADA,
-                    extract('month', Lancamento.data) == mes,
-                    extract('year', Lancamento.data) == ano
-                ).scalar() or 0.0
-                
-                # Total de despesas
-                total_despesas = session.query(func.sum(Lancamento.valor)).join(
-                    Categoria
-                ).filter(
-                    Lancamento.usuario_id == usuario_id,
-                    Categoria.tipo == TipoCategoria.DESPESA,
-                    extract('month', Lancamento.data) == mes,
-                    extract('year', Lancamento.data) == ano
-                ).scalar() or 0.0
+            with db_manager.get_session_leitura() as session:
+                if granularidade in ('dia', 'semana'):
+                    # Dia e semana agrupam os lançamentos por data
+                    linhas = session.query(
+                        Lancamento.data,
+                        *LancamentoService._somas_por_tipo(Lancamento.valor)
+                    ).join(
+                        Categoria
+                    ).filter(
+                        Lancamento.usuario_id == usuario_id,
+                        Lancamento.data >= inicio,
+                        Lancamento.data < fim
+                    ).group_by(Lancamento.data).all()
+                elif inicio.day == 1 and fim.day == 1:
+                    # Meses inteiros: O(meses × categorias) linhas do resumo
+                    mes_absoluto = ResumoMensal.ano * 12 + ResumoMensal.mes
+                    
+                    linhas = session.query(
+                        ResumoMensal.ano,
+                        ResumoMensal.mes,
+                        *LancamentoService._somas_por_tipo(ResumoMensal.total)
+                    ).join(
+                        Categoria, Categoria.id == ResumoMensal.categoria_id
+                    ).filter(
+                        ResumoMensal.usuario_id == usuario_id,
+                        mes_absoluto >= inicio.year * 12 + inicio.month,
+                        mes_absoluto < fim.year * 12 + fim.month
+                    ).group_by(ResumoMensal.ano, ResumoMensal.mes).all()
+                    
+                    linhas = [(date(ano, mes, 1), entradas, despesas) for ano, mes, entradas, despesas in linhas]
+                else:
+                    # Intervalo que corta meses ao meio: agrupa os lançamentos por ano/mês
+                    ano = extract('year', Lancamento.data)
+                    mes = extract('month', Lancamento.data)
+                    
+                    linhas = session.query(
+                        ano,
+                        mes,
+                        *LancamentoService._somas_por_tipo(Lancamento.valor)
+                    ).join(
+                        Categoria
+                    ).filter(
+                        Lancamento.usuario_id == usuario_id,
+                        Lancamento.data >= inicio,
+                        Lancamento.data < fim
+                    ).group_by(ano, mes).all()
+                    
+                    linhas = [
+                        (date(int(ano_lanc), int(mes_lanc), 1), entradas, despesas)
+                        for ano_lanc, mes_lanc, entradas, despesas in linhas
+                    ]
                 
-                return {
-                    'total_entradas': float(total_entradas),
-                    'total_despesas': float(total_despesas),
-                    'saldo': float(total_entradas - total_despesas)
-                }
+                # Recorrências entram como linhas de uma única ocorrência
+                for ocorrencia in RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim):
+                    if ocorrencia['categoria_tipo'] == TipoCategoria.ENTRADA:
+                        linhas.append((ocorrencia['data'], ocorrencia['valor'], 0.0))
+                    else:
+                        linhas.append((ocorrencia['data'], 0.0, ocorrencia['valor']))
+            
+            for data_ref, entradas, despesas in linhas:
+                periodo = periodos[LancamentoService._inicio_periodo(data_ref, granularidade)]
+                periodo['total_entradas'] += float(entradas or 0.0)
+                periodo['total_despesas'] += float(despesas or 0.0)
         except Exception as e:
-            print(f"Erro ao calcular totais: {e}")
-            return {'total_entradas': 0.0, 'total_despesas': 0.0, 'saldo': 0.0}
+            registrar_falha_leitura()
+            print(f"Erro ao calcular totais por período: {e}")
+        
+        return [
+            {
+                'inicio': inicio_periodo,
+                'total_entradas': totais['total_entradas'],
+                'total_despesas': totais['total_despesas'],
+                'saldo': totais['total_entradas'] - totais['total_despesas']
+            }
+            for inicio_periodo, totais in periodos.items()
+        ]
     
     @staticmethod
+    def _inicio_periodo(data: date, granularidade: str) -> date:
+        """Retorna a data inicial do período (dia, semana, mês, trimestre ou ano) que contém data."""
+        if granularidade == 'dia':
+            return data
+        if granularidade == 'semana':
+            # Semanas começam na segunda-feira
+            return data - timedelta(days=data.weekday())
+        if granularidade == 'mes':
+            return date(data.year, data.month, 1)
+        if granularidade == 'trimestre':
+            return date(data.year, (data.month - 1) // 3 * 3 + 1, 1)
+        return date(data.year, 1, 1)
+    
+    @staticmethod
+    @leitura_em_cache
     def obter_lancamento(lancamento_id: int, usuario_id: int) -> Optional[dict]:
         """Obtém um lançamento específico."""
         try:
-            with db_manager.get_session() as session:
-                lancamento = session.query(Lancamento).filter_by(
-                    id=lancamento_id,
-                    usuario_id=usuario_id
-                ).first()
-                
-                if lancamento:
-                    return {
-                        'id': lancamento.id,
-                        'data': lancamento.data,
-                        'valor': lancamento.valor,
-                        'descricao': lancamento.descricao,
-                        'tipo': lancamento.tipo,
-                        'categoria_id': lancamento.categoria.id,
-                        'categoria_nome': lancamento.categoria.nome,
-                        'categoria_tipo': lancamento.categoria.tipo,
-                        'categoria_cor': lancamento.categoria.cor
-                    }
-                
-                return None
+            consulta = LancamentoService._consulta_lancamentos().where(
+                Lancamento.id == lancamento_id,
+                Lancamento.usuario_id == usuario_id
+            )
+            
+            with db_manager.get_session_leitura() as session:
+                linha = session.execute(consulta).mappings().first()
+                return dict(linha) if linha else None
         except Exception:
+            registrar_falha_leitura()
             return None
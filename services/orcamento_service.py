@@ -1,15 +1,20 @@
 from typing import List, Optional, Dict
+import pandas as pd
 from models.orcamento_mensal import OrcamentoMensal
 from models.categoria import Categoria, TipoCategoria
-from models.lancamento import Lancamento
+from models.resumo_mensal import ResumoMensal
 from database.connection import db_manager
-from sqlalchemy import func, extract
+from services.cache import leitura_em_cache, invalida_cache, registrar_falha_leitura
+from services.recorrencia_service import RecorrenciaService
+from utils.periodo import Periodo
+from sqlalchemy import func, cast, and_, select, Integer
 
 
 class OrcamentoService:
     """Serviço para gerenciamento de orçamentos mensais."""
     
     @staticmethod
+    @invalida_cache
     def definir_orcamento(
         usuario_id: int,
         categoria_id: int,
@@ -74,6 +79,37 @@ class OrcamentoService:
             return False, f"Erro ao definir orçamento: {str(e)}"
     
     @staticmethod
+    def _montar_orcamento(linha, valor_recorrente: float = 0.0) -> Dict:
+        """Converte uma linha da consulta de planejado vs realizado em dicionário."""
+        valor_planejado = linha.valor_planejado
+        valor_realizado = float(linha.valor_realizado or 0.0) + valor_recorrente
+        
+        return {
+            'id': linha.id,
+            'categoria_id': linha.categoria_id,
+            'categoria_nome': linha.categoria_nome,
+            'categoria_cor': linha.categoria_cor,
+            'valor_planejado': valor_planejado,
+            'valor_realizado': valor_realizado,
+            'percentual_utilizado': (valor_realizado / valor_planejado * 100) if valor_planejado > 0 else 0,
+            'diferenca': valor_planejado - valor_realizado
+        }
+    
+    @staticmethod
+    def _colunas_orcamento(realizado) -> tuple:
+        """Colunas projetadas pela consulta de planejado vs realizado."""
+        return (
+            OrcamentoMensal.id,
+            OrcamentoMensal.mes_ano,
+            OrcamentoMensal.valor_planejado,
+            Categoria.id.label('categoria_id'),
+            Categoria.nome.label('categoria_nome'),
+            Categoria.cor.label('categoria_cor'),
+            realizado.c.valor_realizado
+        )
+    
+    @staticmethod
+    @leitura_em_cache
     def listar_orcamentos(usuario_id: int, mes: int, ano: int) -> List[Dict]:
         """
         Lista orçamentos de um mês com comparação de valores planejados vs realizados.
@@ -87,44 +123,199 @@ class OrcamentoService:
             Lista de dicionários com informações de orçamento
         """
         try:
-            with db_manager.get_session() as session:
+            with db_manager.get_session_leitura() as session:
                 mes_ano = f"{mes:02d}/{ano}"
                 
-                orcamentos = session.query(OrcamentoMensal).filter_by(
-                    usuario_id=usuario_id,
-                    mes_ano=mes_ano
-                ).all()
-                
-                resultado = []
-                
-                for orcamento in orcamentos:
-                    # Calcula o valor realizado
-                    valor_realizado = session.query(func.sum(Lancamento.valor)).filter(
-                        Lancamento.usuario_id == usuario_id,
-                        Lancamento.categoria_id == orcamento.categoria_id,
-                        extract('month', Lancamento.data) == mes,
-                        extract('year', Lancamento.data) == ano
-                    ).scalar() or 0.0
-                    
-                    categoria = orcamento.categoria
-                    
-                    resultado.append({
-                        'id': orcamento.id,
-                        'categoria_id': categoria.id,
-                        'categoria_nome': categoria.nome,
-                        'categoria_cor': categoria.cor,
-                        'valor_planejado': orcamento.valor_planejado,
-                        'valor_realizado': float(valor_realizado),
-                        'percentual_utilizado': (float(valor_realizado) / orcamento.valor_planejado * 100) if orcamento.valor_planejado > 0 else 0,
-                        'diferenca': orcamento.valor_planejado - float(valor_realizado)
-                    })
-                
-                return resultado
+                # Realizado do mês por categoria, lido do resumo mensal
+                realizado = session.query(
+                    ResumoMensal.categoria_id,
+                    ResumoMensal.total.label('valor_realizado')
+                ).filter(
+                    ResumoMensal.usuario_id == usuario_id,
+                    ResumoMensal.ano == ano,
+                    ResumoMensal.mes == mes
+                ).subquery()
+                
+                linhas = session.query(
+                    *OrcamentoService._colunas_orcamento(realizado)
+                ).join(
+                    Categoria, Categoria.id == OrcamentoMensal.categoria_id
+                ).outerjoin(
+                    realizado, realizado.c.categoria_id == OrcamentoMensal.categoria_id
+                ).filter(
+                    OrcamentoMensal.usuario_id == usuario_id,
+                    OrcamentoMensal.mes_ano == mes_ano
+                ).order_by(Categoria.nome).all()
+                
+                # Ocorrências de recorrências não estão no resumo mensal
+                recorrentes = RecorrenciaService.totais_por_mes_categoria(
+                    session, usuario_id, *Periodo.intervalo_mes(mes, ano)
+                )
+                
+                return [
+                    OrcamentoService._montar_orcamento(linha, recorrentes.get((ano, mes, linha.categoria_id), 0.0))
+                    for linha in linhas
+                ]
         except Exception as e:
+            registrar_falha_leitura()
             print(f"Erro ao listar orçamentos: {e}")
             return []
     
     @staticmethod
+    @leitura_em_cache
+    def listar_orcamentos_ano(usuario_id: int, ano: int) -> Dict[int, List[Dict]]:
+        """
+        Lista os orçamentos dos 12 meses de um ano em uma única consulta.
+        
+        Args:
+            usuario_id: ID do usuário
+            ano: Ano
+            
+        Returns:
+            Dicionário {mês (1-12): lista de orçamentos no formato de listar_orcamentos}
+        """
+        resultado = {mes: [] for mes in range(1, 13)}
+        
+        try:
+            with db_manager.get_session_leitura() as session:
+                # Realizado do ano por categoria e mês, lido do resumo mensal
+                realizado = session.query(
+                    ResumoMensal.categoria_id,
+                    ResumoMensal.mes,
+                    ResumoMensal.total.label('valor_realizado')
+                ).filter(
+                    ResumoMensal.usuario_id == usuario_id,
+                    ResumoMensal.ano == ano
+                ).subquery()
+                
+                # mes_ano é 'MM/YYYY': os dois primeiros caracteres são o mês
+                mes_orcamento = cast(func.substr(OrcamentoMensal.mes_ano, 1, 2), Integer)
+                
+                linhas = session.query(
+                    *OrcamentoService._colunas_orcamento(realizado)
+                ).join(
+                    Categoria, Categoria.id == OrcamentoMensal.categoria_id
+                ).outerjoin(
+                    realizado, and_(
+                        realizado.c.categoria_id == OrcamentoMensal.categoria_id,
+                        realizado.c.mes == mes_orcamento
+                    )
+                ).filter(
+                    OrcamentoMensal.usuario_id == usuario_id,
+                    OrcamentoMensal.mes_ano.in_([f"{mes:02d}/{ano}" for mes in range(1, 13)])
+                ).order_by(OrcamentoMensal.mes_ano, Categoria.nome).all()
+                
+                # Ocorrências de recorrências não estão no resumo mensal
+                recorrentes = RecorrenciaService.totais_por_mes_categoria(
+                    session, usuario_id, *Periodo.intervalo_ano(ano)
+                )
+                
+                for linha in linhas:
+                    mes = int(linha.mes_ano[:2])
+                    resultado[mes].append(OrcamentoService._montar_orcamento(
+                        linha, recorrentes.get((ano, mes, linha.categoria_id), 0.0)
+                    ))
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao listar orçamentos do ano: {e}")
+            return {mes: [] for mes in range(1, 13)}
+        
+        return resultado
+    
+    @staticmethod
+    @leitura_em_cache
+    def listar_orcamentos_df(usuario_id: int, ano: int, mes: Optional[int] = None) -> pd.DataFrame:
+        """
+        Lista planejado vs realizado como DataFrame tipado, para análises vetorizadas.
+        
+        Mesmas linhas de listar_orcamentos_ano (ou de listar_orcamentos com mes),
+        com as colunas ano e mes, categoria_nome e categoria_cor categorical e
+        percentual_utilizado/diferenca calculados por coluna.
+        
+        Args:
+            usuario_id: ID do usuário
+            ano: Ano
+            mes: Mês (1-12) opcional; None lista o ano inteiro
+            
+        Returns:
+            DataFrame ordenado por mês e nome da categoria
+        """
+        meses = [mes] if mes else list(range(1, 13))
+        
+        # Realizado por categoria e mês, lido do resumo mensal
+        realizado = select(
+            ResumoMensal.categoria_id,
+            ResumoMensal.mes,
+            ResumoMensal.total.label('valor_realizado')
+        ).where(
+            ResumoMensal.usuario_id == usuario_id,
+            ResumoMensal.ano == ano,
+            ResumoMensal.mes.in_(meses)
+        ).subquery()
+        
+        # mes_ano é 'MM/YYYY': os dois primeiros caracteres são o mês
+        mes_orcamento = cast(func.substr(OrcamentoMensal.mes_ano, 1, 2), Integer)
+        
+        consulta = select(
+            OrcamentoMensal.id,
+            mes_orcamento.label('mes'),
+            Categoria.id.label('categoria_id'),
+            Categoria.nome.label('categoria_nome'),
+            Categoria.cor.label('categoria_cor'),
+            OrcamentoMensal.valor_planejado,
+            func.coalesce(realizado.c.valor_realizado, 0.0).label('valor_realizado')
+        ).join(
+            Categoria, Categoria.id == OrcamentoMensal.categoria_id
+        ).outerjoin(
+            realizado, and_(
+                realizado.c.categoria_id == OrcamentoMensal.categoria_id,
+                realizado.c.mes == mes_orcamento
+            )
+        ).where(
+            OrcamentoMensal.usuario_id == usuario_id,
+            OrcamentoMensal.mes_ano.in_([f"{mes_ano:02d}/{ano}" for mes_ano in meses])
+        ).order_by(OrcamentoMensal.mes_ano, Categoria.nome)
+        
+        try:
+            with db_manager.get_session_leitura() as session:
+                quadro = pd.read_sql_query(consulta, session.connection())
+                
+                # Ocorrências de recorrências não estão no resumo mensal
+                recorrentes = RecorrenciaService.totais_por_mes_categoria(
+                    session, usuario_id, *Periodo.intervalo(ano, mes)
+                )
+            
+            quadro = quadro.astype({
+                'id': 'int64',
+                'mes': 'int64',
+                'categoria_id': 'int64',
+                'categoria_nome': 'category',
+                'categoria_cor': 'category',
+                'valor_planejado': 'float64',
+                'valor_realizado': 'float64'
+            })
+            quadro.insert(1, 'ano', ano)
+            
+            if recorrentes:
+                adicional = pd.Series({(mes_rec, categoria): total for (_, mes_rec, categoria), total in recorrentes.items()})
+                chaves = pd.MultiIndex.from_arrays([quadro['mes'], quadro['categoria_id']])
+                quadro['valor_realizado'] += adicional.reindex(chaves, fill_value=0.0).to_numpy()
+            
+            planejado = quadro['valor_planejado']
+            quadro['percentual_utilizado'] = (quadro['valor_realizado'] / planejado.where(planejado > 0) * 100).fillna(0.0)
+            quadro['diferenca'] = planejado - quadro['valor_realizado']
+            
+            return quadro
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao listar orçamentos: {e}")
+            return pd.DataFrame(columns=[
+                'id', 'ano', 'mes', 'categoria_id', 'categoria_nome', 'categoria_cor',
+                'valor_planejado', 'valor_realizado', 'percentual_utilizado', 'diferenca'
+            ])
+    
+    @staticmethod
+    @invalida_cache
     def excluir_orcamento(orcamento_id: int, usuario_id: int) -> tuple[bool, str]:
         """
         Exclui um orçamento.
@@ -152,6 +343,7 @@ class OrcamentoService:
             return False, f"Erro ao excluir orçamento: {str(e)}"
     
     @staticmethod
+    @leitura_em_cache
     def obter_resumo_orcamento(usuario_id: int, mes: int, ano: int) -> Dict:
         """
         Obtém resumo do orçamento total do mês.
@@ -179,6 +371,7 @@ class OrcamentoService:
                 'percentual_utilizado': percentual
             }
         except Exception as e:
+            registrar_falha_leitura()
             print(f"Erro ao obter resumo: {e}")
             return {
                 'total_planejado': 0.0,
@@ -0,0 +1,462 @@
+from typing import Dict, Iterator, List, Optional
+from datetime import date, timedelta
+from sqlalchemy import select, or_
+from sqlalchemy.orm import Session
+from models.recorrencia import Recorrencia, RecorrenciaExcecao, FrequenciaRecorrencia
+from models.lancamento import Lancamento, TipoLancamento
+from models.categoria import Categoria
+from database.connection import db_manager
+from services.cache import leitura_em_cache, invalida_cache, registrar_falha_leitura
+from services.resumo_service import ResumoService
+from services.sugestao_service import SugestaoService
+
+
+# Até quando são calculadas as ocorrências de recorrências sem término em consultas sem data final
+HORIZONTE_RECORRENCIAS = timedelta(days=365)
+
+
+class RecorrenciaService:
+    """Serviço para gerenciamento de lançamentos recorrentes."""
+
+    @staticmethod
+    @invalida_cache
+    def criar_recorrencia(
+        usuario_id: int,
+        categoria_id: int,
+        valor: float,
+        descricao: str,
+        data_inicio: date,
+        tipo: TipoLancamento = TipoLancamento.FIXA,
+        frequencia: FrequenciaRecorrencia = FrequenciaRecorrencia.MENSAL,
+        intervalo: int = 1,
+        data_fim: Optional[date] = None
+    ) -> tuple[bool, str, Optional[Recorrencia]]:
+        """
+        Cria uma regra de lançamento recorrente.
+
+        Args:
+            usuario_id: ID do usuário
+            categoria_id: ID da categoria
+            valor: Valor de cada ocorrência
+            descricao: Descrição das ocorrências
+            data_inicio: Data da primeira ocorrência
+            tipo: Tipo dos lançamentos (FIXA ou VARIAVEL)
+            frequencia: Frequência de repetição
+            intervalo: Repete a cada N semanas/meses/anos
+            data_fim: Última data possível (inclusiva); None = sem término
+
+        Returns:
+            Tupla (sucesso, mensagem, recorrencia)
+        """
+        if valor == 0:
+            return False, "Valor deve ser diferente de zero!", None
+        if intervalo < 1:
+            return False, "Intervalo deve ser maior que zero!", None
+        if data_fim and data_fim < data_inicio:
+            return False, "Data final deve ser posterior à data inicial!", None
+
+        try:
+            with db_manager.get_session() as session:
+                categoria = session.query(Categoria.id).filter_by(
+                    id=categoria_id,
+                    usuario_id=usuario_id
+                ).first()
+
+                if not categoria:
+                    return False, "Categoria não encontrada ou não pertence ao usuário!", None
+
+                recorrencia = Recorrencia(
+                    usuario_id=usuario_id,
+                    categoria_id=categoria_id,
+                    valor=abs(valor),  # Garante valor positivo
+                    descricao=descricao,
+                    tipo=tipo,
+                    frequencia=frequencia,
+                    intervalo=intervalo,
+                    data_inicio=data_inicio,
+                    data_fim=data_fim
+                )
+
+                session.add(recorrencia)
+                session.flush()
+                session.expunge(recorrencia)
+
+                return True, "Recorrência criada com sucesso!", recorrencia
+        except Exception as e:
+            return False, f"Erro ao criar recorrência: {str(e)}", None
+
+    @staticmethod
+    @invalida_cache
+    def atualizar_recorrencia(
+        recorrencia_id: int,
+        usuario_id: int,
+        valor: float,
+        descricao: str,
+        data_fim: Optional[date]
+    ) -> tuple[bool, str]:
+        """
+        Altera valor, descrição e término de toda a série de uma só vez.
+
+        Ocorrências já materializadas não são alteradas.
+
+        Args:
+            recorrencia_id: ID da recorrência
+            usuario_id: ID do usuário (para validação)
+            valor: Novo valor de cada ocorrência
+            descricao: Nova descrição
+            data_fim: Nova data final (inclusiva); None = sem término
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        if valor == 0:
+            return False, "Valor deve ser diferente de zero!"
+
+        try:
+            with db_manager.get_session() as session:
+                recorrencia = session.query(Recorrencia).filter_by(
+                    id=recorrencia_id,
+                    usuario_id=usuario_id
+                ).first()
+
+                if not recorrencia:
+                    return False, "Recorrência não encontrada!"
+
+                if data_fim and data_fim < recorrencia.data_inicio:
+                    return False, "Data final deve ser posterior à data inicial!"
+
+                recorrencia.valor = abs(valor)
+                recorrencia.descricao = descricao
+                recorrencia.data_fim = data_fim
+
+                return True, "Recorrência atualizada com sucesso!"
+        except Exception as e:
+            return False, f"Erro ao atualizar recorrência: {str(e)}"
+
+    @staticmethod
+    @invalida_cache
+    def excluir_recorrencia(recorrencia_id: int, usuario_id: int) -> tuple[bool, str]:
+        """
+        Exclui uma recorrência e suas ocorrências calculadas.
+
+        Ocorrências materializadas permanecem como lançamentos comuns.
+
+        Args:
+            recorrencia_id: ID da recorrência
+            usuario_id: ID do usuário (para validação)
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        try:
+            with db_manager.get_session() as session:
+                recorrencia = session.query(Recorrencia).filter_by(
+                    id=recorrencia_id,
+                    usuario_id=usuario_id
+                ).first()
+
+                if not recorrencia:
+                    return False, "Recorrência não encontrada!"
+
+                session.delete(recorrencia)
+                return True, "Recorrência excluída com sucesso!"
+        except Exception as e:
+            return False, f"Erro ao excluir recorrência: {str(e)}"
+
+    @staticmethod
+    def _buscar_ocorrencia(session: Session, recorrencia_id: int, usuario_id: int, data: date):
+        """
+        Valida uma ocorrência para materialização ou remoção.
+
+        Returns:
+            Tupla (recorrencia, mensagem de erro)
+        """
+        recorrencia = session.query(Recorrencia).filter_by(
+            id=recorrencia_id,
+            usuario_id=usuario_id
+        ).first()
+
+        if not recorrencia:
+            return None, "Recorrência não encontrada!"
+
+        if data not in RecorrenciaService.datas_ocorrencias(recorrencia, data, data + timedelta(days=1)):
+            return None, "Data não corresponde a uma ocorrência da recorrência!"
+
+        if session.get(RecorrenciaExcecao, (recorrencia_id, data)):
+            return None, "Ocorrência já materializada ou removida!"
+
+        return recorrencia, None
+
+    @staticmethod
+    @invalida_cache
+    def materializar_ocorrencia(
+        recorrencia_id: int,
+        usuario_id: int,
+        data: date,
+        valor: Optional[float] = None,
+        descricao: Optional[str] = None,
+        nova_data: Optional[date] = None
+    ) -> tuple[bool, str, Optional[Lancamento]]:
+        """
+        Transforma uma ocorrência em lançamento comum, opcionalmente alterado.
+
+        Args:
+            recorrencia_id: ID da recorrência
+            usuario_id: ID do usuário (para validação)
+            data: Data original da ocorrência
+            valor: Valor do lançamento (padrão: valor da regra)
+            descricao: Descrição do lançamento (padrão: descrição da regra)
+            nova_data: Data do lançamento (padrão: data da ocorrência)
+
+        Returns:
+            Tupla (sucesso, mensagem, lancamento)
+        """
+        try:
+            with db_manager.get_session() as session:
+                recorrencia, erro = RecorrenciaService._buscar_ocorrencia(session, recorrencia_id, usuario_id, data)
+
+                if erro:
+                    return False, erro, None
+
+                lancamento = Lancamento(
+                    usuario_id=usuario_id,
+                    categoria_id=recorrencia.categoria_id,
+                    data=nova_data or data,
+                    valor=abs(valor) if valor is not None else recorrencia.valor,
+                    descricao=descricao if descricao is not None else recorrencia.descricao,
+                    tipo=recorrencia.tipo
+                )
+
+                session.add(lancamento)
+                session.flush()
+
+                # A ocorrência deixa de ser calculada pela regra
+                session.add(RecorrenciaExcecao(
+                    recorrencia_id=recorrencia_id,
+                    data=data,
+                    lancamento_id=lancamento.id
+                ))
+
+                ResumoService.registrar(session, usuario_id, lancamento.categoria_id, lancamento.data, lancamento.valor)
+                SugestaoService.registrar(session, usuario_id, [(lancamento.categoria_id, lancamento.descricao)])
+
+                session.flush()
+                session.expunge(lancamento)
+
+                return True, "Ocorrência materializada com sucesso!", lancamento
+        except Exception as e:
+            return False, f"Erro ao materializar ocorrência: {str(e)}", None
+
+    @staticmethod
+    @invalida_cache
+    def excluir_ocorrencia(recorrencia_id: int, usuario_id: int, data: date) -> tuple[bool, str]:
+        """
+        Remove uma única ocorrência, mantendo o restante da série.
+
+        Args:
+            recorrencia_id: ID da recorrência
+            usuario_id: ID do usuário (para validação)
+            data: Data da ocorrência
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        try:
+            with db_manager.get_session() as session:
+                _, erro = RecorrenciaService._buscar_ocorrencia(session, recorrencia_id, usuario_id, data)
+
+                if erro:
+                    return False, erro
+
+                session.add(RecorrenciaExcecao(recorrencia_id=recorrencia_id, data=data))
+                return True, "Ocorrência excluída com sucesso!"
+        except Exception as e:
+            return False, f"Erro ao excluir ocorrência: {str(e)}"
+
+    @staticmethod
+    @leitura_em_cache
+    def listar_recorrencias(usuario_id: int) -> List[Dict]:
+        """
+        Lista as regras de recorrência de um usuário.
+
+        Args:
+            usuario_id: ID do usuário
+
+        Returns:
+            Lista de dicionários com os dados das recorrências
+        """
+        try:
+            consulta = select(
+                Recorrencia.id,
+                Recorrencia.descricao,
+                Recorrencia.valor,
+                Recorrencia.tipo,
+                Recorrencia.frequencia,
+                Recorrencia.intervalo,
+                Recorrencia.data_inicio,
+                Recorrencia.data_fim,
+                Categoria.id.label('categoria_id'),
+                Categoria.nome.label('categoria_nome'),
+                Categoria.tipo.label('categoria_tipo'),
+                Categoria.cor.label('categoria_cor')
+            ).join(
+                Categoria, Categoria.id == Recorrencia.categoria_id
+            ).where(
+                Recorrencia.usuario_id == usuario_id
+            ).order_by(Recorrencia.data_inicio.desc(), Recorrencia.id.desc())
+
+            with db_manager.get_session_leitura() as session:
+                return [dict(linha) for linha in session.execute(consulta).mappings()]
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao listar recorrências: {e}")
+            return []
+
+    @staticmethod
+    @leitura_em_cache
+    def listar_ocorrencias(
+        usuario_id: int,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        categoria_id: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Calcula as ocorrências das recorrências de um usuário em um intervalo.
+
+        Args:
+            usuario_id: ID do usuário
+            inicio: Data inicial (inclusiva); None = desde o início de cada regra
+            fim: Data final (exclusiva); None = hoje + HORIZONTE_RECORRENCIAS
+            categoria_id: Filtro opcional por categoria
+
+        Returns:
+            Lista de ocorrências no formato de LancamentoService.listar_lancamentos
+        """
+        try:
+            with db_manager.get_session_leitura() as session:
+                return RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim, categoria_id)
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao listar ocorrências: {e}")
+            return []
+
+    @staticmethod
+    def ocorrencias(
+        session: Session,
+        usuario_id: int,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        categoria_id: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Calcula as ocorrências na sessão informada (usado pelas leituras dos outros serviços).
+
+        Cada ocorrência tem as chaves de um lançamento listado, com id None e
+        recorrencia_id preenchido. Ocorrências materializadas ou removidas são omitidas.
+        """
+        if fim is None:
+            fim = date.today() + HORIZONTE_RECORRENCIAS
+
+        consulta = select(
+            Recorrencia,
+            Categoria.nome.label('categoria_nome'),
+            Categoria.tipo.label('categoria_tipo'),
+            Categoria.cor.label('categoria_cor')
+        ).join(
+            Categoria, Categoria.id == Recorrencia.categoria_id
+        ).where(
+            Recorrencia.usuario_id == usuario_id,
+            Recorrencia.data_inicio < fim
+        )
+
+        if inicio:
+            consulta = consulta.where(or_(Recorrencia.data_fim.is_(None), Recorrencia.data_fim >= inicio))
+        if categoria_id:
+            consulta = consulta.where(Recorrencia.categoria_id == categoria_id)
+
+        regras = session.execute(consulta).all()
+        if not regras:
+            return []
+
+        # Ocorrências que não devem mais ser calculadas
+        excecoes = select(RecorrenciaExcecao.recorrencia_id, RecorrenciaExcecao.data).where(
+            RecorrenciaExcecao.recorrencia_id.in_([regra.Recorrencia.id for regra in regras]),
+            RecorrenciaExcecao.data < fim
+        )
+        if inicio:
+            excecoes = excecoes.where(RecorrenciaExcecao.data >= inicio)
+        ignoradas = set(session.execute(excecoes).all())
+
+        resultado = []
+        for regra in regras:
+            recorrencia = regra.Recorrencia
+            for data_ocorrencia in RecorrenciaService.datas_ocorrencias(recorrencia, inicio, fim):
+                if (recorrencia.id, data_ocorrencia) in ignoradas:
+                    continue
+
+                resultado.append({
+                    'id': None,
+                    'data': data_ocorrencia,
+                    'valor': recorrencia.valor,
+                    'descricao': recorrencia.descricao,
+                    'tipo': recorrencia.tipo,
+                    'categoria_id': recorrencia.categoria_id,
+                    'categoria_nome': regra.categoria_nome,
+                    'categoria_tipo': regra.categoria_tipo,
+                    'categoria_cor': regra.categoria_cor,
+                    'recorrencia_id': recorrencia.id
+                })
+
+        return resultado
+
+    @staticmethod
+    def totais_por_mes_categoria(
+        session: Session,
+        usuario_id: int,
+        inicio: date,
+        fim: date
+    ) -> Dict[tuple, float]:
+        """
+        Soma as ocorrências por mês e categoria, no formato das chaves do resumo mensal.
+
+        Returns:
+            Dicionário {(ano, mes, categoria_id): total}
+        """
+        totais = {}
+        for ocorrencia in RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim):
+            chave = (ocorrencia['data'].year, ocorrencia['data'].month, ocorrencia['categoria_id'])
+            totais[chave] = totais.get(chave, 0.0) + ocorrencia['valor']
+        return totais
+
+    @staticmethod
+    def datas_ocorrencias(recorrencia: Recorrencia, inicio: Optional[date], fim: date) -> Iterator[date]:
+        """
+        Gera as datas das ocorrências de uma regra dentro de [inicio, fim).
+
+        Cada data é calculada a partir da data inicial (e não da anterior), para
+        que ocorrências no dia 31 voltem ao dia 31 após meses mais curtos.
+        """
+        limite = fim
+        if recorrencia.data_fim:
+            limite = min(limite, recorrencia.data_fim + timedelta(days=1))
+
+        passo = recorrencia.passo
+        indice = 0
+
+        # Salta direto para perto do início do intervalo, sem percorrer o histórico
+        if inicio and inicio > recorrencia.data_inicio:
+            if recorrencia.frequencia == FrequenciaRecorrencia.SEMANAL:
+                decorrido = (inicio - recorrencia.data_inicio).days // 7
+            elif recorrencia.frequencia == FrequenciaRecorrencia.ANUAL:
+                decorrido = inicio.year - recorrencia.data_inicio.year
+            else:
+                decorrido = (inicio.year - recorrencia.data_inicio.year) * 12 + inicio.month - recorrencia.data_inicio.month
+            indice = max(0, decorrido // recorrencia.intervalo - 1)
+
+        while True:
+            data_ocorrencia = recorrencia.data_inicio + passo * indice
+            if data_ocorrencia >= limite:
+                break
+            if inicio is None or data_ocorrencia >= inicio:
+                yield data_ocorrencia
+            indice += 1
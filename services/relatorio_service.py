@@ -0,0 +1,401 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from collections import defaultdict
+from datetime import date
+import os
+import shutil
+import time
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import Integer, and_, cast, func, select
+from models.usuario import Usuario
+from models.categoria import Categoria, TipoCategoria
+from models.lancamento import Lancamento
+from models.orcamento_mensal import OrcamentoMensal
+from models.recorrencia import Recorrencia
+from models.resumo_mensal import ResumoMensal
+from database.connection import db_manager
+from services.cache import leitura_em_cache
+from services.lancamento_service import LancamentoService
+from services.orcamento_service import OrcamentoService
+from services.recorrencia_service import RecorrenciaService
+from services.tarefas import FilaTarefas
+from reports import RelatorioFinanceiro, cache_relatorios, impressao_digital
+
+
+# Usuários cujos dados são lidos do banco por vez na geração em lote
+USUARIOS_POR_LOTE_RELATORIOS = 200
+
+# Relatórios aguardando ou em geração por processo (limita a memória dos dados enfileirados)
+RELATORIOS_PENDENTES_POR_PROCESSO = 4
+
+# Prefixo das chaves das tarefas de relatório na fila
+PREFIXO_TAREFA_RELATORIO = 'relatorio_mensal'
+
+# Fila dos relatórios pedidos pela interface, gerados em segundo plano
+fila_relatorios = FilaTarefas()
+
+
+def _gerar_arquivo(dados: Dict, caminho: str) -> float:
+    """
+    Gera um relatório e grava o PDF em caminho (executado nos processos do lote).
+
+    Returns:
+        Segundos gastos na geração
+    """
+    inicio = time.perf_counter()
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    pdf = RelatorioFinanceiro().gerar_relatorio_mensal(
+        dados['usuario_nome'],
+        dados['mes'],
+        dados['ano'],
+        dados['totais'],
+        dados['lancamentos'],
+        dados['orcamentos'],
+        em_arquivo_temporario=True
+    )
+
+    with pdf, open(caminho, 'wb') as arquivo:
+        shutil.copyfileobj(pdf, arquivo)
+
+    return time.perf_counter() - inicio
+
+
+class RelatorioService:
+    """Serviço de geração de relatórios em PDF (individuais, com cache em disco, e em lote)."""
+
+    @staticmethod
+    def caminho_relatorio(diretorio: str, usuario_id: int, mes: int, ano: int) -> str:
+        """Caminho do PDF de um usuário e mês dentro do diretório de saída."""
+        return os.path.join(diretorio, f"usuario_{usuario_id}", f"relatorio_financeiro_{mes:02d}_{ano}.pdf")
+
+    @staticmethod
+    def _dados_relatorio(usuario_id: int, mes: int, ano: int) -> Tuple[Dict, List[Dict], List[Dict]]:
+        """Totais, lançamentos e orçamentos do relatório de um mês."""
+        return (
+            LancamentoService.calcular_totais(usuario_id, mes, ano),
+            LancamentoService.listar_lancamentos(usuario_id, mes, ano),
+            OrcamentoService.listar_orcamentos(usuario_id, mes, ano)
+        )
+
+    @staticmethod
+    @leitura_em_cache
+    def resumo_relatorio(usuario_id: int, usuario_nome: str, mes: int, ano: int) -> Dict:
+        """
+        Resumo do relatório de um mês, para a pré-visualização.
+
+        Fica no cache de serviços até a próxima escrita do usuário, então as
+        reexecuções da página não releem os lançamentos.
+
+        Returns:
+            Dicionário com totais, quantidade_lancamentos, quantidade_orcamentos
+            e impressao_digital (chave do PDF no cache de relatórios)
+        """
+        totais, lancamentos, orcamentos = RelatorioService._dados_relatorio(usuario_id, mes, ano)
+
+        return {
+            'totais': totais,
+            'quantidade_lancamentos': len(lancamentos),
+            'quantidade_orcamentos': len(orcamentos),
+            'impressao_digital': impressao_digital(usuario_nome, mes, ano, totais, lancamentos, orcamentos)
+        }
+
+    @staticmethod
+    def obter_relatorio(
+        usuario_id: int,
+        usuario_nome: str,
+        mes: int,
+        ano: int,
+        progresso: Optional[Callable[[float], None]] = None
+    ) -> Tuple[bool, str, Optional[bytes]]:
+        """
+        Retorna o PDF do relatório de um mês, do cache em disco quando os dados não mudaram.
+
+        Args:
+            usuario_id: ID do usuário
+            usuario_nome: Nome exibido no relatório
+            mes: Mês (1-12)
+            ano: Ano
+            progresso: Chamado durante a geração com a fração concluída (0 a 1)
+
+        Returns:
+            Tupla (sucesso, mensagem, conteúdo do PDF)
+        """
+        resumo = RelatorioService.resumo_relatorio(usuario_id, usuario_nome, mes, ano)
+
+        pdf = cache_relatorios.obter(usuario_id, mes, ano, resumo['impressao_digital'])
+        if pdf is not None:
+            return True, "Relatório recuperado do cache!", pdf
+
+        totais, lancamentos, orcamentos = RelatorioService._dados_relatorio(usuario_id, mes, ano)
+        if not lancamentos:
+            return False, "Não há lançamentos registrados neste período para gerar relatório.", None
+
+        try:
+            pdf = RelatorioFinanceiro().gerar_relatorio_mensal(
+                usuario_nome, mes, ano, totais, lancamentos, orcamentos, progresso=progresso
+            ).getvalue()
+        except Exception as e:
+            return False, f"Erro ao gerar relatório: {str(e)}", None
+
+        # A chave vem dos dados usados na geração, que podem ser mais novos que os do resumo
+        impressao = impressao_digital(usuario_nome, mes, ano, totais, lancamentos, orcamentos)
+        try:
+            cache_relatorios.armazenar(usuario_id, mes, ano, impressao, pdf)
+        except OSError as e:
+            print(f"Erro ao gravar relatório no cache: {e}")
+
+        return True, "Relatório gerado com sucesso!", pdf
+
+    @staticmethod
+    def enfileirar_relatorio(usuario_id: int, usuario_nome: str, mes: int, ano: int) -> Tuple[bool, str, Optional[str]]:
+        """
+        Pede a geração do relatório de um mês em segundo plano (ver obter_relatorio).
+
+        Returns:
+            Tupla (sucesso, mensagem, id da tarefa)
+        """
+        return fila_relatorios.submeter(
+            usuario_id,
+            f"{PREFIXO_TAREFA_RELATORIO}_{ano}_{mes:02d}",
+            RelatorioService.obter_relatorio,
+            {'usuario_id': usuario_id, 'usuario_nome': usuario_nome, 'mes': mes, 'ano': ano}
+        )
+
+    @staticmethod
+    def listar_tarefas_relatorios(usuario_id: int) -> List[Dict]:
+        """
+        Lista os relatórios pedidos em segundo plano pelo usuário, dos mais recentes aos mais antigos.
+
+        Returns:
+            Tarefas como em FilaTarefas.listar; parametros tem mes e ano, e
+            resultado, o conteúdo do PDF quando a tarefa foi concluída
+        """
+        return fila_relatorios.listar(usuario_id, PREFIXO_TAREFA_RELATORIO)
+
+    @staticmethod
+    def _dados_usuarios(session, usuarios: List, inicio: date, fim: date) -> Iterator[Dict]:
+        """Lê, com uma consulta por tabela, os dados dos relatórios de um grupo de usuários."""
+        ids = [usuario.id for usuario in usuarios]
+        meses = []
+        mes_atual = inicio
+        while mes_atual < fim:
+            meses.append((mes_atual.year, mes_atual.month))
+            mes_atual += relativedelta(months=1)
+
+        # Lançamentos do período de todos os usuários do grupo
+        lancamentos = defaultdict(list)
+        linhas = session.execute(
+            select(
+                Lancamento.id,
+                Lancamento.usuario_id,
+                Lancamento.data,
+                Lancamento.valor,
+                Lancamento.descricao,
+                Categoria.nome.label('categoria_nome'),
+                Categoria.tipo.label('categoria_tipo')
+            ).join(
+                Categoria, Categoria.id == Lancamento.categoria_id
+            ).where(
+                Lancamento.usuario_id.in_(ids),
+                Lancamento.data >= inicio,
+                Lancamento.data < fim
+            ).order_by(Lancamento.data.desc(), Lancamento.id.desc())
+        ).mappings()
+        for linha in linhas:
+            lancamentos[(linha['usuario_id'], linha['data'].year, linha['data'].month)].append(dict(linha))
+
+        # Ocorrências de recorrências, só para quem tem regras no período
+        com_recorrencias = session.execute(
+            select(Recorrencia.usuario_id).distinct().where(
+                Recorrencia.usuario_id.in_(ids),
+                Recorrencia.data_inicio < fim
+            )
+        ).scalars().all()
+        recorrentes = defaultdict(float)
+        for usuario_id in com_recorrencias:
+            for ocorrencia in RecorrenciaService.ocorrencias(session, usuario_id, inicio, fim):
+                chave = (usuario_id, ocorrencia['data'].year, ocorrencia['data'].month)
+                lancamentos[chave].append(ocorrencia)
+                recorrentes[chave + (ocorrencia['categoria_id'],)] += ocorrencia['valor']
+
+        # Mesma ordem de LancamentoService.listar_lancamentos
+        for chave in {chave[:3] for chave in recorrentes}:
+            lancamentos[chave].sort(key=LancamentoService._chave_ordenacao, reverse=True)
+
+        # Orçamentos do período, com o realizado lido do resumo mensal
+        realizado = select(
+            ResumoMensal.usuario_id,
+            ResumoMensal.ano,
+            ResumoMensal.mes,
+            ResumoMensal.categoria_id,
+            ResumoMensal.total.label('valor_realizado')
+        ).where(
+            ResumoMensal.usuario_id.in_(ids)
+        ).subquery()
+
+        # mes_ano é 'MM/YYYY'
+        mes_orcamento = cast(func.substr(OrcamentoMensal.mes_ano, 1, 2), Integer)
+        ano_orcamento = cast(func.substr(OrcamentoMensal.mes_ano, 4, 4), Integer)
+
+        orcamentos = defaultdict(list)
+        linhas = session.execute(
+            select(
+                OrcamentoMensal.usuario_id,
+                *OrcamentoService._colunas_orcamento(realizado)
+            ).join(
+                Categoria, Categoria.id == OrcamentoMensal.categoria_id
+            ).outerjoin(
+                realizado, and_(
+                    realizado.c.usuario_id == OrcamentoMensal.usuario_id,
+                    realizado.c.categoria_id == OrcamentoMensal.categoria_id,
+                    realizado.c.ano == ano_orcamento,
+                    realizado.c.mes == mes_orcamento
+                )
+            ).where(
+                OrcamentoMensal.usuario_id.in_(ids),
+                OrcamentoMensal.mes_ano.in_([f"{mes:02d}/{ano}" for ano, mes in meses])
+            ).order_by(Categoria.nome)
+        ).all()
+        for linha in linhas:
+            mes, ano = (int(parte) for parte in linha.mes_ano.split('/'))
+            chave = (linha.usuario_id, ano, mes)
+            orcamentos[chave].append(
+                OrcamentoService._montar_orcamento(linha, recorrentes.get(chave + (linha.categoria_id,), 0.0))
+            )
+
+        for usuario in usuarios:
+            for ano, mes in meses:
+                chave = (usuario.id, ano, mes)
+                lancamentos_mes = lancamentos.pop(chave, [])
+
+                total_entradas = sum(
+                    l['valor'] for l in lancamentos_mes if l['categoria_tipo'] == TipoCategoria.ENTRADA
+                )
+                total_despesas = sum(
+                    l['valor'] for l in lancamentos_mes if l['categoria_tipo'] == TipoCategoria.DESPESA
+                )
+
+                yield {
+                    'usuario_id': usuario.id,
+                    'usuario_nome': usuario.nome,
+                    'mes': mes,
+                    'ano': ano,
+                    'totais': {
+                        'total_entradas': total_entradas,
+                        'total_despesas': total_despesas,
+                        'saldo': total_entradas - total_despesas
+                    },
+                    'lancamentos': lancamentos_mes,
+                    'orcamentos': orcamentos.pop(chave, [])
+                }
+
+    @staticmethod
+    def dados_relatorios(
+        usuario_ids: Optional[List[int]],
+        inicio: date,
+        fim: date,
+        usuarios_por_lote: int = USUARIOS_POR_LOTE_RELATORIOS
+    ) -> Iterator[Dict]:
+        """
+        Percorre os dados dos relatórios mensais de vários usuários.
+
+        Os dados são lidos em grupos de usuários, com uma consulta por tabela
+        para o grupo inteiro (em vez de três leituras por usuário e mês).
+
+        Args:
+            usuario_ids: IDs dos usuários (None para todos)
+            inicio: Primeiro dia do primeiro mês (inclusivo)
+            fim: Primeiro dia do mês seguinte ao último (exclusivo)
+            usuarios_por_lote: Usuários lidos do banco por vez
+
+        Yields:
+            Dicionários com usuario_id, usuario_nome, mes, ano e os argumentos
+            totais, lancamentos e orcamentos de gerar_relatorio_mensal
+        """
+        with db_manager.get_session_leitura() as session:
+            consulta = select(Usuario.id, Usuario.nome).order_by(Usuario.id)
+            if usuario_ids is not None:
+                consulta = consulta.where(Usuario.id.in_(usuario_ids))
+            usuarios = session.execute(consulta).all()
+
+            for posicao in range(0, len(usuarios), usuarios_por_lote):
+                yield from RelatorioService._dados_usuarios(
+                    session, usuarios[posicao:posicao + usuarios_por_lote], inicio, fim
+                )
+
+    @staticmethod
+    def gerar_lote(
+        usuario_ids: Optional[List[int]],
+        inicio: date,
+        fim: date,
+        diretorio: str,
+        max_workers: Optional[int] = None,
+        incluir_vazios: bool = False,
+        ao_concluir: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
+        """
+        Gera os relatórios mensais de vários usuários em paralelo.
+
+        Os dados são lidos no processo atual (dados_relatorios) e os PDFs são
+        gerados e gravados por um pool de processos. Um relatório com erro
+        não interrompe os demais.
+
+        Args:
+            usuario_ids: IDs dos usuários (None para todos)
+            inicio: Primeiro dia do primeiro mês (inclusivo)
+            fim: Primeiro dia do mês seguinte ao último (exclusivo)
+            diretorio: Diretório de saída (um subdiretório por usuário)
+            max_workers: Número de processos (padrão: núcleos disponíveis)
+            incluir_vazios: Gera também os meses sem lançamentos
+            ao_concluir: Chamado com o resultado de cada relatório concluído
+
+        Returns:
+            Dicionário com gerados, sem_lancamentos, falhas (lista de
+            dicionários com usuario_id, mes, ano e erro), workers, segundos,
+            segundos_geracao (soma do tempo de geração nos processos),
+            relatorios_por_segundo e relatorios_por_segundo_por_worker
+        """
+        if max_workers is None:
+            max_workers = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
+        resumo = {'gerados': 0, 'sem_lancamentos': 0, 'falhas': [], 'workers': max_workers, 'segundos_geracao': 0.0}
+        inicio_lote = time.perf_counter()
+
+        def concluir(futuro, dados: Dict):
+            resultado = {'usuario_id': dados['usuario_id'], 'mes': dados['mes'], 'ano': dados['ano']}
+            try:
+                resumo['segundos_geracao'] += futuro.result()
+                resumo['gerados'] += 1
+                resultado['sucesso'] = True
+            except Exception as e:
+                resultado['sucesso'] = False
+                resultado['erro'] = str(e)
+                resumo['falhas'].append({chave: resultado[chave] for chave in ('usuario_id', 'mes', 'ano', 'erro')})
+            if ao_concluir:
+                ao_concluir(resultado)
+
+        pendentes = {}
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for dados in RelatorioService.dados_relatorios(usuario_ids, inicio, fim):
+                if not dados['lancamentos'] and not incluir_vazios:
+                    resumo['sem_lancamentos'] += 1
+                    continue
+
+                caminho = RelatorioService.caminho_relatorio(diretorio, dados['usuario_id'], dados['mes'], dados['ano'])
+                pendentes[executor.submit(_gerar_arquivo, dados, caminho)] = dados
+
+                # Não lê mais dados do que os processos conseguem consumir
+                if len(pendentes) >= max_workers * RELATORIOS_PENDENTES_POR_PROCESSO:
+                    concluidos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                    for futuro in concluidos:
+                        concluir(futuro, pendentes.pop(futuro))
+
+            for futuro in list(pendentes):
+                concluir(futuro, pendentes.pop(futuro))
+
+        resumo['segundos'] = time.perf_counter() - inicio_lote
+        resumo['relatorios_por_segundo'] = resumo['gerados'] / resumo['segundos'] if resumo['segundos'] > 0 else 0.0
+        resumo['relatorios_por_segundo_por_worker'] = resumo['relatorios_por_segundo'] / max_workers
+
+        return resumo
@@ -0,0 +1,319 @@
+from typing import List, Dict, Optional
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func, extract, select, update, insert, delete, bindparam, exists
+from sqlalchemy.orm import Session
+from models.lancamento import Lancamento
+from models.resumo_mensal import ResumoMensal
+from models.usuario import Usuario
+from database.connection import db_manager
+from services.cache import invalida_cache
+
+
+# Diferença máxima aceita entre o resumo e a soma dos lançamentos
+TOLERANCIA_VERIFICACAO = 0.005
+
+# Acima dessa quantidade de chaves, as variações são aplicadas em executemany
+LIMITE_DELTAS_INDIVIDUAIS = 10
+
+# Threads de reconstrução no SQLite: cada reconstrução é uma transação de escrita, e o
+# SQLite admite um escritor por vez (as demais threads só esperariam pelo busy_timeout)
+THREADS_RECONSTRUCAO_SQLITE = 1
+
+
+class ResumoService:
+    """Serviço de manutenção da tabela resumo_mensal (totais por usuário, mês e categoria)."""
+
+    @staticmethod
+    def registrar(
+        session: Session,
+        usuario_id: int,
+        categoria_id: int,
+        data: date,
+        valor: float,
+        quantidade: int = 1
+    ):
+        """
+        Aplica no resumo o efeito de incluir (ou remover) lançamentos.
+
+        Deve ser chamado na mesma sessão da escrita do lançamento, para que
+        ambos sejam confirmados ou desfeitos juntos.
+
+        Args:
+            session: Sessão da transação corrente
+            usuario_id: ID do usuário
+            categoria_id: ID da categoria
+            data: Data do lançamento
+            valor: Valor a somar (negativo para remoção)
+            quantidade: Quantidade a somar (negativa para remoção)
+        """
+        ResumoService.aplicar_deltas(
+            session,
+            usuario_id,
+            {(data.year, data.month, categoria_id): (valor, quantidade)}
+        )
+
+    @staticmethod
+    def aplicar_deltas(session: Session, usuario_id: int, deltas: Dict[tuple, tuple]):
+        """
+        Aplica um conjunto de variações no resumo de um usuário.
+
+        Linhas que ficam sem lançamentos (quantidade zero) são removidas.
+
+        Args:
+            session: Sessão da transação corrente
+            usuario_id: ID do usuário
+            deltas: Dicionário {(ano, mes, categoria_id): (valor, quantidade)}
+        """
+        if len(deltas) > LIMITE_DELTAS_INDIVIDUAIS:
+            ResumoService._aplicar_deltas_em_lote(session, usuario_id, deltas)
+        else:
+            ResumoService._aplicar_deltas_individuais(session, usuario_id, deltas)
+
+        if any(quantidade < 0 for _, quantidade in deltas.values()):
+            # Sem a linha vazia, a categoria sem lançamentos pode ser excluída (chave estrangeira)
+            session.execute(delete(ResumoMensal).where(
+                ResumoMensal.usuario_id == usuario_id,
+                ResumoMensal.quantidade <= 0
+            ))
+
+    @staticmethod
+    def _aplicar_deltas_individuais(session: Session, usuario_id: int, deltas: Dict[tuple, tuple]):
+        """Aplica poucas variações com um UPDATE (ou INSERT) por chave."""
+        for (ano, mes, categoria_id), (valor, quantidade) in deltas.items():
+            # UPDATE primeiro: no SQLite ele já reserva a escrita e evita inserção duplicada
+            resultado = session.execute(
+                update(ResumoMensal).where(
+                    ResumoMensal.usuario_id == usuario_id,
+                    ResumoMensal.ano == ano,
+                    ResumoMensal.mes == mes,
+                    ResumoMensal.categoria_id == categoria_id
+                ).values(
+                    total=ResumoMensal.total + valor,
+                    quantidade=ResumoMensal.quantidade + quantidade
+                )
+            )
+
+            if resultado.rowcount == 0:
+                session.execute(insert(ResumoMensal).values(
+                    usuario_id=usuario_id,
+                    ano=ano,
+                    mes=mes,
+                    categoria_id=categoria_id,
+                    total=valor,
+                    quantidade=quantidade
+                ))
+
+    @staticmethod
+    def _aplicar_deltas_em_lote(session: Session, usuario_id: int, deltas: Dict[tuple, tuple]):
+        """
+        Aplica muitas variações com um UPDATE e um INSERT em executemany.
+
+        Usado por importações e lotes, que tocam centenas de meses/categorias:
+        evita um par UPDATE/INSERT compilado e executado por chave.
+        """
+        tabela = ResumoMensal.__table__
+
+        existentes = set(session.execute(
+            select(ResumoMensal.ano, ResumoMensal.mes, ResumoMensal.categoria_id).where(
+                ResumoMensal.usuario_id == usuario_id,
+                ResumoMensal.ano.in_({ano for ano, _, _ in deltas})
+            )
+        ).tuples())
+
+        atualizacoes = []
+        insercoes = []
+        for (ano, mes, categoria_id), (valor, quantidade) in deltas.items():
+            if (ano, mes, categoria_id) in existentes:
+                atualizacoes.append({
+                    'p_ano': ano, 'p_mes': mes, 'p_categoria_id': categoria_id,
+                    'p_total': valor, 'p_quantidade': quantidade
+                })
+            else:
+                insercoes.append({
+                    'usuario_id': usuario_id, 'ano': ano, 'mes': mes,
+                    'categoria_id': categoria_id, 'total': valor, 'quantidade': quantidade
+                })
+
+        if atualizacoes:
+            session.execute(
+                update(tabela).where(
+                    tabela.c.usuario_id == usuario_id,
+                    tabela.c.ano == bindparam('p_ano'),
+                    tabela.c.mes == bindparam('p_mes'),
+                    tabela.c.categoria_id == bindparam('p_categoria_id')
+                ).values(
+                    total=tabela.c.total + bindparam('p_total'),
+                    quantidade=tabela.c.quantidade + bindparam('p_quantidade')
+                ),
+                atualizacoes
+            )
+
+        if insercoes:
+            session.execute(insert(tabela), insercoes)
+
+    @staticmethod
+    def _agregado_lancamentos(usuario_id: int):
+        """Consulta que recalcula o resumo de um usuário a partir dos lançamentos."""
+        ano = extract('year', Lancamento.data)
+        mes = extract('month', Lancamento.data)
+
+        return select(
+            Lancamento.usuario_id,
+            ano.label('ano'),
+            mes.label('mes'),
+            Lancamento.categoria_id,
+            func.sum(Lancamento.valor).label('total'),
+            func.count(Lancamento.id).label('quantidade')
+        ).where(
+            Lancamento.usuario_id == usuario_id
+        ).group_by(Lancamento.usuario_id, ano, mes, Lancamento.categoria_id)
+
+    @staticmethod
+    @invalida_cache
+    def reconstruir(usuario_id: int) -> tuple[bool, str]:
+        """
+        Recalcula todo o resumo de um usuário a partir dos lançamentos.
+
+        Args:
+            usuario_id: ID do usuário
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        try:
+            with db_manager.get_session() as session:
+                session.execute(delete(ResumoMensal).where(ResumoMensal.usuario_id == usuario_id))
+                session.execute(
+                    insert(ResumoMensal).from_select(
+                        ['usuario_id', 'ano', 'mes', 'categoria_id', 'total', 'quantidade'],
+                        ResumoService._agregado_lancamentos(usuario_id)
+                    )
+                )
+
+                return True, "Resumo reconstruído com sucesso!"
+        except Exception as e:
+            return False, f"Erro ao reconstruir resumo: {str(e)}"
+
+    @staticmethod
+    def verificar(usuario_id: int) -> List[Dict]:
+        """
+        Compara o resumo de um usuário com a soma atual dos lançamentos.
+
+        Args:
+            usuario_id: ID do usuário
+
+        Returns:
+            Lista de divergências (vazia quando o resumo está consistente)
+        """
+        with db_manager.get_session_leitura() as session:
+            esperado = {
+                (linha.ano, linha.mes, linha.categoria_id): (float(linha.total), linha.quantidade)
+                for linha in session.execute(ResumoService._agregado_lancamentos(usuario_id))
+            }
+
+            armazenado = {
+                (linha.ano, linha.mes, linha.categoria_id): (linha.total, linha.quantidade)
+                for linha in session.execute(
+                    select(ResumoMensal).where(ResumoMensal.usuario_id == usuario_id)
+                ).scalars()
+            }
+
+        divergencias = []
+
+        for chave in sorted(set(esperado) | set(armazenado)):
+            total_esperado, qtd_esperada = esperado.get(chave, (0.0, 0))
+            total_armazenado, qtd_armazenada = armazenado.get(chave, (0.0, 0))
+
+            if qtd_esperada != qtd_armazenada or abs(total_esperado - total_armazenado) > TOLERANCIA_VERIFICACAO:
+                ano, mes, categoria_id = chave
+                divergencias.append({
+                    'usuario_id': usuario_id,
+                    'ano': ano,
+                    'mes': mes,
+                    'categoria_id': categoria_id,
+                    'total_esperado': total_esperado,
+                    'total_armazenado': total_armazenado,
+                    'quantidade_esperada': qtd_esperada,
+                    'quantidade_armazenada': qtd_armazenada
+                })
+
+        return divergencias
+
+    @staticmethod
+    def reconstruir_todos(
+        usuario_ids: Optional[List[int]] = None,
+        apenas_verificar: bool = False,
+        max_workers: Optional[int] = None
+    ) -> Dict[int, tuple]:
+        """
+        Reconstrói (ou verifica) o resumo de vários usuários em paralelo.
+
+        Args:
+            usuario_ids: IDs dos usuários (todos quando None)
+            apenas_verificar: Só verifica, sem reescrever o resumo
+            max_workers: Número de threads (padrão do ThreadPoolExecutor quando None;
+                a reconstrução no SQLite usa no máximo THREADS_RECONSTRUCAO_SQLITE)
+
+        Returns:
+            Dicionário {usuario_id: (sucesso, mensagem)}
+        """
+        if usuario_ids is None:
+            with db_manager.get_session() as session:
+                usuario_ids = list(session.execute(select(Usuario.id).order_by(Usuario.id)).scalars())
+
+        def processar(usuario_id: int) -> tuple:
+            if not apenas_verificar:
+                return ResumoService.reconstruir(usuario_id)
+
+            try:
+                divergencias = ResumoService.verificar(usuario_id)
+            except Exception as e:
+                return False, f"Erro ao verificar resumo: {str(e)}"
+
+            if divergencias:
+                return False, f"{len(divergencias)} divergências encontradas"
+            return True, "Resumo consistente"
+
+        if not apenas_verificar and db_manager.engine.dialect.name == 'sqlite':
+            max_workers = min(max_workers or THREADS_RECONSTRUCAO_SQLITE, THREADS_RECONSTRUCAO_SQLITE)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(usuario_ids, executor.map(processar, usuario_ids)))
+
+    @staticmethod
+    def reconstruir_se_necessario() -> bool:
+        """
+        Preenche o resumo dos usuários com lançamentos e nenhuma linha em resumo_mensal
+        (bancos criados antes da tabela existir ou carga inicial interrompida).
+
+        Usuários cuja reconstrução falhar são reprocessados um a um.
+
+        Returns:
+            True se alguma reconstrução foi executada
+
+        Raises:
+            RuntimeError: Se o resumo de algum usuário não puder ser reconstruído
+        """
+        with db_manager.get_session() as session:
+            pendentes = list(session.execute(
+                select(Lancamento.usuario_id).distinct().where(
+                    ~exists().where(ResumoMensal.usuario_id == Lancamento.usuario_id)
+                ).order_by(Lancamento.usuario_id)
+            ).scalars())
+
+        if not pendentes:
+            return False
+
+        resultados = ResumoService.reconstruir_todos(pendentes)
+        falhas = {}
+        for usuario_id, (sucesso, _) in resultados.items():
+            if not sucesso:
+                sucesso, mensagem = ResumoService.reconstruir(usuario_id)
+                if not sucesso:
+                    falhas[usuario_id] = mensagem
+
+        if falhas:
+            detalhes = '; '.join(f"usuário {usuario_id}: {mensagem}" for usuario_id, mensagem in falhas.items())
+            raise RuntimeError(f"Resumo mensal não reconstruído ({detalhes})")
+        return True
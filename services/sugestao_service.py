@@ -0,0 +1,323 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import math
+from sqlalchemy import func, select, update, insert, delete, bindparam
+from sqlalchemy.orm import Session
+from models.lancamento import Lancamento
+from models.resumo_mensal import ResumoMensal
+from models.termo_categoria import TermoCategoria, TAMANHO_TERMO
+from models.usuario import Usuario
+from database.busca import palavras_busca
+from database.connection import db_manager
+from services.cache import leitura_em_cache, invalida_cache, registrar_falha_leitura
+
+
+# Suavização (Lidstone) das contagens de termos: evita probabilidade zero para termo nunca visto na categoria;
+# abaixo de 1 para que poucos lançamentos já bastem para uma sugestão
+SUAVIZACAO = 0.1
+
+# Probabilidade mínima, entre as categorias candidatas, para a categoria ser sugerida
+CONFIANCA_MINIMA = 0.5
+
+# Acima dessa quantidade de termos, as variações são aplicadas em executemany
+LIMITE_DELTAS_INDIVIDUAIS = 10
+
+
+def termos_descricao(descricao: Optional[str]) -> Set[str]:
+    """Palavras de uma descrição usadas pelo modelo: normalizadas, sem números e sem repetição."""
+    return {
+        palavra[:TAMANHO_TERMO] for palavra in palavras_busca(descricao)
+        if len(palavra) > 1 and not palavra.isdigit()
+    }
+
+
+class ModeloCategorias:
+    """
+    Naive Bayes multinomial das categorias de um usuário, pelas palavras das descrições.
+
+    É montado a partir de termos_categoria (uma linha por palavra e categoria
+    do usuário) e da quantidade de lançamentos por categoria do resumo
+    mensal: o tamanho acompanha o vocabulário do usuário, não o histórico.
+    Classificar uma descrição consulta apenas dicionários em memória.
+    """
+
+    def __init__(self, termos: Dict[str, Dict[int, int]], lancamentos: Dict[int, int]):
+        self.termos = termos
+
+        termos_categoria = defaultdict(int)
+        for contagens in termos.values():
+            for categoria_id, quantidade in contagens.items():
+                termos_categoria[categoria_id] += quantidade
+
+        categorias = set(lancamentos) | set(termos_categoria)
+        total = sum(lancamentos.values())
+        # Um termo a mais no vocabulário reserva probabilidade para palavras ainda não vistas
+        vocabulario = len(termos) + 1
+
+        self.log_priori = {
+            categoria_id: math.log((lancamentos.get(categoria_id, 0) + SUAVIZACAO) / (total + SUAVIZACAO * len(categorias)))
+            for categoria_id in categorias
+        }
+        self.log_denominador = {
+            categoria_id: math.log(termos_categoria[categoria_id] + SUAVIZACAO * vocabulario)
+            for categoria_id in categorias
+        }
+
+    def classificar(self, descricao: Optional[str], categoria_ids: Optional[Iterable[int]] = None) -> Optional[Tuple[int, float]]:
+        """
+        Categoria mais provável de uma descrição.
+
+        Args:
+            descricao: Descrição do lançamento
+            categoria_ids: Categorias candidatas (todas as do modelo quando None)
+
+        Returns:
+            Tupla (categoria_id, probabilidade entre as candidatas), ou None se
+            nenhuma palavra da descrição já apareceu nas categorias candidatas
+        """
+        conhecidos = [self.termos[termo] for termo in termos_descricao(descricao) if termo in self.termos]
+        if not conhecidos:
+            return None
+
+        candidatas = self.log_priori if categoria_ids is None else [
+            categoria_id for categoria_id in categoria_ids if categoria_id in self.log_priori
+        ]
+
+        pontos = {
+            categoria_id: self.log_priori[categoria_id]
+            + sum(math.log(contagens.get(categoria_id, 0) + SUAVIZACAO) for contagens in conhecidos)
+            - len(conhecidos) * self.log_denominador[categoria_id]
+            for categoria_id in candidatas
+        }
+        if not pontos:
+            return None
+
+        melhor = max(pontos, key=pontos.get)
+        if not any(melhor in contagens for contagens in conhecidos):
+            return None
+
+        # Probabilidade normalizada entre as candidatas (log-pontos relativos ao melhor)
+        return melhor, 1 / sum(math.exp(ponto - pontos[melhor]) for ponto in pontos.values())
+
+
+class SugestaoService:
+    """Sugestão de categoria para novos lançamentos a partir do histórico de cada usuário."""
+
+    @staticmethod
+    def _contar_termos(grupos: Iterable[Tuple[int, Optional[str], int]]) -> Counter:
+        """Contagem {(termo, categoria_id): lançamentos} a partir de (categoria_id, descrição, quantidade)."""
+        deltas = Counter()
+        for categoria_id, descricao, quantidade in grupos:
+            for termo in termos_descricao(descricao):
+                deltas[termo, categoria_id] += quantidade
+        return deltas
+
+    @staticmethod
+    def registrar(
+        session: Session,
+        usuario_id: int,
+        lancamentos: Iterable[Tuple[int, Optional[str]]],
+        sinal: int = 1
+    ):
+        """
+        Aplica nas contagens de termos o efeito de incluir (ou remover) lançamentos.
+
+        Deve ser chamado na mesma sessão da escrita dos lançamentos, para que
+        ambos sejam confirmados ou desfeitos juntos.
+
+        Args:
+            session: Sessão da transação corrente
+            usuario_id: ID do usuário
+            lancamentos: Pares (categoria_id, descrição)
+            sinal: 1 para inclusão, -1 para remoção
+        """
+        # Descrições repetidas (importações, parcelas) são separadas em palavras uma vez só
+        deltas = SugestaoService._contar_termos(
+            (categoria_id, descricao, sinal * quantidade)
+            for (categoria_id, descricao), quantidade in Counter(lancamentos).items()
+        )
+        deltas = {chave: quantidade for chave, quantidade in deltas.items() if quantidade}
+        if not deltas:
+            return
+
+        tabela = TermoCategoria.__table__
+
+        if len(deltas) <= LIMITE_DELTAS_INDIVIDUAIS:
+            for (termo, categoria_id), quantidade in deltas.items():
+                # UPDATE primeiro: no SQLite ele já reserva a escrita e evita inserção duplicada
+                resultado = session.execute(
+                    update(tabela).where(
+                        tabela.c.usuario_id == usuario_id,
+                        tabela.c.termo == termo,
+                        tabela.c.categoria_id == categoria_id
+                    ).values(quantidade=tabela.c.quantidade + quantidade)
+                )
+
+                if resultado.rowcount == 0 and quantidade > 0:
+                    session.execute(insert(tabela).values(
+                        usuario_id=usuario_id, termo=termo, categoria_id=categoria_id, quantidade=quantidade
+                    ))
+        else:
+            # Importações e lotes: um UPDATE e um INSERT em executemany
+            existentes = set(session.execute(
+                select(tabela.c.termo, tabela.c.categoria_id).where(tabela.c.usuario_id == usuario_id)
+            ).tuples())
+
+            atualizacoes = [
+                {'p_termo': termo, 'p_categoria_id': categoria_id, 'p_quantidade': quantidade}
+                for (termo, categoria_id), quantidade in deltas.items() if (termo, categoria_id) in existentes
+            ]
+            insercoes = [
+                {'usuario_id': usuario_id, 'termo': termo, 'categoria_id': categoria_id, 'quantidade': quantidade}
+                for (termo, categoria_id), quantidade in deltas.items()
+                if (termo, categoria_id) not in existentes and quantidade > 0
+            ]
+
+            if atualizacoes:
+                session.execute(
+                    update(tabela).where(
+                        tabela.c.usuario_id == usuario_id,
+                        tabela.c.termo == bindparam('p_termo'),
+                        tabela.c.categoria_id == bindparam('p_categoria_id')
+                    ).values(quantidade=tabela.c.quantidade + bindparam('p_quantidade')),
+                    atualizacoes
+                )
+
+            if insercoes:
+                session.execute(insert(tabela), insercoes)
+
+        if sinal < 0:
+            # Termos que deixaram de aparecer na categoria não ocupam o modelo
+            session.execute(delete(tabela).where(tabela.c.usuario_id == usuario_id, tabela.c.quantidade <= 0))
+
+    @staticmethod
+    def carregar_modelo(usuario_id: int) -> ModeloCategorias:
+        """
+        Monta o modelo de um usuário a partir das contagens gravadas (sem cache).
+
+        Usado pela importação, que grava lotes antes de o cache ser
+        invalidado: cada lote passa a ser classificado já com os anteriores.
+        """
+        with db_manager.get_session_leitura() as session:
+            termos = defaultdict(dict)
+            for termo, categoria_id, quantidade in session.execute(
+                select(TermoCategoria.termo, TermoCategoria.categoria_id, TermoCategoria.quantidade).where(
+                    TermoCategoria.usuario_id == usuario_id
+                )
+            ):
+                termos[termo][categoria_id] = quantidade
+
+            lancamentos = {
+                categoria_id: quantidade for categoria_id, quantidade in session.execute(
+                    select(ResumoMensal.categoria_id, func.sum(ResumoMensal.quantidade)).where(
+                        ResumoMensal.usuario_id == usuario_id
+                    ).group_by(ResumoMensal.categoria_id)
+                )
+            }
+
+        return ModeloCategorias(dict(termos), lancamentos)
+
+    @staticmethod
+    @leitura_em_cache
+    def modelo(usuario_id: int) -> ModeloCategorias:
+        """Modelo de um usuário, compartilhado até a próxima escrita dele."""
+        try:
+            return SugestaoService.carregar_modelo(usuario_id)
+        except Exception as e:
+            registrar_falha_leitura()
+            print(f"Erro ao carregar modelo de categorias: {e}")
+            return ModeloCategorias({}, {})
+
+    @staticmethod
+    def sugerir(usuario_id: int, descricao: str, categoria_ids: Optional[List[int]] = None) -> Optional[dict]:
+        """
+        Sugere a categoria de um novo lançamento pela descrição.
+
+        Args:
+            usuario_id: ID do usuário
+            descricao: Descrição digitada
+            categoria_ids: Categorias candidatas (ex.: só as de despesa); todas quando None
+
+        Returns:
+            Dicionário com categoria_id e confianca (0 a 1), ou None quando o
+            histórico não indica uma categoria com confiança suficiente
+        """
+        resultado = SugestaoService.modelo(usuario_id).classificar(descricao, categoria_ids)
+        if resultado is None or resultado[1] < CONFIANCA_MINIMA:
+            return None
+
+        categoria_id, confianca = resultado
+        return {'categoria_id': categoria_id, 'confianca': confianca}
+
+    @staticmethod
+    def classificar_lote(modelo: ModeloCategorias, descricoes: Iterable[Optional[str]]) -> List[Optional[int]]:
+        """
+        Categorias sugeridas para várias descrições (None onde não há sugestão).
+
+        Cada descrição distinta é classificada uma única vez.
+        """
+        sugeridas = {}
+        categorias = []
+
+        for descricao in descricoes:
+            if descricao not in sugeridas:
+                resultado = modelo.classificar(descricao)
+                sugeridas[descricao] = resultado[0] if resultado and resultado[1] >= CONFIANCA_MINIMA else None
+            categorias.append(sugeridas[descricao])
+
+        return categorias
+
+    @staticmethod
+    @invalida_cache
+    def reconstruir(usuario_id: int) -> tuple[bool, str]:
+        """
+        Recalcula as contagens de termos de um usuário a partir dos lançamentos.
+
+        Args:
+            usuario_id: ID do usuário
+
+        Returns:
+            Tupla (sucesso, mensagem)
+        """
+        try:
+            with db_manager.get_session() as session:
+                session.execute(delete(TermoCategoria).where(TermoCategoria.usuario_id == usuario_id))
+
+                # Uma linha por descrição distinta: cada uma é separada em palavras uma vez só
+                grupos = session.execute(
+                    select(Lancamento.categoria_id, Lancamento.descricao, func.count()).where(
+                        Lancamento.usuario_id == usuario_id
+                    ).group_by(Lancamento.categoria_id, Lancamento.descricao)
+                ).tuples()
+
+                linhas = [
+                    {'usuario_id': usuario_id, 'termo': termo, 'categoria_id': categoria_id, 'quantidade': quantidade}
+                    for (termo, categoria_id), quantidade in SugestaoService._contar_termos(grupos).items()
+                ]
+                if linhas:
+                    session.execute(insert(TermoCategoria.__table__), linhas)
+
+                return True, "Sugestões de categoria reconstruídas com sucesso!"
+        except Exception as e:
+            return False, f"Erro ao reconstruir sugestões de categoria: {str(e)}"
+
+    @staticmethod
+    def reconstruir_se_necessario() -> bool:
+        """
+        Preenche as contagens de bancos criados antes da tabela termos_categoria existir.
+
+        Returns:
+            True se a reconstrução foi executada
+        """
+        with db_manager.get_session() as session:
+            tem_termos = session.execute(select(TermoCategoria.usuario_id).limit(1)).first()
+            tem_lancamentos = session.execute(select(Lancamento.id).limit(1)).first()
+
+            if tem_termos or not tem_lancamentos:
+                return False
+
+            usuario_ids = list(session.execute(select(Usuario.id).order_by(Usuario.id)).scalars())
+
+        for usuario_id in usuario_ids:
+            SugestaoService.reconstruir(usuario_id)
+        return True
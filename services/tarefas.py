@@ -0,0 +1,208 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import queue
+import threading
+import uuid
+
+
+# Estados de uma tarefa
+NA_FILA = 'na_fila'
+EXECUTANDO = 'executando'
+CONCLUIDA = 'concluida'
+FALHOU = 'falhou'
+
+ESTADOS_ATIVOS = (NA_FILA, EXECUTANDO)
+
+# Tarefas aguardando execução; acima disso novas tarefas são recusadas
+TAMANHO_MAXIMO_FILA = 32
+
+# Threads que executam as tarefas
+WORKERS_FILA = 2
+
+# Tarefas finalizadas mantidas por usuário (com seus resultados), das mais recentes
+TAREFAS_FINALIZADAS_POR_USUARIO = 5
+
+# Campos de uma tarefa devolvidos por obter e listar
+CAMPOS_TAREFA = (
+    'id', 'usuario_id', 'chave', 'parametros', 'estado', 'progresso', 'mensagem',
+    'resultado', 'criada_em', 'iniciada_em', 'finalizada_em'
+)
+
+
+class FilaTarefas:
+    """
+    Executor de tarefas em segundo plano, compartilhado pelo processo.
+
+    As tarefas entram em uma fila limitada e são executadas por um conjunto
+    fixo de threads, fora das execuções das páginas do Streamlit; a página
+    apenas submete a tarefa e consulta seu estado. Como as tarefas pertencem
+    ao processo e não à sessão, continuam executando quando o usuário sai da
+    página.
+
+    A função de uma tarefa recebe o argumento nomeado progresso (chamável
+    com a fração concluída, de 0 a 1) e retorna uma tupla
+    (sucesso, mensagem, resultado), como os métodos dos serviços.
+    """
+
+    def __init__(
+        self,
+        workers: int = WORKERS_FILA,
+        tamanho_maximo: int = TAMANHO_MAXIMO_FILA,
+        finalizadas_por_usuario: int = TAREFAS_FINALIZADAS_POR_USUARIO
+    ):
+        self.workers = workers
+        self.finalizadas_por_usuario = finalizadas_por_usuario
+        self._fila: queue.Queue = queue.Queue(maxsize=tamanho_maximo)
+        self._tarefas: OrderedDict = OrderedDict()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _iniciar_workers(self):
+        """Cria as threads na primeira submissão (chamado com o lock adquirido)."""
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._executar, name=f"fila-tarefas-{len(self._threads) + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submeter(
+        self,
+        usuario_id: int,
+        chave: str,
+        funcao: Callable[..., Tuple[bool, str, Any]],
+        parametros: Optional[Dict] = None
+    ) -> Tuple[bool, str, Optional[str]]:
+        """
+        Submete uma tarefa para execução em segundo plano.
+
+        Se o usuário já tem uma tarefa ativa com a mesma chave, ela é
+        reaproveitada em vez de criar outra.
+
+        Args:
+            usuario_id: ID do usuário dono da tarefa
+            chave: Identifica o trabalho (ex.: relatório de um mês)
+            funcao: Função executada com os parametros como argumentos nomeados
+            parametros: Argumentos da função (também exibidos com a tarefa)
+
+        Returns:
+            Tupla (sucesso, mensagem, id da tarefa)
+        """
+        parametros = parametros or {}
+
+        with self._lock:
+            for tarefa in self._tarefas.values():
+                if tarefa['usuario_id'] == usuario_id and tarefa['chave'] == chave and tarefa['estado'] in ESTADOS_ATIVOS:
+                    return True, "Esta tarefa já está em andamento.", tarefa['id']
+
+            tarefa = {
+                'id': uuid.uuid4().hex,
+                'usuario_id': usuario_id,
+                'chave': chave,
+                'parametros': parametros,
+                'estado': NA_FILA,
+                'progresso': 0.0,
+                'mensagem': '',
+                'resultado': None,
+                'criada_em': datetime.now(),
+                'iniciada_em': None,
+                'finalizada_em': None,
+                '_funcao': funcao
+            }
+
+            try:
+                self._fila.put_nowait(tarefa['id'])
+            except queue.Full:
+                return False, "A fila de tarefas está cheia. Tente novamente em instantes.", None
+
+            self._tarefas[tarefa['id']] = tarefa
+            self._iniciar_workers()
+
+        return True, "Tarefa adicionada à fila.", tarefa['id']
+
+    def _atualizar(self, tarefa_id: str, **campos):
+        """Atualiza campos de uma tarefa."""
+        with self._lock:
+            self._tarefas[tarefa_id].update(campos)
+
+    def _executar(self):
+        """Laço de uma thread de trabalho: executa as tarefas da fila, uma por vez."""
+        while True:
+            tarefa_id = self._fila.get()
+            try:
+                with self._lock:
+                    tarefa = self._tarefas[tarefa_id]
+                    tarefa['estado'] = EXECUTANDO
+                    tarefa['iniciada_em'] = datetime.now()
+
+                def progresso(fracao: float):
+                    self._atualizar(tarefa_id, progresso=min(max(fracao, 0.0), 1.0))
+
+                try:
+                    sucesso, mensagem, resultado = tarefa['_funcao'](progresso=progresso, **tarefa['parametros'])
+                except Exception as e:
+                    sucesso, mensagem, resultado = False, f"Erro ao executar tarefa: {str(e)}", None
+
+                self._atualizar(
+                    tarefa_id,
+                    estado=CONCLUIDA if sucesso else FALHOU,
+                    progresso=1.0 if sucesso else tarefa['progresso'],
+                    mensagem=mensagem,
+                    resultado=resultado,
+                    finalizada_em=datetime.now()
+                )
+                self._descartar_finalizadas(tarefa['usuario_id'])
+            finally:
+                self._fila.task_done()
+
+    def _descartar_finalizadas(self, usuario_id: int):
+        """Mantém apenas as tarefas finalizadas mais recentes do usuário."""
+        with self._lock:
+            finalizadas = [
+                tarefa['id'] for tarefa in self._tarefas.values()
+                if tarefa['usuario_id'] == usuario_id and tarefa['estado'] not in ESTADOS_ATIVOS
+            ]
+            excedentes = len(finalizadas) - self.finalizadas_por_usuario
+            for tarefa_id in finalizadas[:max(excedentes, 0)]:
+                del self._tarefas[tarefa_id]
+
+    @staticmethod
+    def _copiar(tarefa: Dict) -> Dict:
+        """Cópia dos campos públicos de uma tarefa."""
+        return {campo: tarefa[campo] for campo in CAMPOS_TAREFA}
+
+    def obter(self, tarefa_id: str, usuario_id: int) -> Optional[Dict]:
+        """
+        Retorna o estado de uma tarefa do usuário.
+
+        Returns:
+            Dicionário com os campos de CAMPOS_TAREFA, ou None se a tarefa
+            não existir (ou já tiver sido descartada) ou for de outro usuário
+        """
+        with self._lock:
+            tarefa = self._tarefas.get(tarefa_id)
+            if tarefa is None or tarefa['usuario_id'] != usuario_id:
+                return None
+            return self._copiar(tarefa)
+
+    def listar(self, usuario_id: int, prefixo_chave: str = '') -> List[Dict]:
+        """Lista as tarefas do usuário (opcionalmente pelo início da chave), das mais recentes às mais antigas."""
+        with self._lock:
+            return [
+                self._copiar(tarefa) for tarefa in reversed(self._tarefas.values())
+                if tarefa['usuario_id'] == usuario_id and tarefa['chave'].startswith(prefixo_chave)
+            ]
+
+    def estatisticas(self) -> Dict:
+        """Retorna a ocupação da fila e a contagem de tarefas por estado."""
+        with self._lock:
+            estados = {estado: 0 for estado in (NA_FILA, EXECUTANDO, CONCLUIDA, FALHOU)}
+            for tarefa in self._tarefas.values():
+                estados[tarefa['estado']] += 1
+            return {
+                'na_fila': self._fila.qsize(),
+                'tamanho_maximo': self._fila.maxsize,
+                'workers': len(self._threads),
+                'tarefas': estados
+            }
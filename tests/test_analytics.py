@@ -0,0 +1,253 @@
+"""
+Testes do MotorAnalitico (services/analytics.py).
+
+Uso:
+    python -m unittest discover -s tests -t .
+"""
+
+import unittest
+from datetime import date
+import pandas as pd
+from services.analytics import (
+    COLUNAS_SERIE_MENSAL,
+    LIMITE_COMPROMETIMENTO_ATENCAO,
+    LIMITE_COMPROMETIMENTO_RISCO,
+    MotorAnalitico
+)
+
+
+CORES = {'Salário': '#2ecc71', 'Alimentação': '#e74c3c', 'Transporte': '#3498db', 'Lazer': '#9b59b6'}
+ENTRADAS = {'Salário'}
+
+
+def lancamentos(*linhas) -> pd.DataFrame:
+    """DataFrame no formato de LancamentoService.listar_lancamentos_df a partir de (data, categoria, valor)."""
+    return pd.DataFrame({
+        'data': pd.to_datetime([data_lanc for data_lanc, _, _ in linhas]),
+        'valor': [float(valor) for _, _, valor in linhas],
+        'categoria_nome': pd.Categorical([categoria for _, categoria, _ in linhas]),
+        'categoria_cor': pd.Categorical([CORES[categoria] for _, categoria, _ in linhas]),
+        'categoria_tipo': pd.Categorical([
+            'Entrada' if categoria in ENTRADAS else 'Despesa' for _, categoria, _ in linhas
+        ])
+    })
+
+
+def mes(ano: int, numero: int) -> pd.Timestamp:
+    """Início de mês como aparece na coluna inicio da série mensal."""
+    return pd.Timestamp(ano, numero, 1)
+
+
+class TestTotais(unittest.TestCase):
+    """MotorAnalitico.totais"""
+
+    def test_soma_entradas_e_despesas(self):
+        motor = MotorAnalitico(lancamentos(
+            (date(2024, 1, 5), 'Salário', 1000),
+            (date(2024, 1, 6), 'Alimentação', 300),
+            (date(2024, 1, 7), 'Transporte', 100.5)
+        ))
+
+        totais = motor.totais()
+
+        self.assertAlmostEqual(totais['total_entradas'], 1000)
+        self.assertAlmostEqual(totais['total_despesas'], 400.5)
+        self.assertAlmostEqual(totais['saldo'], 599.5)
+        self.assertAlmostEqual(totais['percentual_gasto'], 40.05)
+        self.assertAlmostEqual(totais['taxa_economia'], 59.95)
+        self.assertEqual(totais['classe_comprometimento'], 'saudavel')
+
+    def test_classes_de_comprometimento_nos_limites(self):
+        casos = [
+            (LIMITE_COMPROMETIMENTO_ATENCAO, 'saudavel'),
+            (LIMITE_COMPROMETIMENTO_ATENCAO + 1, 'atencao'),
+            (LIMITE_COMPROMETIMENTO_RISCO, 'atencao'),
+            (LIMITE_COMPROMETIMENTO_RISCO + 1, 'risco')
+        ]
+        for percentual, classe in casos:
+            with self.subTest(percentual=percentual):
+                motor = MotorAnalitico(lancamentos(
+                    (date(2024, 1, 5), 'Salário', 100),
+                    (date(2024, 1, 6), 'Alimentação', percentual)
+                ))
+                self.assertEqual(motor.totais()['classe_comprometimento'], classe)
+
+    def test_sem_entradas(self):
+        totais = MotorAnalitico(lancamentos((date(2024, 1, 6), 'Alimentação', 50))).totais()
+
+        self.assertAlmostEqual(totais['saldo'], -50)
+        self.assertEqual(totais['percentual_gasto'], 0.0)
+        self.assertEqual(totais['taxa_economia'], 0.0)
+        self.assertIsNone(totais['classe_comprometimento'])
+
+    def test_sem_lancamentos(self):
+        for vazio in (None, lancamentos()):
+            with self.subTest(vazio=vazio):
+                totais = MotorAnalitico(vazio).totais()
+                self.assertEqual(totais['total_entradas'], 0.0)
+                self.assertEqual(totais['total_despesas'], 0.0)
+                self.assertIsNone(totais['classe_comprometimento'])
+
+
+class TestDistribuicaoDespesas(unittest.TestCase):
+    """MotorAnalitico.distribuicao_despesas"""
+
+    def test_agrupa_por_categoria_do_maior_para_o_menor(self):
+        motor = MotorAnalitico(lancamentos(
+            (date(2024, 1, 5), 'Salário', 5000),
+            (date(2024, 1, 6), 'Transporte', 100),
+            (date(2024, 1, 7), 'Alimentação', 250),
+            (date(2024, 1, 8), 'Alimentação', 350),
+            (date(2024, 2, 1), 'Transporte', 200),
+            (date(2024, 2, 2), 'Lazer', 100)
+        ))
+
+        distribuicao = motor.distribuicao_despesas()
+
+        self.assertEqual(list(distribuicao['categoria']), ['Alimentação', 'Transporte', 'Lazer'])
+        self.assertEqual(list(distribuicao['valor']), [600.0, 300.0, 100.0])
+        self.assertEqual(list(distribuicao['percentual']), [60.0, 30.0, 10.0])
+        self.assertEqual(list(distribuicao['cor']), [CORES['Alimentação'], CORES['Transporte'], CORES['Lazer']])
+
+    def test_empate_mantem_ordem_das_categorias(self):
+        motor = MotorAnalitico(lancamentos(
+            (date(2024, 1, 6), 'Transporte', 100),
+            (date(2024, 1, 7), 'Lazer', 100)
+        ))
+
+        self.assertEqual(list(motor.distribuicao_despesas()['categoria']), ['Lazer', 'Transporte'])
+
+    def test_sem_despesas(self):
+        for dados in (None, lancamentos(), lancamentos((date(2024, 1, 5), 'Salário', 1000))):
+            with self.subTest(dados=dados):
+                distribuicao = MotorAnalitico(dados).distribuicao_despesas()
+                self.assertTrue(distribuicao.empty)
+                self.assertEqual(list(distribuicao.columns), ['categoria', 'cor', 'valor', 'percentual'])
+
+
+class TestSerieMensal(unittest.TestCase):
+    """MotorAnalitico.serie_mensal"""
+
+    def test_meses_sem_movimento_preenchidos_com_zero(self):
+        motor = MotorAnalitico(lancamentos(
+            (date(2024, 1, 5), 'Salário', 1000),
+            (date(2024, 1, 20), 'Alimentação', 400),
+            (date(2024, 4, 10), 'Alimentação', 100)
+        ))
+
+        serie = motor.serie_mensal()
+
+        self.assertEqual(list(serie.columns), COLUNAS_SERIE_MENSAL)
+        self.assertEqual(list(serie['inicio']), [mes(2024, 1), mes(2024, 2), mes(2024, 3), mes(2024, 4)])
+        self.assertEqual(list(serie['entradas']), [1000.0, 0.0, 0.0, 0.0])
+        self.assertEqual(list(serie['despesas']), [400.0, 0.0, 0.0, 100.0])
+        self.assertEqual(list(serie['saldo']), [600.0, 0.0, 0.0, -100.0])
+        self.assertEqual(list(serie['saldo_acumulado']), [600.0, 600.0, 600.0, 500.0])
+        self.assertEqual(list(serie['percentual_gasto']), [40.0, 0.0, 0.0, 0.0])
+
+    def test_periodo_informado(self):
+        motor = MotorAnalitico(
+            lancamentos((date(2024, 2, 5), 'Salário', 1000)),
+            inicio=date(2024, 1, 1),
+            fim=date(2024, 4, 1)
+        )
+
+        serie = motor.serie_mensal()
+
+        self.assertEqual(list(serie['inicio']), [mes(2024, 1), mes(2024, 2), mes(2024, 3)])
+        self.assertEqual(list(serie['entradas']), [0.0, 1000.0, 0.0])
+
+    def test_semaforo(self):
+        # Sobra negativa, abaixo de 10% das entradas, exatamente 10% e acima
+        motor = MotorAnalitico(lancamentos(
+            (date(2024, 1, 1), 'Salário', 1000),
+            (date(2024, 1, 2), 'Alimentação', 1000.01),
+            (date(2024, 2, 1), 'Salário', 1000),
+            (date(2024, 2, 2), 'Alimentação', 901),
+            (date(2024, 3, 1), 'Salário', 1000),
+            (date(2024, 3, 2), 'Alimentação', 900),
+            (date(2024, 4, 1), 'Salário', 1000),
+            (date(2024, 4, 2), 'Alimentação', 500)
+        ))
+
+        serie = motor.serie_mensal()
+
+        self.assertEqual(list(serie['semaforo']), ['vermelho', 'amarelo', 'verde', 'verde'])
+        self.assertEqual(list(serie['semaforo'].cat.categories), ['vermelho', 'amarelo', 'verde'])
+
+    def test_totais_mensais_informados_e_orcamentos(self):
+        totais_mensais = pd.DataFrame({
+            'inicio': [date(2024, 1, 1), date(2024, 3, 1)],
+            'total_entradas': [2000.0, 1500.0],
+            'total_despesas': [1200.0, 1800.0]
+        })
+        orcamentos = pd.DataFrame({
+            'ano': [2024, 2024, 2024],
+            'mes': [1, 1, 3],
+            'valor_planejado': [800.0, 500.0, 1500.0]
+        })
+
+        # Os totais informados prevalecem sobre os lançamentos
+        motor = MotorAnalitico(
+            lancamentos((date(2024, 1, 5), 'Alimentação', 99999)),
+            orcamentos=orcamentos,
+            totais_mensais=totais_mensais
+        )
+
+        serie = motor.serie_mensal()
+
+        self.assertEqual(list(serie['despesas']), [1200.0, 0.0, 1800.0])
+        self.assertEqual(list(serie['planejado']), [1300.0, 0.0, 1500.0])
+        self.assertEqual(list(serie['diferenca_planejado']), [100.0, 0.0, -300.0])
+        self.assertEqual(list(serie['percentual_gasto']), [60.0, 0.0, 120.0])
+
+    def test_sem_dados(self):
+        serie = MotorAnalitico().serie_mensal()
+
+        self.assertTrue(serie.empty)
+        self.assertEqual(list(serie.columns), COLUNAS_SERIE_MENSAL)
+
+
+class TestIndicadores(unittest.TestCase):
+    """MotorAnalitico.indicadores"""
+
+    def setUp(self):
+        totais_mensais = pd.DataFrame({
+            'inicio': [date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1), date(2024, 4, 1)],
+            'total_entradas': [3000.0, 3000.0, 3000.0, 3000.0],
+            'total_despesas': [2000.0, 3500.0, 2800.0, 2000.0]
+        })
+        orcamentos = pd.DataFrame({
+            'ano': [2024] * 4,
+            'mes': [1, 2, 3, 4],
+            'valor_planejado': [2500.0, 2500.0, 2500.0, 2500.0]
+        })
+        self.indicadores = MotorAnalitico(orcamentos=orcamentos, totais_mensais=totais_mensais).indicadores()
+
+    def test_melhor_e_pior_mes(self):
+        # Empate no melhor saldo (janeiro e abril): vale o primeiro mês
+        self.assertEqual(self.indicadores['melhor_mes'], {'inicio': date(2024, 1, 1), 'saldo': 1000.0})
+        self.assertEqual(self.indicadores['pior_mes'], {'inicio': date(2024, 2, 1), 'saldo': -500.0})
+        self.assertEqual(self.indicadores['maior_economia'], {'inicio': date(2024, 1, 1), 'valor': 500.0})
+        self.assertEqual(self.indicadores['maior_estouro'], {'inicio': date(2024, 2, 1), 'valor': -1000.0})
+
+    def test_totais_e_contagens(self):
+        self.assertEqual(self.indicadores['total_entradas'], 12000.0)
+        self.assertEqual(self.indicadores['total_despesas'], 10300.0)
+        self.assertEqual(self.indicadores['saldo'], 1700.0)
+        self.assertEqual(self.indicadores['diferenca_planejado'], -300.0)
+        self.assertEqual(self.indicadores['meses_saldo_negativo'], 1)
+        self.assertEqual(self.indicadores['meses_acima_orcamento'], 2)
+        self.assertEqual(self.indicadores['meses_dentro_orcamento'], 2)
+        self.assertEqual(self.indicadores['semaforo'], {'vermelho': 1, 'amarelo': 1, 'verde': 2})
+        self.assertEqual(self.indicadores['saldo_acumulado_final'], 1700.0)
+        self.assertEqual(self.indicadores['variacao_capital'], 700.0)
+        self.assertEqual(self.indicadores['variacao_despesas'], 0.0)
+
+    def test_sem_dados(self):
+        self.assertEqual(MotorAnalitico().indicadores(), {})
+        self.assertEqual(MotorAnalitico(lancamentos()).indicadores(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
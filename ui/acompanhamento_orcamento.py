@@ -7,6 +7,8 @@ from dateutil.relativedelta import relativedelta
 from services import OrcamentoService, LancamentoService, CategoriaService
 from models.categoria import TipoCategoria
 from utils.formatador import FormatadorBR
+from ui.fragmento import fragmento
+from ui.graficos import grafico_em_cache
 
 
 def mostrar_acompanhamento_orcamento():
@@ -37,11 +39,18 @@ def mostrar_acompanhamento_orcamento():
     total_utilizado_ano = 0
     total_disponivel_ano = 0
     
-    for mes_num in range(1, 13):
-        orcamentos_mes = OrcamentoService.listar_orcamentos(usuario.id, mes_num, ano_selecionado)
-        
-        total_planejado_mes = sum(orc['valor_planejado'] for orc in orcamentos_mes)
-        total_utilizado_mes = sum(orc['valor_realizado'] for orc in orcamentos_mes)
+    # Orçamentos dos 12 meses em uma única consulta, reutilizados nas abas mensais
+    df_orcamentos = OrcamentoService.listar_orcamentos_df(usuario.id, ano_selecionado)
+    
+    totais_por_mes = df_orcamentos.groupby('mes').agg(
+        planejado=('valor_planejado', 'sum'),
+        utilizado=('valor_realizado', 'sum'),
+        quantidade=('id', 'size')
+    ).reindex(range(1, 13), fill_value=0)
+    
+    for mes_num, totais_mes in totais_por_mes.iterrows():
+        total_planejado_mes = float(totais_mes['planejado'])
+        total_utilizado_mes = float(totais_mes['utilizado'])
         total_disponivel_mes = total_planejado_mes - total_utilizado_mes
         
         total_planejado_ano += total_planejado_mes
@@ -56,7 +65,7 @@ def mostrar_acompanhamento_orcamento():
             'utilizado': total_utilizado_mes,
             'disponivel': total_disponivel_mes,
             'percentual_utilizado': (total_utilizado_mes / total_planejado_mes * 100) if total_planejado_mes > 0 else 0,
-            'tem_orcamento': len(orcamentos_mes) > 0
+            'tem_orcamento': totais_mes['quantidade'] > 0
         })
     
     # KPIs do ano
@@ -101,43 +110,7 @@ def mostrar_acompanhamento_orcamento():
     df_meses = pd.DataFrame(dados_meses)
     
     # Gráfico de barras empilhadas
-    fig_disponivel = go.Figure()
-    
-    fig_disponivel.add_trace(go.Bar(
-        name='Utilizado',
-        x=df_meses['mes_abrev'],
-        y=df_meses['utilizado'],
-        marker_color='#e74c3c',
-        text=[formatador.formatar_moeda(v) for v in df_meses['utilizado']],
-        textposition='inside',
-        hovertemplate='<b>%{x}</b><br>Utilizado: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    fig_disponivel.add_trace(go.Bar(
-        name='Disponível',
-        x=df_meses['mes_abrev'],
-        y=df_meses['disponivel'],
-        marker_color='#27ae60',
-        text=[formatador.formatar_moeda(v) for v in df_meses['disponivel']],
-        textposition='inside',
-        hovertemplate='<b>%{x}</b><br>Disponível: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    fig_disponivel.update_layout(
-        barmode='stack',
-        xaxis_title="Mês",
-        yaxis_title="Valor (R$)",
-        height=400,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-    
-    st.plotly_chart(fig_disponivel, use_container_width=True)
+    _grafico_disponivel(df_meses[['mes_abrev', 'utilizado', 'disponivel']])
     
     # Análise rápida
     meses_com_saldo = len([d for d in dados_meses if d['disponivel'] > 0])
@@ -169,140 +142,8 @@ def mostrar_acompanhamento_orcamento():
     # ===== DETALHAMENTO MÊS A MÊS =====
     st.subheader("📋 Detalhamento Mês a Mês")
     
-    # Tabs para cada mês
-    tabs = st.tabs([d['mes_abrev'] for d in dados_meses])
-    
-    for idx, tab in enumerate(tabs):
-        with tab:
-            mes_dados = dados_meses[idx]
-            mes_num = mes_dados['mes']
-            
-            if not mes_dados['tem_orcamento']:
-                st.info(f"💡 Nenhum orçamento definido para {mes_dados['mes_nome']}. Configure na aba 'Planejamento'.")
-                continue
-            
-            # KPIs do mês
-            col1, col2, col3 = st.columns(3)
-            
-            with col1:
-                st.metric(
-                    "💰 Planejado",
-                    formatador.formatar_moeda(mes_dados['planejado'])
-                )
-            
-            with col2:
-                st.metric(
-                    "💸 Utilizado",
-                    formatador.formatar_moeda(mes_dados['utilizado']),
-                    delta=f"{mes_dados['percentual_utilizado']:.1f}%"
-                )
-            
-            with col3:
-                cor = "normal" if mes_dados['disponivel'] >= 0 else "inverse"
-                st.metric(
-                    "💵 Disponível",
-                    formatador.formatar_moeda(mes_dados['disponivel']),
-                    delta_color=cor
-                )
-            
-            # Barra de progresso
-            progresso = min(mes_dados['percentual_utilizado'] / 100, 1.0)
-            st.progress(progresso)
-            
-            st.markdown("---")
-            
-            # Detalhamento por categoria
-            orcamentos_mes = OrcamentoService.listar_orcamentos(usuario.id, mes_num, ano_selecionado)
-            
-            if orcamentos_mes:
-                st.markdown("#### 📊 Orçamento por Categoria")
-                
-                # Cria DataFrame
-                df_cat = pd.DataFrame(orcamentos_mes)
-                df_cat = df_cat.sort_values('diferenca', ascending=False)
-                
-                # Gráfico de barras horizontais
-                fig_cat = go.Figure()
-                
-                # Barra do planejado (fundo)
-                fig_cat.add_trace(go.Bar(
-                    name='Planejado',
-                    y=df_cat['categoria_nome'],
-                    x=df_cat['valor_planejado'],
-                    orientation='h',
-                    marker_color='#3498db',
-                    opacity=0.3,
-                    hovertemplate='<b>%{y}</b><br>Planejado: R$ %{x:,.2f}<extra></extra>'
-                ))
-                
-                # Barra do utilizado (frente)
-                cores_utilizado = ['#e74c3c' if u > p else '#27ae60' 
-                                   for u, p in zip(df_cat['valor_realizado'], df_cat['valor_planejado'])]
-                
-                fig_cat.add_trace(go.Bar(
-                    name='Utilizado',
-                    y=df_cat['categoria_nome'],
-                    x=df_cat['valor_realizado'],
-                    orientation='h',
-                    marker_color=cores_utilizado,
-                    text=[formatador.formatar_moeda(v) for v in df_cat['valor_realizado']],
-                    textposition='inside',
-                    hovertemplate='<b>%{y}</b><br>Utilizado: R$ %{x:,.2f}<extra></extra>'
-                ))
-                
-                fig_cat.update_layout(
-                    barmode='overlay',
-                    xaxis_title="Valor (R$)",
-                    height=max(300, len(df_cat) * 50),
-                    showlegend=True,
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    )
-                )
-                
-                st.plotly_chart(fig_cat, use_container_width=True)
-                
-                # Tabela detalhada
-                st.markdown("#### 📋 Tabela Detalhada")
-                
-                tabela_display = pd.DataFrame({
-                    'Categoria': df_cat['categoria_nome'],
-                    'Planejado': [formatador.formatar_moeda(v) for v in df_cat['valor_planejado']],
-                    'Utilizado': [formatador.formatar_moeda(v) for v in df_cat['valor_realizado']],
-                    'Disponível': [formatador.formatar_moeda(v) for v in df_cat['diferenca']],
-                    '% Usado': [f"{v:.1f}%" for v in df_cat['percentual_utilizado']],
-                    'Status': ['🔴 Estourou' if d < 0 else '🟢 Disponível' if d > 0 else '⚖️ Exato' 
-                              for d in df_cat['diferenca']]
-                })
-                
-                st.dataframe(
-                    tabela_display,
-                    use_container_width=True,
-                    hide_index=True,
-                    height=min(400, (len(tabela_display) + 1) * 35 + 3)
-                )
-                
-                # Alertas
-                categorias_estouradas = df_cat[df_cat['diferenca'] < 0]
-                categorias_disponiveis = df_cat[df_cat['diferenca'] > 0]
-                
-                if not categorias_estouradas.empty:
-                    st.error(f"⚠️ **{len(categorias_estouradas)} categorias** estouraram o orçamento:")
-                    for _, cat in categorias_estouradas.iterrows():
-                        st.markdown(f"- **{cat['categoria_nome']}**: Estourou {formatador.formatar_moeda(abs(cat['diferenca']))}")
-                
-                if not categorias_disponiveis.empty:
-                    total_disponivel_cat = categorias_disponiveis['diferenca'].sum()
-                    st.success(f"✅ **{formatador.formatar_moeda(total_disponivel_cat)}** ainda disponível em {len(categorias_disponiveis)} categorias")
-                    
-                    # Top 3 com mais saldo
-                    with st.expander("💰 Categorias com Maior Saldo Disponível"):
-                        for _, cat in categorias_disponiveis.head(3).iterrows():
-                            st.markdown(f"**{cat['categoria_nome']}**: {formatador.formatar_moeda(cat['diferenca'])} ({100 - cat['percentual_utilizado']:.1f}% não utilizado)")
+    # Só o mês selecionado é montado; trocar de mês reexecuta apenas o detalhamento
+    mostrar_detalhe_mes(dados_meses, df_orcamentos, formatador)
     
     st.divider()
     
@@ -380,3 +221,194 @@ def mostrar_acompanhamento_orcamento():
         
         Você utilizou exatamente o orçamento planejado!
         """)
+
+
+@fragmento
+def mostrar_detalhe_mes(dados_meses, df_orcamentos, formatador):
+    """Exibe o detalhamento do orçamento do mês escolhido."""
+    
+    mes_num = st.radio(
+        "Mês",
+        [d['mes'] for d in dados_meses],
+        index=datetime.now().month - 1,
+        format_func=lambda mes: dados_meses[mes - 1]['mes_abrev'],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="acomp_mes"
+    )
+    mes_dados = dados_meses[mes_num - 1]
+    
+    if not mes_dados['tem_orcamento']:
+        st.info(f"💡 Nenhum orçamento definido para {mes_dados['mes_nome']}. Configure na aba 'Planejamento'.")
+        return
+    
+    # KPIs do mês
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        st.metric(
+            "💰 Planejado",
+            formatador.formatar_moeda(mes_dados['planejado'])
+        )
+    
+    with col2:
+        st.metric(
+            "💸 Utilizado",
+            formatador.formatar_moeda(mes_dados['utilizado']),
+            delta=f"{mes_dados['percentual_utilizado']:.1f}%"
+        )
+    
+    with col3:
+        cor = "normal" if mes_dados['disponivel'] >= 0 else "inverse"
+        st.metric(
+            "💵 Disponível",
+            formatador.formatar_moeda(mes_dados['disponivel']),
+            delta_color=cor
+        )
+    
+    # Barra de progresso
+    progresso = min(mes_dados['percentual_utilizado'] / 100, 1.0)
+    st.progress(progresso)
+    
+    st.markdown("---")
+    
+    # Detalhamento por categoria
+    df_cat = df_orcamentos[df_orcamentos['mes'] == mes_num]
+    
+    if not df_cat.empty:
+        st.markdown("#### 📊 Orçamento por Categoria")
+    
+        df_cat = df_cat.sort_values('diferenca', ascending=False)
+    
+        # Gráfico de barras horizontais
+        _grafico_categorias_mes(df_cat[['categoria_nome', 'valor_planejado', 'valor_realizado']])
+    
+        # Tabela detalhada
+        st.markdown("#### 📋 Tabela Detalhada")
+    
+        tabela_display = pd.DataFrame({
+            'Categoria': df_cat['categoria_nome'],
+            'Planejado': formatador.formatar_moeda_serie(df_cat['valor_planejado']),
+            'Utilizado': formatador.formatar_moeda_serie(df_cat['valor_realizado']),
+            'Disponível': formatador.formatar_moeda_serie(df_cat['diferenca']),
+            '% Usado': formatador.formatar_percentual_serie(df_cat['percentual_utilizado']),
+            'Status': ['🔴 Estourou' if d < 0 else '🟢 Disponível' if d > 0 else '⚖️ Exato' 
+                      for d in df_cat['diferenca']]
+        })
+    
+        st.dataframe(
+            tabela_display,
+            use_container_width=True,
+            hide_index=True,
+            height=min(400, (len(tabela_display) + 1) * 35 + 3)
+        )
+    
+        # Alertas
+        categorias_estouradas = df_cat[df_cat['diferenca'] < 0]
+        categorias_disponiveis = df_cat[df_cat['diferenca'] > 0]
+    
+        if not categorias_estouradas.empty:
+            st.error(f"⚠️ **{len(categorias_estouradas)} categorias** estouraram o orçamento:")
+            for _, cat in categorias_estouradas.iterrows():
+                st.markdown(f"- **{cat['categoria_nome']}**: Estourou {formatador.formatar_moeda(abs(cat['diferenca']))}")
+    
+        if not categorias_disponiveis.empty:
+            total_disponivel_cat = categorias_disponiveis['diferenca'].sum()
+            st.success(f"✅ **{formatador.formatar_moeda(total_disponivel_cat)}** ainda disponível em {len(categorias_disponiveis)} categorias")
+    
+            # Top 3 com mais saldo
+            with st.expander("💰 Categorias com Maior Saldo Disponível"):
+                for _, cat in categorias_disponiveis.head(3).iterrows():
+                    st.markdown(f"**{cat['categoria_nome']}**: {formatador.formatar_moeda(cat['diferenca'])} ({100 - cat['percentual_utilizado']:.1f}% não utilizado)")
+
+
+@grafico_em_cache
+def _grafico_disponivel(df_meses) -> go.Figure:
+    """Barras empilhadas do orçamento utilizado e disponível de cada mês."""
+    
+    fig_disponivel = go.Figure()
+    
+    fig_disponivel.add_trace(go.Bar(
+        name='Utilizado',
+        x=df_meses['mes_abrev'],
+        y=df_meses['utilizado'],
+        marker_color='#e74c3c',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='inside',
+        hovertemplate='<b>%{x}</b><br>Utilizado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_disponivel.add_trace(go.Bar(
+        name='Disponível',
+        x=df_meses['mes_abrev'],
+        y=df_meses['disponivel'],
+        marker_color='#27ae60',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='inside',
+        hovertemplate='<b>%{x}</b><br>Disponível: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_disponivel.update_layout(
+        barmode='stack',
+        xaxis_title="Mês",
+        yaxis_title="Valor (R$)",
+        height=400,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    return fig_disponivel
+
+
+@grafico_em_cache
+def _grafico_categorias_mes(df_cat) -> go.Figure:
+    """Barras sobrepostas de planejado e utilizado por categoria."""
+    
+    fig_cat = go.Figure()
+    
+    # Barra do planejado (fundo)
+    fig_cat.add_trace(go.Bar(
+        name='Planejado',
+        y=df_cat['categoria_nome'],
+        x=df_cat['valor_planejado'],
+        orientation='h',
+        marker_color='#3498db',
+        opacity=0.3,
+        hovertemplate='<b>%{y}</b><br>Planejado: R$ %{x:,.2f}<extra></extra>'
+    ))
+    
+    # Barra do utilizado (frente)
+    cores_utilizado = ['#e74c3c' if u > p else '#27ae60' 
+                       for u, p in zip(df_cat['valor_realizado'], df_cat['valor_planejado'])]
+    
+    fig_cat.add_trace(go.Bar(
+        name='Utilizado',
+        y=df_cat['categoria_nome'],
+        x=df_cat['valor_realizado'],
+        orientation='h',
+        marker_color=cores_utilizado,
+        texttemplate=FormatadorBR.modelo_moeda_plotly('x'),
+        textposition='inside',
+        hovertemplate='<b>%{y}</b><br>Utilizado: R$ %{x:,.2f}<extra></extra>'
+    ))
+    
+    fig_cat.update_layout(
+        barmode='overlay',
+        xaxis_title="Valor (R$)",
+        height=max(300, len(df_cat) * 50),
+        showlegend=True,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    return fig_cat
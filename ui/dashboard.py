@@ -1,12 +1,24 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from services import LancamentoService, OrcamentoService, CategoriaService
-from models.categoria import TipoCategoria
+from services.analytics import MotorAnalitico
 from utils.formatador import FormatadorBR
+from utils.periodo import Periodo
+from ui.fragmento import fragmento, manter_estado_widgets
+from ui.graficos import grafico_em_cache
+
+
+# Cores das classes do semáforo financeiro
+CORES_SEMAFORO = {'vermelho': '#e74c3c', 'amarelo': '#f39c12', 'verde': '#27ae60'}
+
+# Visões do dashboard
+VISAO_MENSAL = "📅 Visão Mensal"
+VISAO_ANUAL = "📆 Visão Anual"
 
 
 def mostrar_dashboard():
@@ -17,18 +29,27 @@ def mostrar_dashboard():
     
     st.title(f"📊 Dashboard - {usuario.nome}")
     
-    # Abas para visão mensal e anual
-    tab_mensal, tab_anual = st.tabs(["📅 Visão Mensal", "📆 Visão Anual"])
+    # Seletor de visão: só a visão escolhida é calculada (abas calculariam as duas)
+    visao = st.radio(
+        "Visão",
+        [VISAO_MENSAL, VISAO_ANUAL],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="dashboard_visao"
+    )
     
     # ========== VISÃO MENSAL ==========
-    with tab_mensal:
+    if visao == VISAO_MENSAL:
+        manter_estado_widgets("anual_ano")
         mostrar_visao_mensal(usuario, formatador)
     
     # ========== VISÃO ANUAL ==========
-    with tab_anual:
+    else:
+        manter_estado_widgets("mensal_mes", "mensal_ano")
         mostrar_visao_anual(usuario, formatador)
 
 
+@fragmento
 def mostrar_visao_mensal(usuario, formatador):
     """Exibe a visão mensal do dashboard."""
     
@@ -54,8 +75,22 @@ def mostrar_visao_mensal(usuario, formatador):
     
     st.divider()
     
-    # Calcula totais do mês atual
-    totais = LancamentoService.calcular_totais(usuario.id, mes, ano)
+    # Totais dos últimos 6 meses em uma única consulta (o último é o mês selecionado)
+    data_atual = date(ano, mes, 1)
+    totais_6_meses = LancamentoService.calcular_totais_por_periodo(
+        usuario.id,
+        data_atual - relativedelta(months=5),
+        data_atual + relativedelta(months=1),
+        'mes'
+    )
+    totais = totais_6_meses[-1]
+    
+    # Lançamentos do mês para os KPIs e gráficos de detalhamento
+    df_lancamentos = LancamentoService.listar_lancamentos_df(usuario.id, mes, ano)
+    
+    motor = MotorAnalitico(df_lancamentos, totais_mensais=pd.DataFrame(totais_6_meses))
+    serie_6_meses = motor.serie_mensal()
+    indicadores_6_meses = motor.indicadores()
     
     # ===== SEÇÃO DE KPIs PRINCIPAIS =====
     st.subheader("💰 Resumo Financeiro do Mês")
@@ -87,14 +122,9 @@ def mostrar_visao_mensal(usuario, formatador):
     
     with col4:
         # Percentual gasto vs entrada
-        if totais['total_entradas'] > 0:
-            percentual_gasto = (totais['total_despesas'] / totais['total_entradas']) * 100
-        else:
-            percentual_gasto = 0
-        
         st.metric(
             label="📊 % Gasto",
-            value=f"{percentual_gasto:.1f}%",
+            value=f"{serie_6_meses['percentual_gasto'].iloc[-1]:.1f}%",
             delta=None
         )
     
@@ -104,44 +134,7 @@ def mostrar_visao_mensal(usuario, formatador):
         
         with col1:
             # Cria barra de progresso customizada
-            fig_barra = go.Figure()
-            
-            fig_barra.add_trace(go.Bar(
-                x=[totais['total_entradas']],
-                y=[''],
-                orientation='h',
-                name='Entrada',
-                marker_color='#27ae60',
-                text=[formatador.formatar_moeda(totais['total_entradas'])],
-                textposition='inside',
-                hoverinfo='text',
-                hovertext=f"Entradas: {formatador.formatar_moeda(totais['total_entradas'])}"
-            ))
-            
-            fig_barra.add_trace(go.Bar(
-                x=[totais['total_despesas']],
-                y=[''],
-                orientation='h',
-                name='Despesa',
-                marker_color='#e74c3c',
-                text=[formatador.formatar_moeda(totais['total_despesas'])],
-                textposition='inside',
-                hoverinfo='text',
-                hovertext=f"Despesas: {formatador.formatar_moeda(totais['total_despesas'])}"
-            ))
-            
-            fig_barra.update_layout(
-                barmode='overlay',
-                showlegend=True,
-                height=120,
-                margin=dict(l=0, r=0, t=0, b=0),
-                xaxis=dict(showticklabels=False, showgrid=False),
-                yaxis=dict(showticklabels=False),
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)'
-            )
-            
-            st.plotly_chart(fig_barra, use_container_width=True)
+            _grafico_barra_saldo(totais)
         
         with col2:
             # Status do saldo
@@ -155,175 +148,56 @@ def mostrar_visao_mensal(usuario, formatador):
     # ===== COMPARATIVO MENSAL (ÚLTIMOS 6 MESES) =====
     st.subheader("📈 Evolução Mensal - Últimos 6 Meses")
     
-    # Calcula dados dos últimos 6 meses
-    meses_dados = []
-    data_atual = date(ano, mes, 1)
-    
-    for i in range(5, -1, -1):
-        data_mes = data_atual - relativedelta(months=i)
-        mes_num = data_mes.month
-        ano_num = data_mes.year
-        
-        totais_mes = LancamentoService.calcular_totais(usuario.id, mes_num, ano_num)
-        
-        meses_dados.append({
-            'mes': formatador.mes_ano_formatado(mes_num, ano_num).split(' de ')[0][:3],
-            'mes_ano': f"{mes_num:02d}/{ano_num}",
-            'entradas': totais_mes['total_entradas'],
-            'despesas': totais_mes['total_despesas'],
-            'saldo': totais_mes['saldo']
-        })
+    # Série dos últimos 6 meses com o nome abreviado de cada mês
+    abreviacoes = [
+        formatador.mes_ano_formatado(inicio.month, inicio.year).split(' de ')[0][:3]
+        for inicio in serie_6_meses['inicio']
+    ]
     
-    if meses_dados:
-        df_meses = pd.DataFrame(meses_dados)
+    if not serie_6_meses.empty:
+        df_meses = serie_6_meses.assign(mes=abreviacoes)
         
         # Gráfico de linhas - Entradas vs Despesas
-        fig_evolucao = go.Figure()
-        
-        fig_evolucao.add_trace(go.Scatter(
-            x=df_meses['mes'],
-            y=df_meses['entradas'],
-            mode='lines+markers+text',
-            name='Entradas',
-            line=dict(color='#27ae60', width=3),
-            marker=dict(size=10),
-            text=[formatador.formatar_moeda(v) for v in df_meses['entradas']],
-            textposition='top center',
-            textfont=dict(size=10)
-        ))
-        
-        fig_evolucao.add_trace(go.Scatter(
-            x=df_meses['mes'],
-            y=df_meses['despesas'],
-            mode='lines+markers+text',
-            name='Despesas',
-            line=dict(color='#e74c3c', width=3),
-            marker=dict(size=10),
-            text=[formatador.formatar_moeda(v) for v in df_meses['despesas']],
-            textposition='bottom center',
-            textfont=dict(size=10)
-        ))
-        
-        fig_evolucao.update_layout(
-            xaxis_title="Mês",
-            yaxis_title="Valor (R$)",
-            height=400,
-            hovermode='x unified',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
-        
-        st.plotly_chart(fig_evolucao, use_container_width=True)
+        _grafico_evolucao_mensal(df_meses[['mes', 'entradas', 'despesas']])
         
         # Gráfico de barras - Saldo mensal
         st.markdown("#### 💵 Saldo por Mês")
         
-        fig_saldo = go.Figure()
-        
-        # Define cores baseadas no saldo (positivo/negativo)
-        cores = ['#27ae60' if s >= 0 else '#e74c3c' for s in df_meses['saldo']]
-        
-        fig_saldo.add_trace(go.Bar(
-            x=df_meses['mes'],
-            y=df_meses['saldo'],
-            marker_color=cores,
-            text=[formatador.formatar_moeda(v) for v in df_meses['saldo']],
-            textposition='outside',
-            hoverinfo='text',
-            hovertext=[f"{m}: {formatador.formatar_moeda(s)}" for m, s in zip(df_meses['mes'], df_meses['saldo'])]
-        ))
-        
-        fig_saldo.update_layout(
-            xaxis_title="Mês",
-            yaxis_title="Saldo (R$)",
-            height=350,
-            showlegend=False
-        )
-        
-        # Adiciona linha zero
-        fig_saldo.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-        
-        st.plotly_chart(fig_saldo, use_container_width=True)
+        _grafico_saldo_mensal(df_meses[['mes', 'saldo']])
     
     st.divider()
     
     # ===== KPIs PROFISSIONAIS =====
     st.subheader("📊 Indicadores Financeiros Profissionais")
     
-    # Obtém lançamentos do mês para cálculos
-    lancamentos = LancamentoService.listar_lancamentos(usuario.id, mes, ano)
-    
-    if lancamentos:
+    if not df_lancamentos.empty:
         # Prepara dados
-        entradas_mes = [l for l in lancamentos if l['categoria_tipo'] == TipoCategoria.ENTRADA]
-        despesas_mes = [l for l in lancamentos if l['categoria_tipo'] == TipoCategoria.DESPESA]
+        totais_mes = motor.totais()
+        df_dist = motor.distribuicao_despesas()
         
-        total_entradas_mes = sum(l['valor'] for l in entradas_mes)
-        total_despesas_mes = sum(l['valor'] for l in despesas_mes)
+        total_entradas_mes = totais_mes['total_entradas']
+        total_despesas_mes = totais_mes['total_despesas']
         
         # ===== KPI 1: Distribuição de Despesas por Categoria =====
         st.markdown("#### 🎯 KPI 1: Distribuição de Despesas por Categoria")
         
-        if despesas_mes:
-            # Agrupa despesas por categoria
-            despesas_por_categoria = {}
-            for lanc in despesas_mes:
-                cat = lanc['categoria_nome']
-                if cat not in despesas_por_categoria:
-                    despesas_por_categoria[cat] = {'valor': 0, 'cor': lanc['categoria_cor']}
-                despesas_por_categoria[cat]['valor'] += lanc['valor']
-            
-            # Calcula percentuais
-            df_dist = pd.DataFrame([
-                {
-                    'categoria': cat,
-                    'valor': dados['valor'],
-                    'percentual': (dados['valor'] / total_despesas_mes * 100),
-                    'cor': dados['cor']
-                }
-                for cat, dados in despesas_por_categoria.items()
-            ]).sort_values('valor', ascending=False)
+        if not df_dist.empty:
             
             col1, col2 = st.columns([2, 1])
             
             with col1:
                 # Gráfico de Donut
-                fig_donut = go.Figure(data=[go.Pie(
-                    labels=df_dist['categoria'],
-                    values=df_dist['valor'],
-                    hole=0.5,
-                    marker=dict(colors=df_dist['cor']),
-                    texttemplate='%{label}<br>%{percent}',
-                    hovertemplate='<b>%{label}</b><br>Valor: R$ %{value:,.2f}<br>Percentual: %{percent}<extra></extra>'
-                )])
-                
-                fig_donut.update_layout(
-                    title="Distribuição Percentual",
-                    height=400,
-                    annotations=[dict(
-                        text=formatador.formatar_moeda(total_despesas_mes),
-                        x=0.5, y=0.5,
-                        font_size=16,
-                        showarrow=False
-                    )]
-                )
-                
-                st.plotly_chart(fig_donut, use_container_width=True)
+                _grafico_distribuicao_despesas(df_dist, total_despesas_mes)
             
             with col2:
                 st.markdown("**Interpretação:**")
                 
                 # Mostra top 3 categorias
-                for idx, row in df_dist.head(3).iterrows():
+                for posicao, row in enumerate(df_dist.head(3).itertuples(), start=1):
                     st.markdown(f"""
-                    **{idx+1}. {row['categoria']}**
-                    - Valor: {formatador.formatar_moeda(row['valor'])}
-                    - {row['percentual']:.1f}% do total
+                    **{posicao}. {row.categoria}**
+                    - Valor: {formatador.formatar_moeda(row.valor)}
+                    - {row.percentual:.1f}% do total
                     """)
                 
                 # Alerta se alguma categoria > 40%
@@ -338,61 +212,22 @@ def mostrar_visao_mensal(usuario, formatador):
         # ===== KPI 2: Evolução Mensal de Gastos (Últimos 6 meses) =====
         st.markdown("#### 📈 KPI 2: Evolução Mensal de Gastos")
         
-        # Calcula gastos dos últimos 6 meses
-        evolucao_gastos = []
-        data_atual = date(ano, mes, 1)
-        
-        for i in range(5, -1, -1):
-            data_mes = data_atual - relativedelta(months=i)
-            mes_num = data_mes.month
-            ano_num = data_mes.year
-            
-            totais_mes = LancamentoService.calcular_totais(usuario.id, mes_num, ano_num)
-            
-            evolucao_gastos.append({
-                'mes': formatador.mes_ano_formatado(mes_num, ano_num).split(' de ')[0][:3],
-                'mes_completo': formatador.mes_ano_formatado(mes_num, ano_num),
-                'gastos': totais_mes['total_despesas']
-            })
-        
-        df_evolucao = pd.DataFrame(evolucao_gastos)
+        # Gastos dos últimos 6 meses
+        df_evolucao = pd.DataFrame({'mes': abreviacoes, 'gastos': serie_6_meses['despesas']})
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
             # Gráfico de Linha
-            fig_evolucao_gastos = go.Figure()
-            
-            fig_evolucao_gastos.add_trace(go.Scatter(
-                x=df_evolucao['mes'],
-                y=df_evolucao['gastos'],
-                mode='lines+markers',
-                line=dict(color='#e74c3c', width=3),
-                marker=dict(size=10, color='#c0392b'),
-                fill='tozeroy',
-                fillcolor='rgba(231, 76, 60, 0.1)',
-                text=[formatador.formatar_moeda(v) for v in df_evolucao['gastos']],
-                textposition='top center',
-                hovertemplate='<b>%{x}</b><br>Gastos: R$ %{y:,.2f}<extra></extra>'
-            ))
-            
-            fig_evolucao_gastos.update_layout(
-                title="Tendência de Gastos",
-                xaxis_title="Mês",
-                yaxis_title="Gastos (R$)",
-                height=400,
-                showlegend=False
-            )
-            
-            st.plotly_chart(fig_evolucao_gastos, use_container_width=True)
+            _grafico_evolucao_gastos(df_evolucao)
         
         with col2:
             st.markdown("**Interpretação:**")
             
             # Calcula tendência
             if len(df_evolucao) >= 2:
-                variacao = df_evolucao['gastos'].iloc[-1] - df_evolucao['gastos'].iloc[0]
-                variacao_percent = (variacao / df_evolucao['gastos'].iloc[0] * 100) if df_evolucao['gastos'].iloc[0] > 0 else 0
+                variacao = indicadores_6_meses['variacao_despesas']
+                variacao_percent = indicadores_6_meses['variacao_despesas_percentual']
                 
                 if variacao > 0:
                     st.error(f"""
@@ -414,7 +249,7 @@ def mostrar_visao_mensal(usuario, formatador):
                     st.info("📊 **Gastos Estáveis**")
                 
                 # Média
-                media_gastos = df_evolucao['gastos'].mean()
+                media_gastos = indicadores_6_meses['media_despesas']
                 st.metric("Média dos 6 meses", formatador.formatar_moeda(media_gastos))
         
         st.divider()
@@ -422,58 +257,13 @@ def mostrar_visao_mensal(usuario, formatador):
         # ===== KPI 3: Fluxo de Caixa Mensal =====
         st.markdown("#### 💰 KPI 3: Fluxo de Caixa Mensal")
         
-        fluxo_caixa = total_entradas_mes - total_despesas_mes
+        fluxo_caixa = totais_mes['saldo']
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
             # Gráfico de Barras Comparativo
-            fig_fluxo = go.Figure()
-            
-            fig_fluxo.add_trace(go.Bar(
-                name='Entradas',
-                x=['Fluxo de Caixa'],
-                y=[total_entradas_mes],
-                marker_color='#27ae60',
-                text=[formatador.formatar_moeda(total_entradas_mes)],
-                textposition='inside',
-                hovertemplate='Entradas: R$ %{y:,.2f}<extra></extra>'
-            ))
-            
-            fig_fluxo.add_trace(go.Bar(
-                name='Saídas',
-                x=['Fluxo de Caixa'],
-                y=[total_despesas_mes],
-                marker_color='#e74c3c',
-                text=[formatador.formatar_moeda(total_despesas_mes)],
-                textposition='inside',
-                hovertemplate='Saídas: R$ %{y:,.2f}<extra></extra>'
-            ))
-            
-            # Adiciona linha do saldo
-            fig_fluxo.add_trace(go.Scatter(
-                name=f'Saldo: {formatador.formatar_moeda(fluxo_caixa)}',
-                x=['Fluxo de Caixa'],
-                y=[fluxo_caixa],
-                mode='markers+text',
-                marker=dict(
-                    size=20,
-                    color='#3498db',
-                    symbol='diamond'
-                ),
-                text=[formatador.formatar_moeda(fluxo_caixa)],
-                textposition='top center',
-                hovertemplate='Saldo: R$ %{y:,.2f}<extra></extra>'
-            ))
-            
-            fig_fluxo.update_layout(
-                title="Entradas vs Saídas",
-                yaxis_title="Valor (R$)",
-                height=400,
-                barmode='group'
-            )
-            
-            st.plotly_chart(fig_fluxo, use_container_width=True)
+            _grafico_fluxo_caixa(total_entradas_mes, total_despesas_mes, fluxo_caixa)
         
         with col2:
             st.markdown("**Interpretação:**")
@@ -499,8 +289,7 @@ def mostrar_visao_mensal(usuario, formatador):
             
             # Taxa de economia
             if total_entradas_mes > 0:
-                taxa_economia = (fluxo_caixa / total_entradas_mes * 100)
-                st.metric("Taxa de Economia", f"{taxa_economia:.1f}%")
+                st.metric("Taxa de Economia", f"{totais_mes['taxa_economia']:.1f}%")
         
         st.divider()
         
@@ -508,48 +297,18 @@ def mostrar_visao_mensal(usuario, formatador):
         st.markdown("#### ⚠️ KPI 4: Comprometimento da Renda")
         
         if total_entradas_mes > 0:
-            comprometimento = (total_despesas_mes / total_entradas_mes * 100)
+            comprometimento = totais_mes['percentual_gasto']
             
             col1, col2 = st.columns([2, 1])
             
             with col1:
                 # Gauge (Velocímetro)
-                fig_gauge = go.Figure(go.Indicator(
-                    mode="gauge+number+delta",
-                    value=comprometimento,
-                    domain={'x': [0, 1], 'y': [0, 1]},
-                    title={'text': "Comprometimento (%)"},
-                    delta={'reference': 50, 'increasing': {'color': "red"}, 'decreasing': {'color': "green"}},
-                    gauge={
-                        'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
-                        'bar': {'color': "darkblue"},
-                        'bgcolor': "white",
-                        'borderwidth': 2,
-                        'bordercolor': "gray",
-                        'steps': [
-                            {'range': [0, 50], 'color': '#27ae60'},
-                            {'range': [50, 70], 'color': '#f39c12'},
-                            {'range': [70, 100], 'color': '#e74c3c'}
-                        ],
-                        'threshold': {
-                            'line': {'color': "red", 'width': 4},
-                            'thickness': 0.75,
-                            'value': 70
-                        }
-                    }
-                ))
-                
-                fig_gauge.update_layout(
-                    height=300,
-                    margin=dict(l=20, r=20, t=50, b=20)
-                )
-                
-                st.plotly_chart(fig_gauge, use_container_width=True)
+                _grafico_comprometimento(comprometimento)
             
             with col2:
                 st.markdown("**Interpretação:**")
                 
-                if comprometimento <= 50:
+                if totais_mes['classe_comprometimento'] == 'saudavel':
                     st.success(f"""
                     ✅ **SAUDÁVEL**
                     
@@ -557,7 +316,7 @@ def mostrar_visao_mensal(usuario, formatador):
                     
                     Excelente controle financeiro!
                     """)
-                elif comprometimento <= 70:
+                elif totais_mes['classe_comprometimento'] == 'atencao':
                     st.warning(f"""
                     ⚠️ **ATENÇÃO**
                     
@@ -588,65 +347,25 @@ def mostrar_visao_mensal(usuario, formatador):
         # ===== KPI 5: Saldo Acumulado (Últimos 6 meses) =====
         st.markdown("#### 📊 KPI 5: Saldo Acumulado")
         
-        # Calcula saldo acumulado dos últimos 6 meses
-        saldos_acumulados = []
-        saldo_acumulado = 0
-        data_atual = date(ano, mes, 1)
-        
-        for i in range(5, -1, -1):
-            data_mes = data_atual - relativedelta(months=i)
-            mes_num = data_mes.month
-            ano_num = data_mes.year
-            
-            totais_mes = LancamentoService.calcular_totais(usuario.id, mes_num, ano_num)
-            saldo_acumulado += totais_mes['saldo']
-            
-            saldos_acumulados.append({
-                'mes': formatador.mes_ano_formatado(mes_num, ano_num).split(' de ')[0][:3],
-                'saldo_mensal': totais_mes['saldo'],
-                'saldo_acumulado': saldo_acumulado
-            })
-        
-        df_acumulado = pd.DataFrame(saldos_acumulados)
+        # Saldo acumulado dos últimos 6 meses
+        df_acumulado = pd.DataFrame({
+            'mes': abreviacoes,
+            'saldo_mensal': serie_6_meses['saldo'],
+            'saldo_acumulado': serie_6_meses['saldo_acumulado']
+        })
         
         col1, col2 = st.columns([2, 1])
         
         with col1:
             # Gráfico de Área
-            fig_acumulado = go.Figure()
-            
-            fig_acumulado.add_trace(go.Scatter(
-                x=df_acumulado['mes'],
-                y=df_acumulado['saldo_acumulado'],
-                mode='lines+markers',
-                line=dict(color='#3498db', width=3),
-                marker=dict(size=10),
-                fill='tozeroy',
-                fillcolor='rgba(52, 152, 219, 0.2)',
-                text=[formatador.formatar_moeda(v) for v in df_acumulado['saldo_acumulado']],
-                textposition='top center',
-                hovertemplate='<b>%{x}</b><br>Saldo Acumulado: R$ %{y:,.2f}<extra></extra>'
-            ))
-            
-            fig_acumulado.update_layout(
-                title="Evolução do Capital",
-                xaxis_title="Mês",
-                yaxis_title="Saldo Acumulado (R$)",
-                height=400,
-                showlegend=False
-            )
-            
-            # Linha zero
-            fig_acumulado.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            st.plotly_chart(fig_acumulado, use_container_width=True)
+            _grafico_saldo_acumulado(df_acumulado)
         
         with col2:
             st.markdown("**Interpretação:**")
             
             saldo_inicial = df_acumulado['saldo_acumulado'].iloc[0]
-            saldo_final = df_acumulado['saldo_acumulado'].iloc[-1]
-            variacao_capital = saldo_final - saldo_inicial
+            saldo_final = indicadores_6_meses['saldo_acumulado_final']
+            variacao_capital = indicadores_6_meses['variacao_capital']
             
             if variacao_capital > 0:
                 st.success(f"""
@@ -684,48 +403,17 @@ def mostrar_visao_mensal(usuario, formatador):
     # ===== GRÁFICOS DO MÊS ATUAL =====
     st.subheader(f"📊 Detalhamento de {formatador.mes_ano_formatado(mes, ano)}")
     
-    # Obtém dados para gráficos
-    lancamentos = LancamentoService.listar_lancamentos(usuario.id, mes, ano)
-    
-    if lancamentos:
+    # Reutiliza os lançamentos do mês lidos para os KPIs
+    if not df_lancamentos.empty:
         # Gráficos em duas colunas
         col1, col2 = st.columns(2)
         
         with col1:
             st.subheader("Despesas por Categoria")
             
-            # Filtra apenas despesas
-            despesas = [l for l in lancamentos if l['categoria_tipo'] == TipoCategoria.DESPESA]
-            
-            if despesas:
-                # Agrupa por categoria
-                df_despesas = pd.DataFrame([
-                    {
-                        'categoria': l['categoria_nome'],
-                        'valor': l['valor'],
-                        'cor': l['categoria_cor']
-                    }
-                    for l in despesas
-                ])
-                
-                df_group = df_despesas.groupby('categoria').agg({
-                    'valor': 'sum',
-                    'cor': 'first'
-                }).reset_index()
-                
-                # Gráfico de pizza
-                fig = px.pie(
-                    df_group,
-                    values='valor',
-                    names='categoria',
-                    color='categoria',
-                    color_discrete_map={row['categoria']: row['cor'] for _, row in df_group.iterrows()}
-                )
-                
-                fig.update_traces(textposition='inside', textinfo='percent+label')
-                fig.update_layout(showlegend=False, height=400)
-                
-                st.plotly_chart(fig, use_container_width=True)
+            if not df_dist.empty:
+                # Gráfico de pizza das despesas agrupadas por categoria (calculadas para o KPI 1)
+                _grafico_despesas_categoria(df_dist)
             else:
                 st.info("Nenhuma despesa registrada neste período.")
         
@@ -739,65 +427,20 @@ def mostrar_visao_mensal(usuario, formatador):
                 'Cor': ['#27ae60', '#e74c3c']
             })
             
-            fig = go.Figure(data=[
-                go.Bar(
-                    x=df_comparativo['Tipo'],
-                    y=df_comparativo['Valor'],
-                    marker_color=df_comparativo['Cor'],
-                    text=[formatador.formatar_moeda(v) for v in df_comparativo['Valor']],
-                    textposition='outside'
-                )
-            ])
-            
-            fig.update_layout(
-                yaxis_title="Valor (R$)",
-                showlegend=False,
-                height=400
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            _grafico_entrada_despesa(df_comparativo)
     else:
         st.info("📭 Nenhum lançamento registrado neste período.")
     
     st.divider()
     
     # Orçamento vs Realizado
-    orcamentos = OrcamentoService.listar_orcamentos(usuario.id, mes, ano)
+    df_orcamento = OrcamentoService.listar_orcamentos_df(usuario.id, ano, mes)
     
-    if orcamentos:
+    if not df_orcamento.empty:
         st.subheader("📋 Orçamento vs Realizado")
         
-        df_orcamento = pd.DataFrame(orcamentos)
-        
         # Gráfico de barras agrupadas
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            name='Planejado',
-            x=df_orcamento['categoria_nome'],
-            y=df_orcamento['valor_planejado'],
-            marker_color='#3498db',
-            text=[formatador.formatar_moeda(v) for v in df_orcamento['valor_planejado']],
-            textposition='outside'
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Realizado',
-            x=df_orcamento['categoria_nome'],
-            y=df_orcamento['valor_realizado'],
-            marker_color='#e67e22',
-            text=[formatador.formatar_moeda(v) for v in df_orcamento['valor_realizado']],
-            textposition='outside'
-        ))
-        
-        fig.update_layout(
-            barmode='group',
-            yaxis_title="Valor (R$)",
-            xaxis_title="Categoria",
-            height=400
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+        _grafico_orcamento_realizado(df_orcamento[['categoria_nome', 'valor_planejado', 'valor_realizado']])
         
         # Tabela detalhada
         st.dataframe(
@@ -821,6 +464,7 @@ def mostrar_visao_mensal(usuario, formatador):
         st.info("💡 Configure seu orçamento mensal na aba 'Planejamento' para acompanhar suas metas!")
 
 
+@fragmento
 def mostrar_visao_anual(usuario, formatador):
     """Exibe a visão anual com análise mês a mês."""
     
@@ -834,40 +478,31 @@ def mostrar_visao_anual(usuario, formatador):
     
     st.divider()
     
-    # Calcula dados de todos os meses do ano
-    dados_ano = []
-    total_anual_entradas = 0
-    total_anual_despesas = 0
-    total_anual_planejado = 0
+    # Totais dos 12 meses em uma única consulta, com os orçamentos do ano
+    inicio_ano, fim_ano = Periodo.intervalo_ano(ano_selecionado)
+    totais_meses = LancamentoService.calcular_totais_por_periodo(usuario.id, inicio_ano, fim_ano, 'mes')
     
-    for mes_num in range(1, 13):
-        # Totais do mês
-        totais_mes = LancamentoService.calcular_totais(usuario.id, mes_num, ano_selecionado)
-        
-        # Orçamento do mês
-        orcamentos_mes = OrcamentoService.listar_orcamentos(usuario.id, mes_num, ano_selecionado)
-        planejado_mes = sum(orc['valor_planejado'] for orc in orcamentos_mes)
-        
-        # Calcula diferença do planejado
-        diferenca_planejado = planejado_mes - totais_mes['total_despesas']
-        
-        dados_ano.append({
-            'mes': mes_num,
-            'mes_nome': formatador.mes_ano_formatado(mes_num, ano_selecionado).split(' de ')[0],
-            'mes_abrev': formatador.mes_ano_formatado(mes_num, ano_selecionado).split(' de ')[0][:3],
-            'entradas': totais_mes['total_entradas'],
-            'despesas': totais_mes['total_despesas'],
-            'saldo': totais_mes['saldo'],
-            'planejado': planejado_mes,
-            'diferenca_planejado': diferenca_planejado,
-            'percentual_gasto': (totais_mes['total_despesas'] / totais_mes['total_entradas'] * 100) if totais_mes['total_entradas'] > 0 else 0
-        })
-        
-        total_anual_entradas += totais_mes['total_entradas']
-        total_anual_despesas += totais_mes['total_despesas']
-        total_anual_planejado += planejado_mes
+    motor = MotorAnalitico(
+        orcamentos=OrcamentoService.listar_orcamentos_df(usuario.id, ano_selecionado),
+        totais_mensais=pd.DataFrame(totais_meses),
+        inicio=inicio_ano,
+        fim=fim_ano
+    )
+    indicadores = motor.indicadores()
+    
+    # Nomes dos meses para exibição
+    nomes_meses = {
+        mes_num: formatador.mes_ano_formatado(mes_num, ano_selecionado).split(' de ')[0]
+        for mes_num in range(1, 13)
+    }
+    
+    df_ano = motor.serie_mensal().assign(mes=lambda serie: serie['inicio'].dt.month)
+    df_ano['mes_nome'] = df_ano['mes'].map(nomes_meses)
+    df_ano['mes_abrev'] = df_ano['mes_nome'].str[:3]
     
-    df_ano = pd.DataFrame(dados_ano)
+    total_anual_entradas = indicadores['total_entradas']
+    total_anual_despesas = indicadores['total_despesas']
+    total_anual_planejado = indicadores['total_planejado']
     
     # ===== KPIs ANUAIS =====
     st.subheader(f"📊 Resumo Anual de {ano_selecionado}")
@@ -909,200 +544,35 @@ def mostrar_visao_anual(usuario, formatador):
     # Gráfico 1: Entradas vs Despesas (Área)
     st.markdown("#### 💰 Fluxo de Caixa Mensal")
     
-    fig_area = go.Figure()
-    
-    fig_area.add_trace(go.Scatter(
-        x=df_ano['mes_abrev'],
-        y=df_ano['entradas'],
-        mode='lines+markers',
-        name='Entradas',
-        fill='tozeroy',
-        line=dict(color='#27ae60', width=2),
-        marker=dict(size=8),
-        hovertemplate='%{x}<br>Entradas: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    fig_area.add_trace(go.Scatter(
-        x=df_ano['mes_abrev'],
-        y=df_ano['despesas'],
-        mode='lines+markers',
-        name='Despesas',
-        fill='tozeroy',
-        line=dict(color='#e74c3c', width=2),
-        marker=dict(size=8),
-        hovertemplate='%{x}<br>Despesas: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    fig_area.update_layout(
-        xaxis_title="Mês",
-        yaxis_title="Valor (R$)",
-        height=400,
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    
-    st.plotly_chart(fig_area, use_container_width=True)
+    _grafico_fluxo_anual(df_ano[['mes_abrev', 'entradas', 'despesas']])
     
     # Gráfico 2: Saldo Mensal (Barras)
     st.markdown("#### 💵 Saldo Mês a Mês")
     
-    fig_saldo = go.Figure()
-    
-    cores_saldo = ['#27ae60' if s >= 0 else '#e74c3c' for s in df_ano['saldo']]
-    
-    fig_saldo.add_trace(go.Bar(
-        x=df_ano['mes_abrev'],
-        y=df_ano['saldo'],
-        marker_color=cores_saldo,
-        text=[formatador.formatar_moeda(v) for v in df_ano['saldo']],
-        textposition='outside',
-        hovertemplate='%{x}<br>Saldo: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    fig_saldo.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-    
-    fig_saldo.update_layout(
-        xaxis_title="Mês",
-        yaxis_title="Saldo (R$)",
-        height=400,
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_saldo, use_container_width=True)
+    _grafico_saldo_anual(df_ano[['mes_abrev', 'saldo']])
     
     # Gráfico 3: Planejado vs Realizado
     if total_anual_planejado > 0:
         st.markdown("#### 📋 Orçamento Planejado vs Realizado")
         
-        fig_planejado = go.Figure()
-        
-        fig_planejado.add_trace(go.Scatter(
-            x=df_ano['mes_abrev'],
-            y=df_ano['planejado'],
-            mode='lines+markers',
-            name='Planejado',
-            line=dict(color='#3498db', width=2, dash='dash'),
-            marker=dict(size=8),
-            hovertemplate='%{x}<br>Planejado: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        fig_planejado.add_trace(go.Scatter(
-            x=df_ano['mes_abrev'],
-            y=df_ano['despesas'],
-            mode='lines+markers',
-            name='Realizado',
-            line=dict(color='#e67e22', width=2),
-            marker=dict(size=8),
-            hovertemplate='%{x}<br>Realizado: R$ %{y:,.2f}<extra></extra>'
-        ))
-        
-        fig_planejado.update_layout(
-            xaxis_title="Mês",
-            yaxis_title="Valor (R$)",
-            height=400,
-            hovermode='x unified',
-            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-        )
-        
-        st.plotly_chart(fig_planejado, use_container_width=True)
+        _grafico_planejado_realizado(df_ano[['mes_abrev', 'planejado', 'despesas']])
     
     # Gráfico 4: % Gasto por Mês (Gauge)
     st.markdown("#### 📊 Percentual de Gastos Mensal")
     
-    fig_percent = go.Figure()
-    
-    fig_percent.add_trace(go.Bar(
-        x=df_ano['mes_abrev'],
-        y=df_ano['percentual_gasto'],
-        marker=dict(
-            color=df_ano['percentual_gasto'],
-            colorscale=[[0, '#27ae60'], [0.5, '#f39c12'], [1, '#e74c3c']],
-            showscale=True,
-            colorbar=dict(title="% Gasto")
-        ),
-        text=[f"{v:.1f}%" for v in df_ano['percentual_gasto']],
-        textposition='outside',
-        hovertemplate='%{x}<br>% Gasto: %{y:.1f}%<extra></extra>'
-    ))
-    
-    fig_percent.add_hline(y=100, line_dash="dash", line_color="red", opacity=0.5, 
-                          annotation_text="100% (Gastou tudo)")
-    
-    fig_percent.update_layout(
-        xaxis_title="Mês",
-        yaxis_title="% Gasto",
-        height=400,
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_percent, use_container_width=True)
+    _grafico_percentual_gasto(df_ano[['mes_abrev', 'percentual_gasto']])
     
     # Gráfico 5: Controle Orçamentário (Barras Empilhadas)
     st.markdown("#### 🎯 Controle Orçamentário Mensal")
     
-    fig_controle = go.Figure()
-    
-    # Para cada mês, mostra 3 barras: Entrada, Despesa Realizada, Despesa Planejada
-    meses_labels = df_ano['mes_abrev'].tolist()
-    
-    # Barra 1: Entradas (base)
-    fig_controle.add_trace(go.Bar(
-        name='Entradas',
-        x=meses_labels,
-        y=df_ano['entradas'],
-        marker_color='#27ae60',
-        text=[formatador.formatar_moeda(v) for v in df_ano['entradas']],
-        textposition='inside',
-        hovertemplate='Entradas: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    # Barra 2: Despesas Realizadas
-    fig_controle.add_trace(go.Bar(
-        name='Despesas Realizadas',
-        x=meses_labels,
-        y=df_ano['despesas'],
-        marker_color='#e74c3c',
-        text=[formatador.formatar_moeda(v) for v in df_ano['despesas']],
-        textposition='inside',
-        hovertemplate='Despesas: R$ %{y:,.2f}<extra></extra>'
-    ))
-    
-    # Barra 3: Orçamento Planejado (se houver)
-    if total_anual_planejado > 0:
-        fig_controle.add_trace(go.Bar(
-            name='Orçamento Planejado',
-            x=meses_labels,
-            y=df_ano['planejado'],
-            marker_color='#3498db',
-            marker_pattern_shape="/",
-            text=[formatador.formatar_moeda(v) for v in df_ano['planejado']],
-            textposition='inside',
-            hovertemplate='Planejado: R$ %{y:,.2f}<extra></extra>'
-        ))
-    
-    fig_controle.update_layout(
-        barmode='group',
-        xaxis_title="Mês",
-        yaxis_title="Valor (R$)",
-        height=450,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        hovermode='x unified'
-    )
-    
-    st.plotly_chart(fig_controle, use_container_width=True)
+    _grafico_controle_orcamentario(df_ano[['mes_abrev', 'entradas', 'despesas', 'planejado']], total_anual_planejado)
     
     # Indicadores de alerta
     col1, col2, col3 = st.columns(3)
     
     with col1:
         # Quantos meses gastou mais que recebeu
-        meses_negativo = len([s for s in df_ano['saldo'] if s < 0])
+        meses_negativo = indicadores['meses_saldo_negativo']
         if meses_negativo > 0:
             st.warning(f"⚠️ **{meses_negativo} meses** gastando mais que recebendo")
         else:
@@ -1111,7 +581,7 @@ def mostrar_visao_anual(usuario, formatador):
     with col2:
         # Quantos meses estourou orçamento
         if total_anual_planejado > 0:
-            meses_estouro = len([d for d in df_ano['diferenca_planejado'] if d < 0])
+            meses_estouro = indicadores['meses_acima_orcamento']
             if meses_estouro > 0:
                 st.warning(f"⚠️ **{meses_estouro} meses** acima do orçamento")
             else:
@@ -1121,7 +591,7 @@ def mostrar_visao_anual(usuario, formatador):
     
     with col3:
         # Média de % gasto
-        media_percent = df_ano['percentual_gasto'].mean()
+        media_percent = indicadores['media_percentual_gasto']
         if media_percent > 90:
             st.error(f"⚠️ Média de **{media_percent:.1f}%** gasto")
         elif media_percent > 75:
@@ -1139,78 +609,24 @@ def mostrar_visao_anual(usuario, formatador):
         
         with col1:
             # Gráfico de Waterfall - Desvios mensais
-            fig_desvios = go.Figure()
-            
-            # Calcula desvios (positivo = economizou, negativo = estourou)
-            desvios = df_ano['diferenca_planejado'].tolist()
-            cores_desvios = ['#27ae60' if d >= 0 else '#e74c3c' for d in desvios]
-            
-            fig_desvios.add_trace(go.Bar(
-                x=df_ano['mes_abrev'],
-                y=desvios,
-                marker_color=cores_desvios,
-                text=[formatador.formatar_moeda(v) for v in desvios],
-                textposition='outside',
-                hovertemplate='%{x}<br>Desvio: R$ %{y:,.2f}<extra></extra>',
-                showlegend=False
-            ))
-            
-            fig_desvios.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
-            
-            # Adiciona anotações
-            fig_desvios.add_annotation(
-                x=0.5, y=1.15,
-                xref="paper", yref="paper",
-                text="🟢 Acima da linha = Economizou | 🔴 Abaixo = Estourou",
-                showarrow=False,
-                font=dict(size=10)
-            )
-            
-            fig_desvios.update_layout(
-                xaxis_title="Mês",
-                yaxis_title="Desvio (R$)",
-                height=400
-            )
-            
-            st.plotly_chart(fig_desvios, use_container_width=True)
+            _grafico_desvios(df_ano[['mes_abrev', 'diferenca_planejado']])
         
         with col2:
             # Gráfico de Pizza - Distribuição de controle
-            meses_sob_controle = len([d for d in desvios if d >= 0])
-            meses_fora_controle = len([d for d in desvios if d < 0])
-            
-            fig_pizza_controle = go.Figure(data=[go.Pie(
-                labels=['✅ Dentro do Orçamento', '⚠️ Acima do Orçamento'],
-                values=[meses_sob_controle, meses_fora_controle],
-                marker_colors=['#27ae60', '#e74c3c'],
-                hole=0.4,
-                textinfo='label+percent+value',
-                texttemplate='%{label}<br>%{value} meses<br>(%{percent})',
-                hovertemplate='%{label}<br>%{value} meses<br>%{percent}<extra></extra>'
-            )])
-            
-            fig_pizza_controle.update_layout(
-                title_text="Controle Orçamentário do Ano",
-                height=400,
-                annotations=[dict(
-                    text=f'{meses_sob_controle}/12',
-                    x=0.5, y=0.5,
-                    font_size=24,
-                    showarrow=False
-                )]
-            )
+            meses_sob_controle = indicadores['meses_dentro_orcamento']
+            meses_fora_controle = indicadores['meses_acima_orcamento']
             
-            st.plotly_chart(fig_pizza_controle, use_container_width=True)
+            _grafico_controle_ano(meses_sob_controle, meses_fora_controle)
         
         # Estatísticas de desvio
         st.markdown("##### 📊 Estatísticas de Desvio")
         
         col1, col2, col3, col4 = st.columns(4)
         
-        total_desvio = sum(desvios)
-        maior_economia = max(desvios)
-        maior_estouro = min(desvios)
-        desvio_medio = sum(desvios) / len(desvios)
+        total_desvio = indicadores['desvio_total']
+        maior_economia = indicadores['maior_economia']['valor']
+        maior_estouro = indicadores['maior_estouro']['valor']
+        desvio_medio = indicadores['desvio_medio']
         
         with col1:
             if total_desvio >= 0:
@@ -1219,11 +635,11 @@ def mostrar_visao_anual(usuario, formatador):
                 st.error(f"**Desvio Total**\n\n{formatador.formatar_moeda(total_desvio)}\n\n⚠️ Estouro geral")
         
         with col2:
-            mes_maior_economia = df_ano.loc[df_ano['diferenca_planejado'].idxmax(), 'mes_nome']
+            mes_maior_economia = nomes_meses[indicadores['maior_economia']['inicio'].month]
             st.info(f"**Maior Economia**\n\n{formatador.formatar_moeda(maior_economia)}\n\n📅 {mes_maior_economia}")
         
         with col3:
-            mes_maior_estouro = df_ano.loc[df_ano['diferenca_planejado'].idxmin(), 'mes_nome']
+            mes_maior_estouro = nomes_meses[indicadores['maior_estouro']['inicio'].month]
             if maior_estouro < 0:
                 st.warning(f"**Maior Estouro**\n\n{formatador.formatar_moeda(maior_estouro)}\n\n📅 {mes_maior_estouro}")
             else:
@@ -1240,56 +656,14 @@ def mostrar_visao_anual(usuario, formatador):
     # Gráfico 7: Gasto vs Renda (Semáforo)
     st.markdown("#### 🚦 Semáforo Financeiro - Gasto vs Renda")
     
-    fig_semaforo = go.Figure()
-    
-    # Para cada mês, calcula a diferença entre despesa e entrada
-    diferencas = [entrada - despesa for entrada, despesa in zip(df_ano['entradas'], df_ano['despesas'])]
+    _grafico_semaforo(df_ano[['mes_abrev', 'saldo', 'semaforo']])
     
-    # Define cores baseadas na diferença
-    cores_semaforo = []
-    for diff, entrada in zip(diferencas, df_ano['entradas']):
-        if diff < 0:  # Gastou mais que recebeu
-            cores_semaforo.append('#e74c3c')  # Vermelho
-        elif diff < entrada * 0.10:  # Economizou menos de 10%
-            cores_semaforo.append('#f39c12')  # Amarelo
-        else:  # Economizou 10% ou mais
-            cores_semaforo.append('#27ae60')  # Verde
+    # Análise do semáforo
+    meses_vermelho = indicadores['semaforo']['vermelho']
+    meses_amarelo = indicadores['semaforo']['amarelo']
+    meses_verde = indicadores['semaforo']['verde']
     
-    fig_semaforo.add_trace(go.Bar(
-        x=df_ano['mes_abrev'],
-        y=diferencas,
-        marker_color=cores_semaforo,
-        text=[formatador.formatar_moeda(v) for v in diferencas],
-        textposition='outside',
-        hovertemplate='%{x}<br>Diferença: R$ %{y:,.2f}<extra></extra>',
-        showlegend=False
-    ))
-    
-    fig_semaforo.add_hline(y=0, line_dash="solid", line_color="black", line_width=2)
-    
-    # Adiciona legendas
-    fig_semaforo.add_annotation(
-        x=0.15, y=1.12,
-        xref="paper", yref="paper",
-        text="🔴 Negativo = Gastou mais | 🟡 0-10% sobra | 🟢 +10% sobra",
-        showarrow=False,
-        font=dict(size=11)
-    )
-    
-    fig_semaforo.update_layout(
-        xaxis_title="Mês",
-        yaxis_title="Diferença Renda - Gasto (R$)",
-        height=400
-    )
-    
-    st.plotly_chart(fig_semaforo, use_container_width=True)
-    
-    # Análise do semáforo
-    meses_vermelho = len([c for c in cores_semaforo if c == '#e74c3c'])
-    meses_amarelo = len([c for c in cores_semaforo if c == '#f39c12'])
-    meses_verde = len([c for c in cores_semaforo if c == '#27ae60'])
-    
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3 = st.columns(3)
     
     with col1:
         if meses_vermelho > 0:
@@ -1360,12 +734,12 @@ def mostrar_visao_anual(usuario, formatador):
     # Formata valores
     tabela_display = pd.DataFrame({
         'Mês': tabela_dados['mes_nome'],
-        'Entradas': [formatador.formatar_moeda(v) for v in tabela_dados['entradas']],
-        'Despesas': [formatador.formatar_moeda(v) for v in tabela_dados['despesas']],
-        'Saldo': [formatador.formatar_moeda(v) for v in tabela_dados['saldo']],
-        'Planejado': [formatador.formatar_moeda(v) for v in tabela_dados['planejado']],
-        'Dif. Planejado': [formatador.formatar_moeda(v) for v in tabela_dados['diferenca_planejado']],
-        '% Gasto': [f"{v:.1f}%" for v in tabela_dados['percentual_gasto']]
+        'Entradas': formatador.formatar_moeda_serie(tabela_dados['entradas']),
+        'Despesas': formatador.formatar_moeda_serie(tabela_dados['despesas']),
+        'Saldo': formatador.formatar_moeda_serie(tabela_dados['saldo']),
+        'Planejado': formatador.formatar_moeda_serie(tabela_dados['planejado']),
+        'Dif. Planejado': formatador.formatar_moeda_serie(tabela_dados['diferenca_planejado']),
+        '% Gasto': formatador.formatar_percentual_serie(tabela_dados['percentual_gasto'])
     })
     
     # Adiciona linha de totais
@@ -1376,7 +750,7 @@ def mostrar_visao_anual(usuario, formatador):
         'Saldo': [formatador.formatar_moeda(saldo_anual)],
         'Planejado': [formatador.formatar_moeda(total_anual_planejado)],
         'Dif. Planejado': [formatador.formatar_moeda(total_anual_planejado - total_anual_despesas)],
-        '% Gasto': [f"{(total_anual_despesas / total_anual_entradas * 100):.1f}%" if total_anual_entradas > 0 else "0%"]
+        '% Gasto': [formatador.formatar_percentual(total_anual_despesas / total_anual_entradas * 100) if total_anual_entradas > 0 else "0%"]
     })
     
     tabela_completa = pd.concat([tabela_display, totais_row], ignore_index=True)
@@ -1407,22 +781,22 @@ def mostrar_visao_anual(usuario, formatador):
     
     with col1:
         # Melhor mês
-        melhor_mes = df_ano.loc[df_ano['saldo'].idxmax()]
+        melhor_mes = indicadores['melhor_mes']
         st.success(f"""
         **✅ Melhor Mês**
         
-        {melhor_mes['mes_nome']}
+        {nomes_meses[melhor_mes['inicio'].month]}
         
         Saldo: {formatador.formatar_moeda(melhor_mes['saldo'])}
         """)
     
     with col2:
         # Pior mês
-        pior_mes = df_ano.loc[df_ano['saldo'].idxmin()]
+        pior_mes = indicadores['pior_mes']
         st.error(f"""
         **⚠️ Pior Mês**
         
-        {pior_mes['mes_nome']}
+        {nomes_meses[pior_mes['inicio'].month]}
         
         Saldo: {formatador.formatar_moeda(pior_mes['saldo'])}
         """)
@@ -1430,13 +804,693 @@ def mostrar_visao_anual(usuario, formatador):
     with col3:
         # Mês mais econômico
         if total_anual_planejado > 0:
-            mais_economico = df_ano.loc[df_ano['diferenca_planejado'].idxmax()]
+            mais_economico = indicadores['maior_economia']
             st.info(f"""
             **💰 Mais Econômico**
             
-            {mais_economico['mes_nome']}
+            {nomes_meses[mais_economico['inicio'].month]}
             
-            Economizou: {formatador.formatar_moeda(mais_economico['diferenca_planejado'])}
+            Economizou: {formatador.formatar_moeda(mais_economico['valor'])}
             """)
         else:
             st.info("💡 Configure orçamentos para ver análise de economia")
+
+
+@grafico_em_cache
+def _grafico_barra_saldo(totais) -> go.Figure:
+    """Barra horizontal de entradas sobre despesas do mês."""
+    
+    fig_barra = go.Figure()
+    
+    fig_barra.add_trace(go.Bar(
+        x=[totais['total_entradas']],
+        y=[''],
+        orientation='h',
+        name='Entrada',
+        marker_color='#27ae60',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('x'),
+        textposition='inside',
+        hoverinfo='text',
+        hovertext=f"Entradas: {FormatadorBR.formatar_moeda(totais['total_entradas'])}"
+    ))
+    
+    fig_barra.add_trace(go.Bar(
+        x=[totais['total_despesas']],
+        y=[''],
+        orientation='h',
+        name='Despesa',
+        marker_color='#e74c3c',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('x'),
+        textposition='inside',
+        hoverinfo='text',
+        hovertext=f"Despesas: {FormatadorBR.formatar_moeda(totais['total_despesas'])}"
+    ))
+    
+    fig_barra.update_layout(
+        barmode='overlay',
+        showlegend=True,
+        height=120,
+        margin=dict(l=0, r=0, t=0, b=0),
+        xaxis=dict(showticklabels=False, showgrid=False),
+        yaxis=dict(showticklabels=False),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    
+    return fig_barra
+
+
+@grafico_em_cache
+def _grafico_evolucao_mensal(df_meses) -> go.Figure:
+    """Linhas de entradas e despesas dos últimos meses."""
+    
+    fig_evolucao = go.Figure()
+    
+    fig_evolucao.add_trace(go.Scatter(
+        x=df_meses['mes'],
+        y=df_meses['entradas'],
+        mode='lines+markers+text',
+        name='Entradas',
+        line=dict(color='#27ae60', width=3),
+        marker=dict(size=10),
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='top center',
+        textfont=dict(size=10)
+    ))
+    
+    fig_evolucao.add_trace(go.Scatter(
+        x=df_meses['mes'],
+        y=df_meses['despesas'],
+        mode='lines+markers+text',
+        name='Despesas',
+        line=dict(color='#e74c3c', width=3),
+        marker=dict(size=10),
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='bottom center',
+        textfont=dict(size=10)
+    ))
+    
+    fig_evolucao.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Valor (R$)",
+        height=400,
+        hovermode='x unified',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    return fig_evolucao
+
+
+@grafico_em_cache
+def _grafico_saldo_mensal(df_meses) -> go.Figure:
+    """Barras do saldo de cada mês."""
+    
+    fig_saldo = go.Figure()
+    
+    # Define cores baseadas no saldo (positivo/negativo)
+    cores = np.where(df_meses['saldo'] >= 0, '#27ae60', '#e74c3c')
+    
+    fig_saldo.add_trace(go.Bar(
+        x=df_meses['mes'],
+        y=df_meses['saldo'],
+        marker_color=cores,
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='outside',
+        hovertemplate='%{x}: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_saldo.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Saldo (R$)",
+        height=350,
+        showlegend=False
+    )
+    
+    # Adiciona linha zero
+    fig_saldo.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    
+    return fig_saldo
+
+
+@grafico_em_cache
+def _grafico_distribuicao_despesas(df_dist, total_despesas_mes) -> go.Figure:
+    """Donut da distribuição das despesas por categoria."""
+    
+    fig_donut = go.Figure(data=[go.Pie(
+        labels=df_dist['categoria'],
+        values=df_dist['valor'],
+        hole=0.5,
+        marker=dict(colors=df_dist['cor']),
+        texttemplate='%{label}<br>%{percent}',
+        hovertemplate='<b>%{label}</b><br>Valor: R$ %{value:,.2f}<br>Percentual: %{percent}<extra></extra>'
+    )])
+    
+    fig_donut.update_layout(
+        title="Distribuição Percentual",
+        height=400,
+        annotations=[dict(
+            text=FormatadorBR.formatar_moeda(total_despesas_mes),
+            x=0.5, y=0.5,
+            font_size=16,
+            showarrow=False
+        )]
+    )
+    
+    return fig_donut
+
+
+@grafico_em_cache
+def _grafico_evolucao_gastos(df_evolucao) -> go.Figure:
+    """Tendência dos gastos dos últimos meses."""
+    
+    fig_evolucao_gastos = go.Figure()
+    
+    fig_evolucao_gastos.add_trace(go.Scatter(
+        x=df_evolucao['mes'],
+        y=df_evolucao['gastos'],
+        mode='lines+markers',
+        line=dict(color='#e74c3c', width=3),
+        marker=dict(size=10, color='#c0392b'),
+        fill='tozeroy',
+        fillcolor='rgba(231, 76, 60, 0.1)',
+        hovertemplate='<b>%{x}</b><br>Gastos: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_evolucao_gastos.update_layout(
+        title="Tendência de Gastos",
+        xaxis_title="Mês",
+        yaxis_title="Gastos (R$)",
+        height=400,
+        showlegend=False
+    )
+    
+    return fig_evolucao_gastos
+
+
+@grafico_em_cache
+def _grafico_fluxo_caixa(total_entradas_mes, total_despesas_mes, fluxo_caixa) -> go.Figure:
+    """Entradas, saídas e saldo do mês."""
+    
+    fig_fluxo = go.Figure()
+    
+    fig_fluxo.add_trace(go.Bar(
+        name='Entradas',
+        x=['Fluxo de Caixa'],
+        y=[total_entradas_mes],
+        marker_color='#27ae60',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='inside',
+        hovertemplate='Entradas: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_fluxo.add_trace(go.Bar(
+        name='Saídas',
+        x=['Fluxo de Caixa'],
+        y=[total_despesas_mes],
+        marker_color='#e74c3c',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='inside',
+        hovertemplate='Saídas: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    # Adiciona linha do saldo
+    fig_fluxo.add_trace(go.Scatter(
+        name=f'Saldo: {FormatadorBR.formatar_moeda(fluxo_caixa)}',
+        x=['Fluxo de Caixa'],
+        y=[fluxo_caixa],
+        mode='markers+text',
+        marker=dict(
+            size=20,
+            color='#3498db',
+            symbol='diamond'
+        ),
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='top center',
+        hovertemplate='Saldo: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_fluxo.update_layout(
+        title="Entradas vs Saídas",
+        yaxis_title="Valor (R$)",
+        height=400,
+        barmode='group'
+    )
+    
+    return fig_fluxo
+
+
+@grafico_em_cache
+def _grafico_comprometimento(comprometimento) -> go.Figure:
+    """Velocímetro do comprometimento da renda."""
+    
+    fig_gauge = go.Figure(go.Indicator(
+        mode="gauge+number+delta",
+        value=comprometimento,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Comprometimento (%)"},
+        delta={'reference': 50, 'increasing': {'color': "red"}, 'decreasing': {'color': "green"}},
+        gauge={
+            'axis': {'range': [None, 100], 'tickwidth': 1, 'tickcolor': "darkblue"},
+            'bar': {'color': "darkblue"},
+            'bgcolor': "white",
+            'borderwidth': 2,
+            'bordercolor': "gray",
+            'steps': [
+                {'range': [0, 50], 'color': '#27ae60'},
+                {'range': [50, 70], 'color': '#f39c12'},
+                {'range': [70, 100], 'color': '#e74c3c'}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 70
+            }
+        }
+    ))
+    
+    fig_gauge.update_layout(
+        height=300,
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    
+    return fig_gauge
+
+
+@grafico_em_cache
+def _grafico_saldo_acumulado(df_acumulado) -> go.Figure:
+    """Área do saldo acumulado."""
+    
+    fig_acumulado = go.Figure()
+    
+    fig_acumulado.add_trace(go.Scatter(
+        x=df_acumulado['mes'],
+        y=df_acumulado['saldo_acumulado'],
+        mode='lines+markers',
+        line=dict(color='#3498db', width=3),
+        marker=dict(size=10),
+        fill='tozeroy',
+        fillcolor='rgba(52, 152, 219, 0.2)',
+        hovertemplate='<b>%{x}</b><br>Saldo Acumulado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_acumulado.update_layout(
+        title="Evolução do Capital",
+        xaxis_title="Mês",
+        yaxis_title="Saldo Acumulado (R$)",
+        height=400,
+        showlegend=False
+    )
+    
+    # Linha zero
+    fig_acumulado.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    
+    return fig_acumulado
+
+
+@grafico_em_cache
+def _grafico_despesas_categoria(df_dist) -> go.Figure:
+    """Pizza das despesas por categoria."""
+    
+    fig = px.pie(
+        df_dist,
+        values='valor',
+        names='categoria',
+        color='categoria',
+        color_discrete_map=dict(zip(df_dist['categoria'], df_dist['cor']))
+    )
+    
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(showlegend=False, height=400)
+    
+    return fig
+
+
+@grafico_em_cache
+def _grafico_entrada_despesa(df_comparativo) -> go.Figure:
+    """Barras de entradas e despesas do mês."""
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=df_comparativo['Tipo'],
+            y=df_comparativo['Valor'],
+            marker_color=df_comparativo['Cor'],
+            texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+            textposition='outside'
+        )
+    ])
+    
+    fig.update_layout(
+        yaxis_title="Valor (R$)",
+        showlegend=False,
+        height=400
+    )
+    
+    return fig
+
+
+@grafico_em_cache
+def _grafico_orcamento_realizado(df_orcamento) -> go.Figure:
+    """Barras agrupadas de planejado e realizado por categoria."""
+    
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name='Planejado',
+        x=df_orcamento['categoria_nome'],
+        y=df_orcamento['valor_planejado'],
+        marker_color='#3498db',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='outside'
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Realizado',
+        x=df_orcamento['categoria_nome'],
+        y=df_orcamento['valor_realizado'],
+        marker_color='#e67e22',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='outside'
+    ))
+    
+    fig.update_layout(
+        barmode='group',
+        yaxis_title="Valor (R$)",
+        xaxis_title="Categoria",
+        height=400
+    )
+    
+    return fig
+
+
+@grafico_em_cache
+def _grafico_fluxo_anual(df_ano) -> go.Figure:
+    """Áreas de entradas e despesas de cada mês do ano."""
+    
+    fig_area = go.Figure()
+    
+    fig_area.add_trace(go.Scatter(
+        x=df_ano['mes_abrev'],
+        y=df_ano['entradas'],
+        mode='lines+markers',
+        name='Entradas',
+        fill='tozeroy',
+        line=dict(color='#27ae60', width=2),
+        marker=dict(size=8),
+        hovertemplate='%{x}<br>Entradas: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_area.add_trace(go.Scatter(
+        x=df_ano['mes_abrev'],
+        y=df_ano['despesas'],
+        mode='lines+markers',
+        name='Despesas',
+        fill='tozeroy',
+        line=dict(color='#e74c3c', width=2),
+        marker=dict(size=8),
+        hovertemplate='%{x}<br>Despesas: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_area.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Valor (R$)",
+        height=400,
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig_area
+
+
+@grafico_em_cache
+def _grafico_saldo_anual(df_ano) -> go.Figure:
+    """Barras do saldo de cada mês do ano."""
+    
+    fig_saldo = go.Figure()
+    
+    cores_saldo = np.where(df_ano['saldo'] >= 0, '#27ae60', '#e74c3c')
+    
+    fig_saldo.add_trace(go.Bar(
+        x=df_ano['mes_abrev'],
+        y=df_ano['saldo'],
+        marker_color=cores_saldo,
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='outside',
+        hovertemplate='%{x}<br>Saldo: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_saldo.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    
+    fig_saldo.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Saldo (R$)",
+        height=400,
+        showlegend=False
+    )
+    
+    return fig_saldo
+
+
+@grafico_em_cache
+def _grafico_planejado_realizado(df_ano) -> go.Figure:
+    """Linhas do orçamento planejado e das despesas realizadas."""
+    
+    fig_planejado = go.Figure()
+    
+    fig_planejado.add_trace(go.Scatter(
+        x=df_ano['mes_abrev'],
+        y=df_ano['planejado'],
+        mode='lines+markers',
+        name='Planejado',
+        line=dict(color='#3498db', width=2, dash='dash'),
+        marker=dict(size=8),
+        hovertemplate='%{x}<br>Planejado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_planejado.add_trace(go.Scatter(
+        x=df_ano['mes_abrev'],
+        y=df_ano['despesas'],
+        mode='lines+markers',
+        name='Realizado',
+        line=dict(color='#e67e22', width=2),
+        marker=dict(size=8),
+        hovertemplate='%{x}<br>Realizado: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    fig_planejado.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Valor (R$)",
+        height=400,
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    
+    return fig_planejado
+
+
+@grafico_em_cache
+def _grafico_percentual_gasto(df_ano) -> go.Figure:
+    """Barras do percentual da renda gasto em cada mês."""
+    
+    fig_percent = go.Figure()
+    
+    fig_percent.add_trace(go.Bar(
+        x=df_ano['mes_abrev'],
+        y=df_ano['percentual_gasto'],
+        marker=dict(
+            color=df_ano['percentual_gasto'],
+            colorscale=[[0, '#27ae60'], [0.5, '#f39c12'], [1, '#e74c3c']],
+            showscale=True,
+            colorbar=dict(title="% Gasto")
+        ),
+        texttemplate=FormatadorBR.modelo_percentual_plotly('y'),
+        textposition='outside',
+        hovertemplate='%{x}<br>% Gasto: %{y:.1f}%<extra></extra>'
+    ))
+    
+    fig_percent.add_hline(y=100, line_dash="dash", line_color="red", opacity=0.5, 
+                          annotation_text="100% (Gastou tudo)")
+    
+    fig_percent.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="% Gasto",
+        height=400,
+        showlegend=False
+    )
+    
+    return fig_percent
+
+
+@grafico_em_cache
+def _grafico_controle_orcamentario(df_ano, total_anual_planejado) -> go.Figure:
+    """Barras de entradas, despesas e orçamento planejado por mês."""
+    
+    fig_controle = go.Figure()
+    
+    # Para cada mês, mostra 3 barras: Entrada, Despesa Realizada, Despesa Planejada
+    meses_labels = df_ano['mes_abrev'].tolist()
+    
+    # Barra 1: Entradas (base)
+    fig_controle.add_trace(go.Bar(
+        name='Entradas',
+        x=meses_labels,
+        y=df_ano['entradas'],
+        marker_color='#27ae60',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='inside',
+        hovertemplate='Entradas: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    # Barra 2: Despesas Realizadas
+    fig_controle.add_trace(go.Bar(
+        name='Despesas Realizadas',
+        x=meses_labels,
+        y=df_ano['despesas'],
+        marker_color='#e74c3c',
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='inside',
+        hovertemplate='Despesas: R$ %{y:,.2f}<extra></extra>'
+    ))
+    
+    # Barra 3: Orçamento Planejado (se houver)
+    if total_anual_planejado > 0:
+        fig_controle.add_trace(go.Bar(
+            name='Orçamento Planejado',
+            x=meses_labels,
+            y=df_ano['planejado'],
+            marker_color='#3498db',
+            marker_pattern_shape="/",
+            texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+            textposition='inside',
+            hovertemplate='Planejado: R$ %{y:,.2f}<extra></extra>'
+        ))
+    
+    fig_controle.update_layout(
+        barmode='group',
+        xaxis_title="Mês",
+        yaxis_title="Valor (R$)",
+        height=450,
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        hovermode='x unified'
+    )
+    
+    return fig_controle
+
+
+@grafico_em_cache
+def _grafico_desvios(df_ano) -> go.Figure:
+    """Desvios mensais em relação ao orçamento."""
+    
+    fig_desvios = go.Figure()
+    
+    # Calcula desvios (positivo = economizou, negativo = estourou)
+    desvios = df_ano['diferenca_planejado']
+    cores_desvios = np.where(desvios >= 0, '#27ae60', '#e74c3c')
+    
+    fig_desvios.add_trace(go.Bar(
+        x=df_ano['mes_abrev'],
+        y=desvios,
+        marker_color=cores_desvios,
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='outside',
+        hovertemplate='%{x}<br>Desvio: R$ %{y:,.2f}<extra></extra>',
+        showlegend=False
+    ))
+    
+    fig_desvios.add_hline(y=0, line_dash="dash", line_color="gray", opacity=0.5)
+    
+    # Adiciona anotações
+    fig_desvios.add_annotation(
+        x=0.5, y=1.15,
+        xref="paper", yref="paper",
+        text="🟢 Acima da linha = Economizou | 🔴 Abaixo = Estourou",
+        showarrow=False,
+        font=dict(size=10)
+    )
+    
+    fig_desvios.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Desvio (R$)",
+        height=400
+    )
+    
+    return fig_desvios
+
+
+@grafico_em_cache
+def _grafico_controle_ano(meses_sob_controle, meses_fora_controle) -> go.Figure:
+    """Meses dentro e acima do orçamento."""
+    
+    fig_pizza_controle = go.Figure(data=[go.Pie(
+        labels=['✅ Dentro do Orçamento', '⚠️ Acima do Orçamento'],
+        values=[meses_sob_controle, meses_fora_controle],
+        marker_colors=['#27ae60', '#e74c3c'],
+        hole=0.4,
+        textinfo='label+percent+value',
+        texttemplate='%{label}<br>%{value} meses<br>(%{percent})',
+        hovertemplate='%{label}<br>%{value} meses<br>%{percent}<extra></extra>'
+    )])
+    
+    fig_pizza_controle.update_layout(
+        title_text="Controle Orçamentário do Ano",
+        height=400,
+        annotations=[dict(
+            text=f'{meses_sob_controle}/12',
+            x=0.5, y=0.5,
+            font_size=24,
+            showarrow=False
+        )]
+    )
+    
+    return fig_pizza_controle
+
+
+@grafico_em_cache
+def _grafico_semaforo(df_ano) -> go.Figure:
+    """Semáforo da diferença entre renda e gasto de cada mês."""
+    
+    fig_semaforo = go.Figure()
+    
+    # Diferença entre entrada e despesa de cada mês, colorida pela classe do semáforo
+    diferencas = df_ano['saldo']
+    cores_semaforo = df_ano['semaforo'].map(CORES_SEMAFORO).astype(str)
+    
+    fig_semaforo.add_trace(go.Bar(
+        x=df_ano['mes_abrev'],
+        y=diferencas,
+        marker_color=cores_semaforo,
+        texttemplate=FormatadorBR.modelo_moeda_plotly('y'),
+        textposition='outside',
+        hovertemplate='%{x}<br>Diferença: R$ %{y:,.2f}<extra></extra>',
+        showlegend=False
+    ))
+    
+    fig_semaforo.add_hline(y=0, line_dash="solid", line_color="black", line_width=2)
+    
+    # Adiciona legendas
+    fig_semaforo.add_annotation(
+        x=0.15, y=1.12,
+        xref="paper", yref="paper",
+        text="🔴 Negativo = Gastou mais | 🟡 0-10% sobra | 🟢 +10% sobra",
+        showarrow=False,
+        font=dict(size=11)
+    )
+    
+    fig_semaforo.update_layout(
+        xaxis_title="Mês",
+        yaxis_title="Diferença Renda - Gasto (R$)",
+        height=400
+    )
+    
+    return fig_semaforo
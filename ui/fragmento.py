@@ -0,0 +1,44 @@
+from typing import Callable, Optional
+import streamlit as st
+
+
+# st.fragment (Streamlit 1.37+) ou st.experimental_fragment (1.33 a 1.36)
+_fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None)
+
+# Indica se os fragmentos (e a reexecução periódica) estão disponíveis
+FRAGMENTOS_DISPONIVEIS = _fragment is not None
+
+
+def fragmento(funcao: Optional[Callable] = None, *, intervalo: Optional[float] = None):
+    """
+    Decora uma seção da página para ser reexecutada sozinha.
+
+    Dentro do fragmento, a interação com um widget reexecuta apenas a
+    função decorada, e não a página inteira. Com intervalo (em segundos),
+    o fragmento também se reexecuta periodicamente, para acompanhar
+    trabalhos em andamento. Em versões do Streamlit sem fragmentos, a função
+    é devolvida sem alteração e a página inteira é reexecutada, como antes.
+
+    Uso: @fragmento ou @fragmento(intervalo=1)
+    """
+    if funcao is None:
+        return lambda funcao_decorada: fragmento(funcao_decorada, intervalo=intervalo)
+    if _fragment is None:
+        return funcao
+    if intervalo is None:
+        return _fragment(funcao)
+    return _fragment(funcao, run_every=intervalo)
+
+
+def manter_estado_widgets(*chaves: str):
+    """
+    Preserva o valor de widgets que deixam de ser exibidos.
+
+    O Streamlit descarta o estado de um widget que não é renderizado em uma
+    execução; com seções exibidas sob demanda, a seleção seria perdida ao
+    trocar de seção. Regravar a chave no session_state a mantém. Use apenas
+    para widgets que não serão criados nesta execução.
+    """
+    for chave in chaves:
+        if chave in st.session_state:
+            st.session_state[chave] = st.session_state[chave]
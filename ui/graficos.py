@@ -0,0 +1,36 @@
+from functools import wraps
+from typing import Callable
+import plotly.graph_objects as go
+import streamlit as st
+from utils.formatador import FormatadorBR
+
+
+# Número máximo de gráficos mantidos no cache do processo (os menos usados são descartados)
+TAMANHO_MAXIMO_CACHE_GRAFICOS = 256
+
+
+@st.cache_data(max_entries=TAMANHO_MAXIMO_CACHE_GRAFICOS, show_spinner=False)
+def _exibir_em_cache(grafico: str, _construtor: Callable[..., go.Figure], *args, **kwargs):
+    """Monta e exibe a figura; em um acerto, o st.cache_data reexibe o gráfico gravado."""
+    figura = _construtor(*args, **kwargs)
+    # Rótulos formatados pelo Plotly (texttemplate/hovertemplate) com separadores brasileiros
+    figura.update_layout(separators=FormatadorBR.SEPARADORES_PLOTLY)
+    st.plotly_chart(figura, use_container_width=True)
+
+
+def grafico_em_cache(construtor: Callable[..., go.Figure]) -> Callable[..., None]:
+    """
+    Decorador para funções que montam uma figura Plotly a partir de dados.
+
+    Chamar a função decorada exibe a figura com st.plotly_chart. A chave do
+    cache é o gráfico (nome da função) mais um hash dos argumentos; enquanto
+    os dados não mudam, o gráfico já serializado é reexibido sem montar a
+    figura nem convertê-la para JSON de novo.
+    """
+    grafico = f"{construtor.__module__}.{construtor.__qualname__}"
+
+    @wraps(construtor)
+    def wrapper(*args, **kwargs):
+        _exibir_em_cache(grafico, construtor, *args, **kwargs)
+
+    return wrapper
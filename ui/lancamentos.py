@@ -1,13 +1,70 @@
+import io
 import streamlit as st
 import pandas as pd
 from datetime import datetime, date, timedelta
 from dateutil.relativedelta import relativedelta
-from services import LancamentoService, CategoriaService
+from services import LancamentoService, CategoriaService, RecorrenciaService, ImportacaoService, SugestaoService
+from services.lancamento_service import LIMITE_BUSCA
 from models.lancamento import TipoLancamento
 from models.categoria import TipoCategoria
 from utils.formatador import FormatadorBR
 
 
+def _chave_lancamento(lanc: dict) -> str:
+    """Identificador único na tela para lançamentos e ocorrências de recorrências."""
+    if lanc.get('recorrencia_id'):
+        return f"rec_{lanc['recorrencia_id']}_{lanc['data']}"
+    return str(lanc['id'])
+
+
+def _excluir_lancamento(lanc: dict, usuario_id: int) -> tuple[bool, str]:
+    """Exclui um lançamento ou, se for ocorrência de recorrência, apenas aquela ocorrência."""
+    if lanc.get('recorrencia_id'):
+        return RecorrenciaService.excluir_ocorrencia(lanc['recorrencia_id'], usuario_id, lanc['data'])
+    return LancamentoService.excluir_lancamento(lanc['id'], usuario_id)
+
+
+def _sugerir_categoria(usuario_id: int, prefixo: str, categorias: list):
+    """Callback da descrição: seleciona no formulário a categoria sugerida pelo histórico do usuário."""
+    sugestao = SugestaoService.sugerir(
+        usuario_id, st.session_state[f"{prefixo}_descricao"], [c['id'] for c in categorias]
+    )
+    if sugestao:
+        st.session_state[f"{prefixo}_categoria"] = next(c for c in categorias if c['id'] == sugestao['categoria_id'])
+        st.session_state[f"{prefixo}_categoria_sugerida"] = sugestao['categoria_id']
+    else:
+        st.session_state.pop(f"{prefixo}_categoria_sugerida", None)
+
+
+def _mostrar_linhas(lancamentos: list, prefixo_chave: str, usuario_id: int, formatador: FormatadorBR):
+    """Uma linha por lançamento, com data, categoria, descrição, valor e botão de exclusão."""
+    for lanc in lancamentos:
+        with st.container():
+            col1, col2, col3, col4, col5 = st.columns([1.5, 1, 2, 1.5, 1])
+            
+            with col1:
+                st.write(f"📅 {formatador.formatar_data(lanc['data'])}")
+            
+            with col2:
+                st.markdown(f'<span style="background-color: {lanc["categoria_cor"]}; padding: 2px 8px; border-radius: 4px; color: white;">{lanc["categoria_nome"]}</span>', unsafe_allow_html=True)
+            
+            with col3:
+                # 🔁 marca ocorrências calculadas a partir de uma recorrência
+                st.write(f"{'🔁 ' if lanc.get('recorrencia_id') else ''}**{lanc['descricao']}**")
+            
+            with col4:
+                st.write(f"**{formatador.formatar_moeda(lanc['valor'])}**")
+            
+            with col5:
+                if st.button("🗑️", key=f"{prefixo_chave}_{_chave_lancamento(lanc)}"):
+                    sucesso, mensagem = _excluir_lancamento(lanc, usuario_id)
+                    if sucesso:
+                        st.success(mensagem)
+                        st.rerun()
+                    else:
+                        st.error(mensagem)
+
+
 def mostrar_lancamentos():
     """Tela de gerenciamento de lançamentos financeiros."""
     
@@ -16,7 +73,9 @@ def mostrar_lancamentos():
     
     st.title("💳 Lançamentos Financeiros")
     
-    tab_listar, tab_entrada, tab_despesa = st.tabs(["📋 Meus Lançamentos", "💰 Nova Entrada", "💸 Nova Despesa"])
+    tab_listar, tab_entrada, tab_despesa, tab_recorrencias, tab_importar = st.tabs(
+        ["📋 Meus Lançamentos", "💰 Nova Entrada", "💸 Nova Despesa", "🔁 Recorrências", "📥 Importar CSV"]
+    )
     
     with tab_listar:
         st.subheader("Lançamentos Registrados")
@@ -53,7 +112,32 @@ def mostrar_lancamentos():
             if categoria_selecionada:
                 categoria_id = categoria_selecionada['id']
         
-        lancamentos = LancamentoService.listar_lancamentos(usuario.id, mes, ano, categoria_id)
+        termo = st.text_input("🔍 Buscar na descrição", placeholder="Ex.: mercado, uber...").strip()
+        
+        if termo:
+            # Busca: os resultados mais relevantes, sem paginação; totais somados sobre eles
+            lancamentos = LancamentoService.buscar(usuario.id, termo, mes, ano, categoria_id)
+            total_entradas = sum(l['valor'] for l in lancamentos if l['categoria_tipo'] == TipoCategoria.ENTRADA)
+            total_despesas = sum(l['valor'] for l in lancamentos if l['categoria_tipo'] == TipoCategoria.DESPESA)
+            totais = {
+                'total_entradas': total_entradas,
+                'total_despesas': total_despesas,
+                'saldo': total_entradas - total_despesas,
+                'quantidade': len(lancamentos)
+            }
+        else:
+            # Pilha de cursores das páginas visitadas; volta à primeira página quando os filtros mudam
+            filtros = (mes, ano, categoria_id)
+            if st.session_state.get('lancamentos_filtros') != filtros:
+                st.session_state['lancamentos_filtros'] = filtros
+                st.session_state['lancamentos_cursores'] = [None]
+            
+            cursores = st.session_state['lancamentos_cursores']
+            
+            # Totais do filtro inteiro, sem carregar os lançamentos
+            totais = LancamentoService.totalizar_lancamentos(usuario.id, mes, ano, categoria_id)
+            pagina = LancamentoService.listar_lancamentos_pagina(usuario.id, mes, ano, categoria_id, cursores[-1])
+            lancamentos = pagina['lancamentos']
         
         if lancamentos:
             # Separa por tipo
@@ -61,81 +145,55 @@ def mostrar_lancamentos():
             despesas = [l for l in lancamentos if l['categoria_tipo'] == TipoCategoria.DESPESA]
             
             # Exibe totais
-            total_entradas = sum(l['valor'] for l in entradas)
-            total_despesas = sum(l['valor'] for l in despesas)
-            
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                st.metric("💰 Entradas", formatador.formatar_moeda(total_entradas))
+                st.metric("💰 Entradas", formatador.formatar_moeda(totais['total_entradas']))
             
             with col2:
-                st.metric("💸 Despesas", formatador.formatar_moeda(total_despesas))
+                st.metric("💸 Despesas", formatador.formatar_moeda(totais['total_despesas']))
             
             with col3:
-                st.metric("💵 Saldo", formatador.formatar_moeda(total_entradas - total_despesas))
+                st.metric("💵 Saldo", formatador.formatar_moeda(totais['saldo']))
+            
+            if termo:
+                limite = " (os mais relevantes)" if len(lancamentos) >= LIMITE_BUSCA else ""
+                st.caption(f"{len(lancamentos)} lançamentos encontrados para \"{termo}\"{limite}")
+            else:
+                # Navegação entre páginas
+                col1, col2, col3 = st.columns([1, 2, 1])
+                
+                with col1:
+                    if st.button("⬅️ Anterior", disabled=len(cursores) == 1, use_container_width=True):
+                        cursores.pop()
+                        st.rerun()
+                
+                with col2:
+                    st.caption(f"Página {len(cursores)} · {totais['quantidade']} lançamentos no total")
+                
+                with col3:
+                    if st.button("Próxima ➡️", disabled=pagina['proximo_cursor'] is None, use_container_width=True):
+                        cursores.append(pagina['proximo_cursor'])
+                        st.rerun()
             
             st.divider()
             
             # Lista entradas
             if entradas:
                 st.markdown("### 💰 Entradas")
-                
-                for lanc in entradas:
-                    with st.container():
-                        col1, col2, col3, col4, col5 = st.columns([1.5, 1, 2, 1.5, 1])
-                        
-                        with col1:
-                            st.write(f"📅 {formatador.formatar_data(lanc['data'])}")
-                        
-                        with col2:
-                            st.markdown(f'<span style="background-color: {lanc["categoria_cor"]}; padding: 2px 8px; border-radius: 4px; color: white;">{lanc["categoria_nome"]}</span>', unsafe_allow_html=True)
-                        
-                        with col3:
-                            st.write(f"**{lanc['descricao']}**")
-                        
-                        with col4:
-                            st.write(f"**{formatador.formatar_moeda(lanc['valor'])}**")
-                        
-                        with col5:
-                            if st.button("🗑️", key=f"del_ent_{lanc['id']}"):
-                                sucesso, mensagem = LancamentoService.excluir_lancamento(lanc['id'], usuario.id)
-                                if sucesso:
-                                    st.success(mensagem)
-                                    st.rerun()
-                                else:
-                                    st.error(mensagem)
-                
+                _mostrar_linhas(entradas, 'del_ent', usuario.id, formatador)
                 st.divider()
             
             # Lista despesas
             if despesas:
                 st.markdown("### 💸 Despesas")
-                
-                for lanc in despesas:
-                    with st.container():
-                        col1, col2, col3, col4, col5 = st.columns([1.5, 1, 2, 1.5, 1])
-                        
-                        with col1:
-                            st.write(f"📅 {formatador.formatar_data(lanc['data'])}")
-                        
-                        with col2:
-                            st.markdown(f'<span style="background-color: {lanc["categoria_cor"]}; padding: 2px 8px; border-radius: 4px; color: white;">{lanc["categoria_nome"]}</span>', unsafe_allow_html=True)
-                        
-                        with col3:
-                            st.write(f"**{lanc['descricao']}**")
-                        
-                        with col4:
-                            st.write(f"**{formatador.formatar_moeda(lanc['valor'])}**")
-                        
-                        with col5:
-                            if st.button("🗑️", key=f"del_desp_{lanc['id']}"):
-                                sucesso, mensagem = LancamentoService.excluir_lancamento(lanc['id'], usuario.id)
-                                if sucesso:
-                                    st.success(mensagem)
-                                    st.rerun()
-                                else:
-                                    st.error(mensagem)
+                _mostrar_linhas(despesas, 'del_desp', usuario.id, formatador)
+        elif termo:
+            st.info(f"📭 Nenhum lançamento encontrado para \"{termo}\" com os filtros selecionados.")
+        elif len(cursores) > 1:
+            # A página ficou vazia (ex.: último lançamento dela excluído): volta uma página
+            cursores.pop()
+            st.rerun()
         else:
             st.info("📭 Nenhum lançamento encontrado com os filtros selecionados.")
     
@@ -149,6 +207,15 @@ def mostrar_lancamentos():
             st.warning("⚠️ Você precisa criar categorias de entrada primeiro!")
             st.info("💡 Vá em **Categorias** e crie categorias como: Salário, Freelance, Investimentos, etc.")
         else:
+            # Fora do formulário: ao digitar a descrição, a categoria é pré-selecionada pelo histórico
+            descricao = st.text_input(
+                "Descrição",
+                placeholder="Ex: Salário de Janeiro, Freelance projeto X...",
+                key="entrada_descricao",
+                on_change=_sugerir_categoria,
+                args=(usuario.id, "entrada", categorias_entrada)
+            )
+            
             with st.form("form_nova_entrada"):
                 st.markdown("#### 📝 Informações da Entrada")
                 
@@ -159,6 +226,9 @@ def mostrar_lancamentos():
                     key="entrada_categoria"
                 )
                 
+                if categoria['id'] == st.session_state.get("entrada_categoria_sugerida"):
+                    st.caption("💡 Categoria sugerida pelas suas descrições anteriores")
+                
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -179,12 +249,6 @@ def mostrar_lancamentos():
                         key="entrada_valor"
                     )
                 
-                descricao = st.text_input(
-                    "Descrição",
-                    placeholder="Ex: Salário de Janeiro, Freelance projeto X...",
-                    key="entrada_descricao"
-                )
-                
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -238,52 +302,57 @@ def mostrar_lancamentos():
                     if not descricao:
                         st.error("Por favor, informe uma descrição!")
                     else:
-                        sucesso_total = True
-                        mensagens_erro = []
-                        
                         # Calcula valor da parcela se for parcelado
                         if parcelado and tipo_parcelamento == "Valor total dividido":
                             valor_a_lancar = valor / num_parcelas
                         else:
                             valor_a_lancar = valor
                         
-                        # Cria os lançamentos
-                        for i in range(num_parcelas):
-                            # Calcula a data do lançamento
-                            if i == 0:
-                                data_lanc = data_entrada
-                            else:
-                                data_lanc = data_entrada + relativedelta(months=i)
-                            
-                            # Cria descrição da parcela
-                            if num_parcelas > 1:
-                                desc_parcela = f"{descricao} ({i+1}/{num_parcelas})"
-                            else:
-                                desc_parcela = descricao
-                            
-                            sucesso, mensagem, _ = LancamentoService.criar_lancamento(
+                        if parcelado and tipo_parcelamento == "Valor fixo por mês":
+                            # Valor fixo: uma única regra, com as ocorrências calculadas sob demanda
+                            sucesso, mensagem, _ = RecorrenciaService.criar_recorrencia(
                                 usuario.id,
                                 categoria['id'],
-                                data_lanc,
-                                valor_a_lancar,
-                                desc_parcela,
-                                tipo
+                                valor,
+                                descricao,
+                                data_entrada,
+                                tipo,
+                                data_fim=data_entrada + relativedelta(months=num_parcelas - 1)
                             )
+                            erros = []
+                        else:
+                            # Monta as parcelas: uma por mês a partir da data informada
+                            parcelas = []
+                            for i in range(num_parcelas):
+                                if num_parcelas > 1:
+                                    desc_parcela = f"{descricao} ({i+1}/{num_parcelas})"
+                                else:
+                                    desc_parcela = descricao
+                                
+                                parcelas.append({
+                                    'data': data_entrada + relativedelta(months=i),
+                                    'valor': valor_a_lancar,
+                                    'descricao': desc_parcela
+                                })
                             
-                            if not sucesso:
-                                sucesso_total = False
-                                mensagens_erro.append(f"Parcela {i+1}: {mensagem}")
+                            # Grava todas as parcelas em uma única transação
+                            sucesso, mensagem, erros = LancamentoService.criar_lancamentos_lote(
+                                usuario.id,
+                                categoria['id'],
+                                tipo,
+                                parcelas
+                            )
                         
-                        if sucesso_total:
+                        if sucesso:
                             if num_parcelas > 1:
                                 st.success(f"✅ {num_parcelas} entradas criadas com sucesso!")
                             else:
                                 st.success("✅ Entrada registrada com sucesso!")
                             st.rerun()
                         else:
-                            st.error("❌ Alguns lançamentos falharam:")
-                            for msg in mensagens_erro:
-                                st.error(msg)
+                            st.error(f"❌ {mensagem}")
+                            for indice, erro in erros:
+                                st.error(f"Parcela {indice + 1}: {erro}")
     
     with tab_despesa:
         st.subheader("💸 Registrar Nova Despesa")
@@ -295,6 +364,15 @@ def mostrar_lancamentos():
             st.warning("⚠️ Você precisa criar categorias de despesa primeiro!")
             st.info("💡 Vá em **Categorias** e crie categorias como: Moradia, Alimentação, Transporte, etc.")
         else:
+            # Fora do formulário: ao digitar a descrição, a categoria é pré-selecionada pelo histórico
+            descricao = st.text_input(
+                "Descrição",
+                placeholder="Ex: Aluguel, Supermercado, Conta de luz...",
+                key="despesa_descricao",
+                on_change=_sugerir_categoria,
+                args=(usuario.id, "despesa", categorias_despesa)
+            )
+            
             with st.form("form_nova_despesa"):
                 st.markdown("#### 📝 Informações da Despesa")
                 
@@ -305,6 +383,9 @@ def mostrar_lancamentos():
                     key="despesa_categoria"
                 )
                 
+                if categoria['id'] == st.session_state.get("despesa_categoria_sugerida"):
+                    st.caption("💡 Categoria sugerida pelas suas descrições anteriores")
+                
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -325,12 +406,6 @@ def mostrar_lancamentos():
                         key="despesa_valor"
                     )
                 
-                descricao = st.text_input(
-                    "Descrição",
-                    placeholder="Ex: Aluguel, Supermercado, Conta de luz...",
-                    key="despesa_descricao"
-                )
-                
                 col1, col2 = st.columns(2)
                 
                 with col1:
@@ -384,49 +459,214 @@ def mostrar_lancamentos():
                     if not descricao:
                         st.error("Por favor, informe uma descrição!")
                     else:
-                        sucesso_total = True
-                        mensagens_erro = []
-                        
                         # Calcula valor da parcela se for parcelado
                         if parcelado and tipo_parcelamento == "Valor total dividido":
                             valor_a_lancar = valor / num_parcelas
                         else:
                             valor_a_lancar = valor
                         
-                        # Cria os lançamentos
-                        for i in range(num_parcelas):
-                            # Calcula a data do lançamento
-                            if i == 0:
-                                data_lanc = data_despesa
-                            else:
-                                data_lanc = data_despesa + relativedelta(months=i)
-                            
-                            # Cria descrição da parcela
-                            if num_parcelas > 1:
-                                desc_parcela = f"{descricao} (Parcela {i+1}/{num_parcelas})"
-                            else:
-                                desc_parcela = descricao
-                            
-                            sucesso, mensagem, _ = LancamentoService.criar_lancamento(
+                        if parcelado and tipo_parcelamento == "Valor fixo por mês":
+                            # Valor fixo: uma única regra, com as ocorrências calculadas sob demanda
+                            sucesso, mensagem, _ = RecorrenciaService.criar_recorrencia(
                                 usuario.id,
                                 categoria['id'],
-                                data_lanc,
-                                valor_a_lancar,
-                                desc_parcela,
-                                tipo
+                                valor,
+                                descricao,
+                                data_despesa,
+                                tipo,
+                                data_fim=data_despesa + relativedelta(months=num_parcelas - 1)
                             )
+                            erros = []
+                        else:
+                            # Monta as parcelas: uma por mês a partir da data informada
+                            parcelas = []
+                            for i in range(num_parcelas):
+                                if num_parcelas > 1:
+                                    desc_parcela = f"{descricao} (Parcela {i+1}/{num_parcelas})"
+                                else:
+                                    desc_parcela = descricao
+                                
+                                parcelas.append({
+                                    'data': data_despesa + relativedelta(months=i),
+                                    'valor': valor_a_lancar,
+                                    'descricao': desc_parcela
+                                })
                             
-                            if not sucesso:
-                                sucesso_total = False
-                                mensagens_erro.append(f"Parcela {i+1}: {mensagem}")
+                            # Grava todas as parcelas em uma única transação
+                            sucesso, mensagem, erros = LancamentoService.criar_lancamentos_lote(
+                                usuario.id,
+                                categoria['id'],
+                                tipo,
+                                parcelas
+                            )
                         
-                        if sucesso_total:
+                        if sucesso:
                             if num_parcelas > 1:
                                 st.success(f"✅ {num_parcelas} despesas criadas com sucesso!")
                             else:
                                 st.success("✅ Despesa registrada com sucesso!")
                             st.rerun()
                         else:
-                            st.error("❌ Alguns lançamentos falharam:")
-                            for msg in mensagens_erro:
-                                st.error(msg)
+                            st.error(f"❌ {mensagem}")
+                            for indice, erro in erros:
+                                st.error(f"Parcela {indice + 1}: {erro}")
+    
+    with tab_recorrencias:
+        st.subheader("🔁 Lançamentos Recorrentes")
+        st.caption("Lançamentos de valor fixo por mês são guardados como uma regra. Alterar a série aqui vale para todas as ocorrências ainda não materializadas.")
+        
+        recorrencias = RecorrenciaService.listar_recorrencias(usuario.id)
+        
+        if recorrencias:
+            for rec in recorrencias:
+                termino = formatador.formatar_data(rec['data_fim']) if rec['data_fim'] else "sem término"
+                titulo = (
+                    f"**{rec['descricao']}** - {formatador.formatar_moeda(rec['valor'])} "
+                    f"({rec['frequencia'].value}, {formatador.formatar_data(rec['data_inicio'])} a {termino})"
+                )
+                
+                with st.expander(titulo):
+                    with st.form(f"form_recorrencia_{rec['id']}"):
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            nova_descricao = st.text_input("Descrição", value=rec['descricao'] or '')
+                            novo_valor = st.number_input(
+                                "Valor (R$)",
+                                min_value=0.01,
+                                value=float(rec['valor']),
+                                step=0.01,
+                                format="%.2f"
+                            )
+                        
+                        with col2:
+                            nova_data_fim = st.date_input(
+                                "Última ocorrência até",
+                                value=rec['data_fim'] or rec['data_inicio'],
+                                min_value=rec['data_inicio']
+                            )
+                            sem_termino = st.checkbox("Sem data de término", value=rec['data_fim'] is None)
+                        
+                        col1, col2 = st.columns(2)
+                        
+                        with col1:
+                            salvar = st.form_submit_button("💾 Salvar Série", use_container_width=True)
+                        
+                        with col2:
+                            excluir = st.form_submit_button("🗑️ Excluir Série", use_container_width=True)
+                    
+                    if salvar:
+                        sucesso, mensagem = RecorrenciaService.atualizar_recorrencia(
+                            rec['id'],
+                            usuario.id,
+                            novo_valor,
+                            nova_descricao,
+                            None if sem_termino else nova_data_fim
+                        )
+                        if sucesso:
+                            st.success(mensagem)
+                            st.rerun()
+                        else:
+                            st.error(mensagem)
+                    
+                    if excluir:
+                        sucesso, mensagem = RecorrenciaService.excluir_recorrencia(rec['id'], usuario.id)
+                        if sucesso:
+                            st.success(mensagem)
+                            st.rerun()
+                        else:
+                            st.error(mensagem)
+                    
+                    # Alteração de uma única ocorrência: vira um lançamento comum
+                    ocorrencias = [
+                        o for o in RecorrenciaService.listar_ocorrencias(usuario.id, date.today() - relativedelta(months=1))
+                        if o['recorrencia_id'] == rec['id']
+                    ]
+                    
+                    if ocorrencias:
+                        st.markdown("##### ✏️ Alterar uma ocorrência")
+                        
+                        with st.form(f"form_ocorrencia_{rec['id']}"):
+                            col1, col2 = st.columns(2)
+                            
+                            with col1:
+                                data_ocorrencia = st.selectbox(
+                                    "Ocorrência",
+                                    [o['data'] for o in ocorrencias],
+                                    format_func=formatador.formatar_data
+                                )
+                            
+                            with col2:
+                                valor_ocorrencia = st.number_input(
+                                    "Valor desta ocorrência (R$)",
+                                    min_value=0.01,
+                                    value=float(rec['valor']),
+                                    step=0.01,
+                                    format="%.2f"
+                                )
+                            
+                            if st.form_submit_button("✏️ Materializar Ocorrência", use_container_width=True):
+                                sucesso, mensagem, _ = RecorrenciaService.materializar_ocorrencia(
+                                    rec['id'],
+                                    usuario.id,
+                                    data_ocorrencia,
+                                    valor=valor_ocorrencia
+                                )
+                                if sucesso:
+                                    st.success(mensagem)
+                                    st.rerun()
+                                else:
+                                    st.error(mensagem)
+        else:
+            st.info("📭 Nenhuma recorrência cadastrada. Use a opção **Valor fixo por mês** ao registrar uma entrada ou despesa.")
+    
+    with tab_importar:
+        st.subheader("📥 Importar Lançamentos")
+        st.markdown(
+            "Envie um arquivo CSV com cabeçalho **data;descricao;valor;categoria** "
+            "(coluna **tipo** opcional: Fixa ou Variável). Datas no formato DD/MM/AAAA, "
+            "valores no formato brasileiro (1.234,56) e categorias com o mesmo nome das cadastradas. "
+            "Linhas com a categoria em branco recebem a categoria sugerida pelas suas descrições anteriores."
+        )
+        
+        arquivo = st.file_uploader("Arquivo CSV", type=['csv', 'txt'], key="importar_arquivo")
+        separador = st.selectbox(
+            "Separador",
+            [';', ',', '\t'],
+            format_func=lambda x: {';': 'Ponto e vírgula (;)', ',': 'Vírgula (,)', '\t': 'Tabulação'}[x],
+            key="importar_separador"
+        )
+        
+        if arquivo is not None and st.button("📥 Importar", type="primary", use_container_width=True):
+            total_linhas = max(arquivo.getvalue().count(b'\n') - 1, 1)
+            barra = st.progress(0.0, text="Importando...")
+            
+            def atualizar_progresso(linhas, importados, erros):
+                barra.progress(
+                    min(linhas / total_linhas, 1.0),
+                    text=f"{linhas} de {total_linhas} linhas - {importados} importadas, {erros} com erro"
+                )
+            
+            relatorio = io.StringIO()
+            sucesso, mensagem, resumo = ImportacaoService.importar_csv(
+                usuario.id,
+                io.BytesIO(arquivo.getvalue()),
+                separador=separador,
+                relatorio_erros=relatorio,
+                progresso=atualizar_progresso
+            )
+            
+            if sucesso:
+                st.success(f"✅ {mensagem} ({resumo['duracao']:.1f}s)")
+            else:
+                st.error(f"❌ {mensagem}")
+            
+            if resumo['erros']:
+                st.warning(f"⚠️ {resumo['erros']} linhas não foram importadas")
+                st.dataframe(pd.DataFrame(resumo['amostra_erros']), use_container_width=True, hide_index=True)
+                st.download_button(
+                    "📄 Baixar relatório de erros",
+                    relatorio.getvalue().encode('utf-8-sig'),
+                    file_name=f"erros_{arquivo.name}",
+                    mime="text/csv"
+                )
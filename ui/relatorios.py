@@ -1,7 +1,10 @@
 import streamlit as st
-from datetime import datetime
-from services import LancamentoService, OrcamentoService
-from reports import RelatorioFinanceiro
+import io
+from datetime import datetime, date
+from dateutil.relativedelta import relativedelta
+from services import CategoriaService, ExportacaoService, RelatorioService
+from services.tarefas import CONCLUIDA, ESTADOS_ATIVOS, FALHOU, NA_FILA
+from ui.fragmento import FRAGMENTOS_DISPONIVEIS, fragmento
 from utils.formatador import FormatadorBR
 
 
@@ -45,9 +48,8 @@ def mostrar_relatorios():
     # Preview dos dados
     st.subheader("📊 Preview do Relatório")
     
-    totais = LancamentoService.calcular_totais(usuario.id, mes, ano)
-    lancamentos = LancamentoService.listar_lancamentos(usuario.id, mes, ano)
-    orcamentos = OrcamentoService.listar_orcamentos(usuario.id, mes, ano)
+    resumo = RelatorioService.resumo_relatorio(usuario.id, usuario.nome, mes, ano)
+    totais = resumo['totais']
     
     col1, col2, col3 = st.columns(3)
     
@@ -61,46 +63,27 @@ def mostrar_relatorios():
         st.metric("💵 Saldo", formatador.formatar_moeda(totais['saldo']))
     
     st.markdown(f"""
-    - **Total de Lançamentos:** {len(lancamentos)}
-    - **Orçamentos Definidos:** {len(orcamentos)}
+    - **Total de Lançamentos:** {resumo['quantidade_lancamentos']}
+    - **Orçamentos Definidos:** {resumo['quantidade_orcamentos']}
     - **Período:** {formatador.mes_ano_formatado(mes, ano)}
     """)
     
     st.divider()
     
-    # Botão de geração
+    # Botão de geração: o PDF é gerado em segundo plano e acompanhado abaixo
     if st.button("📥 Gerar Relatório PDF", type="primary", use_container_width=True):
-        if not lancamentos:
+        if not resumo['quantidade_lancamentos']:
             st.warning("⚠️ Não há lançamentos registrados neste período para gerar relatório.")
         else:
-            with st.spinner("Gerando relatório PDF..."):
-                try:
-                    # Gera o relatório
-                    gerador = RelatorioFinanceiro()
-                    pdf_buffer = gerador.gerar_relatorio_mensal(
-                        usuario.nome,
-                        mes,
-                        ano,
-                        totais,
-                        lancamentos,
-                        orcamentos
-                    )
-                    
-                    # Oferece para download
-                    nome_arquivo = f"relatorio_financeiro_{mes:02d}_{ano}.pdf"
-                    
-                    st.success("✅ Relatório gerado com sucesso!")
-                    
-                    st.download_button(
-                        label="📥 Baixar Relatório PDF",
-                        data=pdf_buffer,
-                        file_name=nome_arquivo,
-                        mime="application/pdf",
-                        use_container_width=True
-                    )
-                
-                except Exception as e:
-                    st.error(f"❌ Erro ao gerar relatório: {str(e)}")
+            sucesso, mensagem, _ = RelatorioService.enfileirar_relatorio(usuario.id, usuario.nome, mes, ano)
+            if not sucesso:
+                st.error(f"❌ {mensagem}")
+    
+    mostrar_tarefas_relatorios(usuario)
+    
+    st.divider()
+    
+    mostrar_exportacao(usuario)
     
     st.divider()
     
@@ -136,3 +119,139 @@ def mostrar_relatorios():
         - Arquive os PDFs para histórico financeiro
         - Compartilhe com seu contador ou planejador financeiro
         """)
+
+
+def exibir_tarefas_relatorios(tarefas: list):
+    """Exibe o estado dos relatórios pedidos e o download dos concluídos."""
+    formatador = FormatadorBR()
+    
+    for tarefa in tarefas:
+        mes, ano = tarefa['parametros']['mes'], tarefa['parametros']['ano']
+        periodo = formatador.mes_ano_formatado(mes, ano)
+        
+        if tarefa['estado'] == NA_FILA:
+            st.info(f"⏳ Relatório de {periodo}: aguardando na fila...")
+        elif tarefa['estado'] == FALHOU:
+            st.error(f"❌ Relatório de {periodo}: {tarefa['mensagem']}")
+        elif tarefa['estado'] == CONCLUIDA:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.success(f"✅ Relatório de {periodo}: {tarefa['mensagem']}")
+            with col2:
+                st.download_button(
+                    label="📥 Baixar PDF",
+                    data=tarefa['resultado'],
+                    file_name=f"relatorio_financeiro_{mes:02d}_{ano}.pdf",
+                    mime="application/pdf",
+                    use_container_width=True,
+                    key=f"baixar_relatorio_{tarefa['id']}"
+                )
+        else:
+            st.progress(
+                tarefa['progresso'],
+                text=f"⚙️ Gerando relatório de {periodo}... {tarefa['progresso']:.0%}"
+            )
+
+
+@fragmento(intervalo=1)
+def acompanhar_tarefas_relatorios(usuario):
+    """Atualiza o estado dos relatórios em geração a cada segundo, sem reexecutar a página."""
+    tarefas = RelatorioService.listar_tarefas_relatorios(usuario.id)
+    exibir_tarefas_relatorios(tarefas)
+    
+    # Tudo finalizado: reexecuta a página, que volta a exibir sem atualização periódica
+    if not any(tarefa['estado'] in ESTADOS_ATIVOS for tarefa in tarefas):
+        st.rerun()
+
+
+def mostrar_tarefas_relatorios(usuario):
+    """
+    Seção com os relatórios pedidos pelo usuário.
+    
+    As tarefas pertencem ao processo, e não à sessão: continuam sendo
+    geradas se o usuário sair da página e reaparecem quando ele volta.
+    """
+    tarefas = RelatorioService.listar_tarefas_relatorios(usuario.id)
+    
+    if not tarefas:
+        return
+    
+    st.subheader("🗂️ Relatórios Gerados")
+    
+    if not any(tarefa['estado'] in ESTADOS_ATIVOS for tarefa in tarefas):
+        exibir_tarefas_relatorios(tarefas)
+    elif FRAGMENTOS_DISPONIVEIS:
+        acompanhar_tarefas_relatorios(usuario)
+    else:
+        exibir_tarefas_relatorios(tarefas)
+        st.button("🔄 Atualizar", key="atualizar_tarefas_relatorios")
+
+
+def mostrar_exportacao(usuario):
+    """
+    Exportação do histórico de lançamentos em CSV ou Parquet.
+    
+    O serviço grava lote a lote, mas o st.download_button precisa do arquivo
+    inteiro em bytes: o download pela página ocupa em memória o tamanho do
+    arquivo gerado. Para históricos muito grandes, exportar_lancamentos.py
+    grava direto em disco com memória constante.
+    """
+    
+    st.subheader("📤 Exportar Histórico")
+    st.caption("Exporta os lançamentos no mesmo formato aceito pela importação de CSV.")
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        todo_historico = st.checkbox("Todo o histórico", value=True, key="exportar_todo_historico")
+        periodo = st.date_input(
+            "Período",
+            value=(date(datetime.now().year, 1, 1), date.today()),
+            disabled=todo_historico,
+            format="DD/MM/YYYY",
+            key="exportar_periodo"
+        )
+    
+    with col2:
+        categorias = CategoriaService.listar_categorias(usuario.id)
+        categoria = st.selectbox(
+            "Categoria",
+            [None] + categorias,
+            format_func=lambda c: 'Todas' if c is None else c['nome'],
+            key="exportar_categoria"
+        )
+    
+    with col3:
+        formatos = ['csv'] + (['parquet'] if ExportacaoService.parquet_disponivel() else [])
+        formato = st.selectbox("Formato", formatos, format_func=str.upper, key="exportar_formato")
+    
+    if st.button("📤 Preparar Exportação", use_container_width=True, key="exportar_botao"):
+        inicio = fim = None
+        if not todo_historico and len(periodo) == 2:
+            # Data final do seletor é inclusiva; a exportação usa fim exclusivo
+            inicio, fim = periodo[0], periodo[1] + relativedelta(days=1)
+        
+        with st.spinner("Exportando lançamentos..."):
+            # Só o arquivo gerado fica em memória (o download exige os bytes), não as linhas do histórico
+            arquivo = io.BytesIO()
+            sucesso, mensagem, total = ExportacaoService.exportar(
+                usuario.id,
+                arquivo,
+                formato,
+                inicio,
+                fim,
+                categoria['id'] if categoria else None
+            )
+            conteudo = arquivo.getvalue()
+        
+        if sucesso:
+            st.success(f"✅ {mensagem}")
+            st.download_button(
+                label=f"📥 Baixar {formato.upper()}",
+                data=conteudo,
+                file_name=f"lancamentos.{formato}",
+                mime="text/csv" if formato == 'csv' else "application/octet-stream",
+                use_container_width=True
+            )
+        else:
+            st.error(f"❌ {mensagem}")
@@ -1,3 +1,4 @@
 from .formatador import FormatadorBR
+from .periodo import Periodo
 
-__all__ = ['FormatadorBR']
+__all__ = ['FormatadorBR', 'Periodo']
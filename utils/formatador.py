@@ -1,10 +1,63 @@
-from typing import Any
+from functools import lru_cache
+from typing import Any, Callable
 import locale
+import numpy as np
+import pandas as pd
+
+
+# Resultados de formatar_moeda e formatar_percentual mantidos em memória
+TAMANHO_CACHE_FORMATACAO = 4096
+
+# Troca vírgula por ponto e ponto por vírgula (do padrão americano para o brasileiro)
+TROCA_SEPARADORES = str.maketrans(',.', '.,')
+
+
+def _formatar_moeda(valor: float) -> str:
+    """Formata como moeda, sem cache."""
+    return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+
+
+def _formatar_percentual(valor: float, casas_decimais: int) -> str:
+    """Formata como percentual, sem cache."""
+    return f"{valor:.{casas_decimais}f}%".replace('.', ',')
+
+
+_moeda_em_cache = lru_cache(maxsize=TAMANHO_CACHE_FORMATACAO)(_formatar_moeda)
+_percentual_em_cache = lru_cache(maxsize=TAMANHO_CACHE_FORMATACAO)(_formatar_percentual)
+
+
+def _formatar_vetor(valores: Any, formato: str, formatar_escalar: Callable[[Any], str]) -> pd.Series:
+    """
+    Formata uma coluna inteira com separadores brasileiros.
+
+    Cada valor distinto é formatado uma única vez (colunas de valores
+    monetários costumam repetir valores) e a troca dos separadores é feita
+    em um único str.translate sobre todos os textos, em vez de três
+    str.replace por valor. Colunas não numéricas (ou com valores ausentes
+    do pandas, como pd.NA) usam formatar_escalar, valor a valor.
+    """
+    serie = valores if isinstance(valores, pd.Series) else pd.Series(valores)
+
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'iuf':
+        numeros = serie.to_numpy(dtype='float64', na_value=np.nan)
+        # Fatoração pelos bits do float: separa 0.0 de -0.0, que formatam diferente
+        codigos, unicos = pd.factorize(numeros.view(np.int64))
+        textos = '\n'.join(map(formato.format, unicos.view(np.float64).tolist())).translate(TROCA_SEPARADORES)
+        formatados = np.array(textos.split('\n'), dtype=object)
+        return pd.Series(formatados[codigos], index=serie.index, name=serie.name, dtype=object)
+
+    return pd.Series(
+        [formatar_escalar(valor) for valor in serie.to_numpy(dtype=object)],
+        index=serie.index, name=serie.name, dtype=object
+    )
 
 
 class FormatadorBR:
     """Formatador de valores para padrão brasileiro."""
     
+    # layout.separators do Plotly (decimal e milhar) no padrão brasileiro, usado pelos modelos abaixo
+    SEPARADORES_PLOTLY = ',.'
+    
     @staticmethod
     def formatar_moeda(valor: float) -> str:
         """
@@ -17,10 +70,24 @@ class FormatadorBR:
             String formatada (ex: 'R$ 1.234,56')
         """
         try:
-            return f"R$ {valor:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.')
+            # Zero fica fora do cache: 0.0 e -0.0 são a mesma chave, mas formatam diferente
+            return _moeda_em_cache(valor) if valor else _formatar_moeda(valor)
         except:
             return "R$ 0,00"
     
+    @staticmethod
+    def formatar_moeda_serie(valores: Any) -> pd.Series:
+        """
+        Formata uma coluna inteira como moeda brasileira, como formatar_moeda.
+        
+        Args:
+            valores: Series, array ou lista de números
+            
+        Returns:
+            Series de textos (com o mesmo índice, se valores for uma Series)
+        """
+        return _formatar_vetor(valores, 'R$ {:,.2f}', FormatadorBR.formatar_moeda)
+    
     @staticmethod
     def formatar_percentual(valor: float, casas_decimais: int = 1) -> str:
         """
@@ -34,10 +101,56 @@ class FormatadorBR:
             String formatada (ex: '75,5%')
         """
         try:
-            return f"{valor:.{casas_decimais}f}%".replace('.', ',')
+            if valor:
+                return _percentual_em_cache(valor, casas_decimais)
+            return _formatar_percentual(valor, casas_decimais)
         except:
             return "0,0%"
     
+    @staticmethod
+    def formatar_percentual_serie(valores: Any, casas_decimais: int = 1) -> pd.Series:
+        """
+        Formata uma coluna inteira como percentual, como formatar_percentual.
+        
+        Args:
+            valores: Series, array ou lista de números
+            casas_decimais: Número de casas decimais
+            
+        Returns:
+            Series de textos (com o mesmo índice, se valores for uma Series)
+        """
+        return _formatar_vetor(
+            valores,
+            f"{{:.{casas_decimais}f}}%",
+            lambda valor: FormatadorBR.formatar_percentual(valor, casas_decimais)
+        )
+    
+    @staticmethod
+    def modelo_moeda_plotly(campo: str = 'y') -> str:
+        """
+        Modelo de texto do Plotly (texttemplate/hovertemplate) que exibe um campo como moeda.
+        
+        A formatação é feita pelo navegador; com layout.separators igual a
+        SEPARADORES_PLOTLY o resultado é o de formatar_moeda.
+        
+        Args:
+            campo: Campo do ponto ('y', ou 'x' em barras horizontais)
+            
+        Returns:
+            Modelo (ex: 'R$ %{y:,.2f}')
+        """
+        return f"R$ %{{{campo}:,.2f}}"
+    
+    @staticmethod
+    def modelo_percentual_plotly(campo: str = 'y', casas_decimais: int = 1) -> str:
+        """
+        Modelo de texto do Plotly que exibe um campo como percentual (ver modelo_moeda_plotly).
+        
+        Returns:
+            Modelo (ex: '%{y:.1f}%')
+        """
+        return f"%{{{campo}:.{casas_decimais}f}}%"
+    
     @staticmethod
     def formatar_data(data: Any) -> str:
         """
@@ -0,0 +1,51 @@
+from datetime import date
+from typing import Optional
+from dateutil.relativedelta import relativedelta
+
+
+class Periodo:
+    """Utilitário para cálculo de intervalos de datas usados nas consultas."""
+
+    @staticmethod
+    def intervalo_mes(mes: int, ano: int) -> tuple[date, date]:
+        """
+        Retorna o intervalo semiaberto [primeiro dia, primeiro dia do mês seguinte).
+
+        Args:
+            mes: Mês (1-12)
+            ano: Ano
+
+        Returns:
+            Tupla (inicio, fim) onde fim é exclusivo
+        """
+        inicio = date(ano, mes, 1)
+        return inicio, inicio + relativedelta(months=1)
+
+    @staticmethod
+    def intervalo_ano(ano: int) -> tuple[date, date]:
+        """
+        Retorna o intervalo semiaberto [1º de janeiro, 1º de janeiro do ano seguinte).
+
+        Args:
+            ano: Ano
+
+        Returns:
+            Tupla (inicio, fim) onde fim é exclusivo
+        """
+        return date(ano, 1, 1), date(ano + 1, 1, 1)
+
+    @staticmethod
+    def intervalo(ano: int, mes: Optional[int] = None) -> tuple[date, date]:
+        """
+        Retorna o intervalo do mês informado ou do ano inteiro quando mes é None.
+
+        Args:
+            ano: Ano
+            mes: Mês (1-12) opcional
+
+        Returns:
+            Tupla (inicio, fim) onde fim é exclusivo
+        """
+        if mes:
+            return Periodo.intervalo_mes(mes, ano)
+        return Periodo.intervalo_ano(ano)